@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+import hashlib
+
+KEY_PREFIX = "django_q_registry"
+
+
+def make_key(*parts: str) -> str:
+    """
+    Build a cache key from `parts`, hashing them so that task and schedule names with spaces or other
+    characters memcached does not allow are safe to use.
+    """
+    digest = hashlib.sha256("\0".join(parts).encode()).hexdigest()
+    return f"{KEY_PREFIX}:{digest}"
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import DEFAULT_DB_ALIAS
+from django.db import connections
+from django.db import models
+from django.http import HttpRequest
+from django.utils.functional import cached_property
+from django_q.models import Task as QTask
+
+from django_q_registry.models import Task
+from django_q_registry.models import TaskQuerySet
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A `Paginator` that avoids a full `COUNT(*)` on large, unfiltered tables.
+
+    On PostgreSQL, the planner's row estimate from `pg_class.reltuples` is used when the queryset has no
+    filters applied and the estimate is above `ESTIMATE_THRESHOLD`. Everywhere else, or for small tables
+    where an exact count is cheap, this falls back to the default `Paginator.count`.
+    """
+
+    ESTIMATE_THRESHOLD = 10_000
+
+    @cached_property
+    def count(self) -> int:
+        query = getattr(self.object_list, "query", None)
+        if query is None or query.where:
+            return super().count
+
+        connection = connections[getattr(self.object_list, "db", DEFAULT_DB_ALIAS)]
+        if connection.vendor != "postgresql":
+            return super().count
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE relname = %s",
+                [query.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+
+        estimate = int(row[0]) if row else 0
+        if estimate < self.ESTIMATE_THRESHOLD:
+            return super().count
+        return estimate
+
+
+def add_run_stats(tasks: Iterable[Task]) -> list[Task]:
+    """
+    Set `success_count`, `failure_count`, and `last_run_at` on each of `tasks` from the saved results
+    of its schedule, aggregated over just these schedules.
+
+    Successes, which make up most results, are counted through Django Q's partial index on successful
+    results, and failures and the last run are read from the index on `group` and `stopped`, so neither
+    query reads the results table itself.
+
+    Returns:
+        `tasks` as a list.
+    """
+    tasks = list(tasks)
+    names = {task.q_schedule.name for task in tasks if task.q_schedule is not None}
+    results = QTask.objects.filter(group__in=names).order_by().values("group")
+    success_counts = dict(
+        results.filter(success=True)
+        .annotate(count=models.Count("*"))
+        .values_list("group", "count")
+    )
+    stats = {
+        row["group"]: row
+        for row in results.annotate(
+            failure_count=models.Count("pk", filter=models.Q(success=False)),
+            last_run_at=models.Max("stopped"),
+        )
+    }
+    for task in tasks:
+        name = task.q_schedule.name if task.q_schedule else None
+        row = stats.get(name, {})
+        task.success_count = success_counts.get(name, 0)  # type: ignore[attr-defined]
+        task.failure_count = row.get("failure_count", 0)  # type: ignore[attr-defined]
+        task.last_run_at = row.get("last_run_at")  # type: ignore[attr-defined]
+    return tasks
+
+
+class TaskChangeList(ChangeList):
+    """
+    A `ChangeList` that adds the run stats of the tasks on the current page only, see `add_run_stats`,
+    rather than computing them for every row of the table.
+    """
+
+    def get_results(self, request: HttpRequest) -> None:
+        super().get_results(request)
+        self.result_list = add_run_stats(self.result_list)
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = [
+        "name",
+        "paused_at",
+        "func",
+        "schedule_type",
+        "next_run",
+        "success_count",
+        "failure_count",
+        "last_run_at",
+    ]
+    list_select_related = ["q_schedule"]
+    search_fields = ["name", "func"]
+    readonly_fields = [
+        "q_schedule",
+        "paused_at",
+        "paused_next_run",
+        "generation",
+        "deleted_at",
+    ]
+    actions = ["pause", "resume", "run_now"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request: HttpRequest) -> models.QuerySet[Task]:
+        return super().get_queryset(request).select_related("q_schedule")
+
+    def get_changelist(self, request: HttpRequest, **kwargs: Any) -> type[ChangeList]:
+        return TaskChangeList
+
+    @admin.display(description="Schedule type", ordering="q_schedule__schedule_type")
+    def schedule_type(self, obj: Task) -> str | None:
+        if obj.q_schedule is None:
+            return None
+        return obj.q_schedule.get_schedule_type_display()
+
+    @admin.display(description="Next run", ordering="q_schedule__next_run")
+    def next_run(self, obj: Task):
+        if obj.q_schedule is None:
+            return None
+        return obj.q_schedule.next_run
+
+    @admin.display(description="Successes")
+    def success_count(self, obj: Task) -> int:
+        return obj.success_count  # type: ignore[attr-defined]
+
+    @admin.display(description="Failures")
+    def failure_count(self, obj: Task) -> int:
+        return obj.failure_count  # type: ignore[attr-defined]
+
+    @admin.display(description="Last run")
+    def last_run_at(self, obj: Task):
+        return obj.last_run_at  # type: ignore[attr-defined]
+
+    @admin.action(description="Pause selected tasks")
+    def pause(self, request: HttpRequest, queryset: TaskQuerySet) -> None:
+        paused = queryset.pause()
+        self.message_user(request, f"Paused {paused} task(s).")
+
+    @admin.action(description="Resume selected tasks")
+    def resume(self, request: HttpRequest, queryset: TaskQuerySet) -> None:
+        resumed = queryset.resume()
+        self.message_user(request, f"Resumed {resumed} task(s).")
+
+    @admin.action(description="Run selected tasks now")
+    def run_now(self, request: HttpRequest, queryset: TaskQuerySet) -> None:
+        schedules = queryset.run_now()
+        self.message_user(request, f"Queued {len(schedules)} task(s) to run now.")
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import ast
+import asyncio
+import os
+import pydoc
+import threading
+import traceback
+from collections import defaultdict
+from collections.abc import Coroutine
+from datetime import datetime
+from datetime import timedelta
+from typing import TYPE_CHECKING
+from typing import Any
+
+from django.db import router
+from django.db import transaction
+from django.utils import timezone
+from django_q.brokers import get_broker
+from django_q.humanhash import uuid
+from django_q.models import Schedule
+from django_q.monitor import save_cached
+from django_q.monitor import save_task
+from django_q.signals import post_execute
+from django_q.signals import post_execute_in_worker
+
+from django_q_registry.conf import app_settings
+from django_q_registry.forecast import get_following_run
+from django_q_registry.pools import Q_OPTIONS
+
+if TYPE_CHECKING:
+    from django_q_registry.registry import TaskRegistry
+
+# the event loop of this process, and the id of the process it was started in, see `get_loop`
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_pid: int | None = None
+_loop_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the event loop that registered `async def` tasks run on in this process, started in a daemon
+    thread on first use.
+
+    The loop lives as long as the Django Q worker, so connection pools and clients that coroutines keep
+    on it are reused from one run to the next. A worker forked from a process that had started a loop
+    starts its own.
+    """
+    global _loop, _loop_pid
+
+    with _loop_lock:
+        if _loop is None or _loop_pid != os.getpid() or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            threading.Thread(
+                target=_loop.run_forever, name="django_q_registry", daemon=True
+            ).start()
+        return _loop
+
+
+def run_coroutine(func: Any, /, *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a registered `async def` function on this process's event loop, see `get_loop`, and wait for
+    its result, so Django Q saves the result, or the error, of the run as for any other task.
+
+    The Django Q scheduler enqueues runs of registered `async def` tasks through this function, see
+    `django_q_registry.receivers.run_coroutines`. If the run is interrupted, e.g. by the cluster's
+    `timeout`, the coroutine is cancelled.
+    """
+    if not callable(func):
+        func = pydoc.locate(func)
+    future = asyncio.run_coroutine_threadsafe(func(*args, **kwargs), get_loop())
+    try:
+        return future.result()
+    finally:
+        future.cancel()
+
+
+def run_batch(runs: list[dict[str, Any]]) -> int:
+    """
+    Run several runs of registered `async def` tasks concurrently on this process's event loop, in a
+    single worker, and save the result of each run like Django Q saves the result of a task that ran on
+    its own, sending the same signals. A run with a `timeout` is cancelled once it is over.
+
+    The runs are claimed from their schedules by `batch_due_runs`.
+
+    Returns:
+        The number of runs.
+    """
+    packages = []
+    for run in runs:
+        name, task_id = uuid()
+        packages.append({"id": task_id, "name": name, **run})
+
+    async def run_all() -> None:
+        await asyncio.gather(*(_run_package(package) for package in packages))
+
+    future = asyncio.run_coroutine_threadsafe(run_all(), get_loop())
+    try:
+        future.result()
+    finally:
+        future.cancel()
+
+    broker = get_broker()
+    for package in packages:
+        post_execute_in_worker.send(
+            sender="django_q", func=package["func"], task=package
+        )
+        if package.get("cached", False):
+            save_cached(package, broker)
+        else:
+            save_task(package, broker)
+        post_execute.send(sender="django_q", task=package)
+    return len(packages)
+
+
+async def _run_package(package: dict[str, Any]) -> None:
+    package["started"] = timezone.now()
+    func = package["func"]
+    try:
+        if not callable(func):
+            func = pydoc.locate(func)
+        coroutine: Coroutine[Any, Any, Any] = func(
+            *package["args"], **package["kwargs"]
+        )
+        if package.get("timeout"):
+            coroutine = asyncio.wait_for(coroutine, package["timeout"])
+        package["result"], package["success"] = await coroutine, True
+    except Exception as err:
+        package["result"] = f"{err} : {traceback.format_exc()}"
+        package["success"] = False
+    package["stopped"] = timezone.now()
+
+
+def batch_due_runs(
+    registry: TaskRegistry | None = None, lookahead: int | None = None
+) -> int:
+    """
+    Claim the runs of registered `async def` tasks in `registry` whose `django_q.models.Schedule` is
+    due within `lookahead` seconds, and for every `Q_REGISTRY["ASYNC_BATCH_SIZE"]` of them that are due
+    at the same time on the same cluster, create a single one-off `Schedule` that runs them together
+    with `run_batch`. Defaults to the global registry and `Q_REGISTRY["ASYNC_BATCH_LOOKAHEAD"]`. Meant
+    to be registered as a periodic task itself, every minute.
+
+    A claimed run is taken off its schedule by moving its `next_run` past it, the way the Django Q
+    scheduler does when it enqueues the run, so the batch is the only task enqueued for it. `next_run`
+    is only moved if it did not change since it was read, so a run the scheduler enqueued in the
+    meantime is not run twice. Runs that are due alone, and runs of tasks with a `pool` or `skip_if`,
+    are left to the scheduler.
+
+    Returns:
+        The number of runs batched.
+    """
+    if registry is None:
+        from django_q_registry.registry import registry as default_registry
+
+        registry = default_registry
+    if lookahead is None:
+        lookahead = app_settings.ASYNC_BATCH_LOOKAHEAD
+
+    names = [
+        task.schedule_name
+        for task in registry.registered_tasks
+        if task.is_async and task.pool is None and task.skip_if is None
+    ]
+    if len(names) < 2 or app_settings.ASYNC_BATCH_SIZE < 2:
+        return 0
+
+    now = timezone.now()
+    due: dict[tuple[str | None, datetime], list[Schedule]] = defaultdict(list)
+    for schedule in (
+        Schedule.objects.filter(
+            name__in=names, next_run__lte=now + timedelta(seconds=lookahead)
+        )
+        .exclude(schedule_type=Schedule.ONCE)
+        .exclude(repeats=0)
+        .order_by("next_run", "pk")
+    ):
+        due[schedule.cluster, schedule.next_run].append(schedule)
+
+    batched = 0
+    using = router.db_for_write(Schedule)
+    for (cluster, next_run), schedules in due.items():
+        for start in range(0, len(schedules), app_settings.ASYNC_BATCH_SIZE):
+            batch = schedules[start : start + app_settings.ASYNC_BATCH_SIZE]
+            if len(batch) < 2:
+                continue
+            with transaction.atomic(using=using):
+                runs = [run for schedule in batch if (run := _claim(schedule, now))]
+                if runs:
+                    _create_batch(runs, cluster, next_run)
+            batched += len(runs)
+    return batched
+
+
+def _claim(schedule: Schedule, now: datetime) -> dict[str, Any] | None:
+    """
+    Take the due run of `schedule` off it, and return it as `run_batch` runs it, or `None` if the
+    scheduler enqueued it in the meantime.
+    """
+    updates: dict[str, Any] = {"next_run": get_following_run(schedule, now)}
+    if schedule.repeats > 0:
+        updates["repeats"] = schedule.repeats - 1
+    if not Schedule.objects.filter(
+        pk=schedule.pk, next_run=schedule.next_run, repeats=schedule.repeats
+    ).update(**updates):
+        return None
+
+    args, kwargs = _get_arguments(schedule)
+    q_options = kwargs.pop("q_options", {})
+    if schedule.intended_date_kwarg:
+        kwargs[schedule.intended_date_kwarg] = schedule.next_run.isoformat()
+    if schedule.hook:
+        q_options["hook"] = schedule.hook
+    return {
+        **{key: q_options[key] for key in Q_OPTIONS if key in q_options},
+        "func": schedule.func,
+        "args": args,
+        "kwargs": kwargs,
+        "group": q_options.get("group", schedule.name),
+        "cluster": schedule.cluster,
+    }
+
+
+def _create_batch(
+    runs: list[dict[str, Any]], cluster: str | None, next_run: datetime
+) -> Schedule:
+    q_options: dict[str, Any] = {"save": False}
+    # the batch takes as long as its slowest run, so only bound it if every run is bounded
+    timeouts = [run.get("timeout") for run in runs]
+    if all(timeouts):
+        q_options["timeout"] = max(timeouts)  # type: ignore[type-var]
+    return Schedule.objects.create(
+        name=f"async batch of {len(runs)}",
+        func="django_q_registry.aio.run_batch",
+        args=repr((runs,)),
+        kwargs=repr({"q_options": q_options}),
+        cluster=cluster,
+        schedule_type=Schedule.ONCE,
+        repeats=-1,
+        next_run=next_run,
+    )
+
+
+def _get_arguments(schedule: Schedule) -> tuple[tuple[Any, ...], dict[str, Any]]:
+    # parsed the same way the Django Q scheduler parses them
+    args: Any = ast.literal_eval(schedule.args) if schedule.args else ()
+    if not isinstance(args, tuple):
+        args = (args,)
+    kwargs: dict[str, Any] = {}
+    if schedule.kwargs:
+        try:
+            kwargs = ast.literal_eval(schedule.kwargs)
+        except (SyntaxError, ValueError):
+            call = ast.parse(f"f({schedule.kwargs})").body[0].value  # type: ignore[attr-defined]
+            kwargs = {
+                keyword.arg: ast.literal_eval(keyword.value)
+                for keyword in call.keywords
+            }
+    return args, kwargs
@@ -10,6 +10,19 @@ class DjangoQRegistryConfig(AppConfig):
     verbose_name = "Django Q Registry"
 
     def ready(self):
+        from django_q_registry import checks  # noqa: F401
+        from django_q_registry import receivers  # noqa: F401
+        from django_q_registry.conf import app_settings
         from django_q_registry.registry import registry
 
         registry.autodiscover_tasks()
+
+        from django_q_registry.startup import is_cluster_process
+        from django_q_registry.startup import prepare_fork
+        from django_q_registry.startup import sync_on_startup
+
+        # web and other processes do not fork workers, and freezing their objects only costs memory
+        if is_cluster_process():
+            sync_on_startup(registry)
+            if app_settings.PREFORK:
+                prepare_fork(registry, import_callables=app_settings.PREFORK_IMPORTS)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from django.core.cache import cache
+
+from django_q_registry._cache import make_key
+
+if TYPE_CHECKING:
+    from django_q_registry.models import Task
+    from django_q_registry.registry import TaskRegistry
+
+logger = logging.getLogger(__name__)
+
+
+def get_task_by_name(registry: TaskRegistry, name: str) -> Task | None:
+    return next(iter(registry.filter(name=name)), None)
+
+
+def get_dependents(registry: TaskRegistry, task: Task) -> list[Task]:
+    """
+    Returns the registered tasks that run `after` `task`.
+    """
+    return [
+        dependent
+        for dependent in registry.registered_tasks
+        if dependent.after == task.name
+    ]
+
+
+def get_root(registry: TaskRegistry, task: Task) -> Task:
+    """
+    Returns the first task of the chain `task` is in, i.e. the one with a `django_q.models.Schedule`.
+    """
+    root = task
+    while root.after is not None:
+        parent = get_task_by_name(registry, root.after)
+        if parent is None:
+            break
+        root = parent
+    return root
+
+
+def check_acyclic(registry: TaskRegistry, task: Task) -> None:
+    """
+    Raise a `ValueError` if registering `task` would create a dependency cycle.
+
+    Parents that are not registered yet are allowed, since tasks modules can be imported in any order.
+    """
+    seen = {task.name}
+    parent_name = task.after
+    while parent_name is not None:
+        if parent_name in seen:
+            msg = f"Registering {task.name} after {task.after} creates a dependency cycle."
+            raise ValueError(msg)
+        seen.add(parent_name)
+        parent = get_task_by_name(registry, parent_name)
+        parent_name = parent.after if parent is not None else None
+
+
+def enqueue_dependents(
+    registry: TaskRegistry, task: Task, started: datetime, stopped: datetime
+) -> list[str]:
+    """
+    Enqueue all tasks that run `after` `task`, now that a run of it has succeeded.
+
+    The start of the chain's root run is kept in the default cache, so that when a task without any
+    dependents finishes, the chain's end-to-end latency can be logged and recorded, see
+    `get_chain_latency`.
+
+    Returns:
+        The ids of the enqueued Django Q tasks.
+    """
+    root = get_root(registry, task)
+    started_key = make_key("chain_started", root.name)
+    if root is task:
+        cache.set(started_key, started, timeout=None)
+
+    dependents = get_dependents(registry, task)
+    if not dependents:
+        root_started = cache.get(started_key)
+        if root is not task and root_started is not None:
+            latency = stopped - root_started
+            cache.set(make_key("chain_latency", root.name), latency, timeout=None)
+            logger.info("Chain %s finished in %s", root.name, latency)
+        return []
+
+    return [dependent.enqueue() for dependent in dependents]
+
+
+def get_chain_latency(task: Task) -> timedelta | None:
+    """
+    Returns how long the last run of the chain starting at `task` took, from the start of `task` to
+    the end of the last task in the chain, as recorded in the default cache.
+    """
+    return cache.get(make_key("chain_latency", task.name))
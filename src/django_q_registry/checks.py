@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from typing import Any
+
+from django.core import checks
+
+SKIP_DUE_RUNS = "django_q_registry.skipping.skip_due_runs"
+
+
+@checks.register()
+def check_skip_due_runs(
+    app_configs: Any = None, **kwargs: Any
+) -> list[checks.CheckMessage]:
+    """
+    Warn if a task is registered with `skip_if` but `skip_due_runs`, which evaluates it, is not.
+    """
+    from django_q_registry.registry import registry
+
+    if not any(task.skip_if is not None for task in registry.registered_tasks):
+        return []
+    if registry.filter(func=SKIP_DUE_RUNS):
+        return []
+    return [
+        checks.Warning(
+            "Tasks are registered with skip_if, but skip_due_runs is not registered, so they are "
+            "never skipped.",
+            hint=f"Register {SKIP_DUE_RUNS} to run every minute.",
+            id="django_q_registry.W001",
+        )
+    ]
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from dataclasses import field
+from datetime import timedelta
 from typing import Any
 
 from django.conf import settings
@@ -14,8 +15,25 @@ DJANGO_Q_REGISTRY_SETTINGS_NAME = "Q_REGISTRY"
 
 @dataclass(frozen=True)
 class AppSettings:
+    ASYNC_BATCH_LOOKAHEAD: int = 90
+    ASYNC_BATCH_SIZE: int = 20
+    GENERATION: str | None = None
+    KEEP_GENERATIONS: int = 2
     PERIODIC_TASK_SUFFIX: str = " - QREGISTRY"
+    POOLS: dict[str, int] = field(default_factory=dict)
+    POOL_LEASE_TTL: int | None = None
+    POOL_RETRY_DELAY: int = 30
+    PREFORK: bool = False
+    PREFORK_IMPORTS: bool = False
+    PRIORITIES: dict[str, str | None] = field(default_factory=dict)
+    ROUTING: dict[str, Any] = field(default_factory=dict)
+    SKIP_LOOKAHEAD: int = 90
+    SYNC_LEASE_TTL: int = 300
+    SYNC_NAMESPACE: str | None = None
+    SYNC_ON_STARTUP: bool = False
     TASKS: list[dict[str, Any]] = field(default_factory=list)
+    TIMEOUTS: dict[str, Any] = field(default_factory=dict)
+    TOMBSTONE_RETENTION: timedelta = timedelta(days=7)
 
     @override
     def __getattribute__(self, __name: str) -> object:
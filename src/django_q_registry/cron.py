@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import functools
+import itertools
+from dataclasses import dataclass
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from datetime import tzinfo
+
+from django.utils import timezone
+from django_q.conf import croniter
+
+ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+MONTHS = [
+    "jan",
+    "feb",
+    "mar",
+    "apr",
+    "may",
+    "jun",
+    "jul",
+    "aug",
+    "sep",
+    "oct",
+    "nov",
+    "dec",
+]
+WEEKDAYS = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]
+
+MONTH_NAMES = {name: number for number, name in enumerate(MONTHS, start=1)}
+
+WEEKDAY_NAMES = {name: number for number, name in enumerate(WEEKDAYS)}
+
+# how far ahead `CronExpression.next_after` looks, enough for expressions that only match on leap days
+MAX_LOOKAHEAD = timedelta(days=366 * 8)
+
+
+@dataclass(frozen=True)
+class CronExpression:
+    """
+    A parsed, five field cron expression, as used by `django_q.models.Schedule.CRON` schedules.
+
+    Supports `*`, ranges, steps, lists, month and weekday names, and the `@hourly` style aliases. When
+    both the day of month and the day of week are restricted, a day matches if either does, like cron
+    and croniter. Times are evaluated in the current Django time zone, like the Django Q scheduler.
+
+    Unlike croniter, this does not support a seconds field or the `L`, `W`, and `#` modifiers.
+
+    Use `parse` to create one.
+    """
+
+    expression: str
+    minutes: tuple[int, ...]
+    hours: tuple[int, ...]
+    days: frozenset[int]
+    months: frozenset[int]
+    weekdays: frozenset[int]
+    day_restricted: bool
+    weekday_restricted: bool
+
+    def matches_day(self, day: date) -> bool:
+        if day.month not in self.months:
+            return False
+        day_match = day.day in self.days
+        # `date.weekday` starts the week on Monday, cron on Sunday
+        weekday_match = (day.weekday() + 1) % 7 in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return day_match or weekday_match
+        return day_match and weekday_match
+
+    def between(
+        self, start: datetime, end: datetime, tz: tzinfo | None = None
+    ) -> list[datetime]:
+        """
+        Returns every time this expression matches from `start` (inclusive) to `end` (exclusive).
+
+        Rather than stepping through the window minute by minute, each day is matched once and then
+        expanded to its hour and minute combinations, so the cost grows with the number of matches.
+        """
+        tz = tz or timezone.get_current_timezone()
+        times: list[datetime] = []
+        day = timezone.localtime(start, tz).date()
+        last_day = timezone.localtime(end, tz).date()
+        while day <= last_day:
+            if self.matches_day(day):
+                times.extend(
+                    run_time
+                    for hour in self.hours
+                    for minute in self.minutes
+                    if start
+                    <= (
+                        run_time := datetime(
+                            day.year, day.month, day.day, hour, minute, tzinfo=tz
+                        )
+                    )
+                    < end
+                )
+            day += timedelta(days=1)
+        return times
+
+    def next_after(self, after: datetime, tz: tzinfo | None = None) -> datetime:
+        """
+        Returns the first time this expression matches after `after`.
+
+        Raises:
+            ValueError: If the expression never matches, e.g. `0 0 31 2 *`.
+        """
+        tz = tz or timezone.get_current_timezone()
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        window = timedelta(days=31)
+        while window <= MAX_LOOKAHEAD:
+            times = self.between(start, start + window, tz)
+            if times:
+                return times[0]
+            start += window
+            window *= 2
+        msg = f"Cron expression {self.expression!r} never matches."
+        raise ValueError(msg)
+
+
+@functools.lru_cache(maxsize=1024)
+def parse(expression: str) -> CronExpression:
+    """
+    Parse a five field cron expression.
+
+    Raises:
+        ValueError: If `expression` is not a valid cron expression.
+    """
+    fields = ALIASES.get(expression.strip().lower(), expression).split()
+    if len(fields) != 5:
+        msg = f"Cron expression {expression!r} must have 5 fields, got {len(fields)}."
+        raise ValueError(msg)
+
+    minute, hour, day, month, weekday = fields
+    return CronExpression(
+        expression=expression,
+        minutes=tuple(sorted(_parse_field(minute, 0, 59))),
+        hours=tuple(sorted(_parse_field(hour, 0, 23))),
+        days=frozenset(_parse_field(day, 1, 31)),
+        months=frozenset(_parse_field(month, 1, 12, MONTH_NAMES)),
+        # 7 is Sunday as well
+        weekdays=frozenset(
+            value % 7 for value in _parse_field(weekday, 0, 7, WEEKDAY_NAMES)
+        ),
+        day_restricted=day not in ("*", "?"),
+        weekday_restricted=weekday not in ("*", "?"),
+    )
+
+
+def is_valid(expression: str) -> bool:
+    try:
+        parse(expression)
+    except ValueError:
+        return False
+    return True
+
+
+def validate(expression: str) -> None:
+    """
+    Raise a `ValueError` if the Django Q scheduler cannot evaluate `expression`.
+
+    An expression is valid if `parse` accepts it, or, if croniter is installed, if croniter accepts it,
+    so that its extensions keep working.
+    """
+    try:
+        parse(expression)
+    except ValueError:
+        if croniter is None or not croniter.is_valid(expression):
+            raise
+
+
+def get_next(expression: str, after: datetime) -> datetime:
+    """
+    Returns the first time `expression` matches after `after`, as the Django Q scheduler evaluates it.
+
+    Expressions are evaluated with `parse`, and only fall back to croniter, if it is installed, for the
+    extensions `parse` does not support.
+    """
+    try:
+        cron_expression = parse(expression)
+    except ValueError:
+        if croniter is None:
+            raise
+        return croniter(expression, timezone.localtime(after)).get_next(datetime)
+    return cron_expression.next_after(after)
+
+
+def between(expression: str, start: datetime, end: datetime) -> list[datetime]:
+    """
+    Returns every time `expression` matches from `start` (inclusive) to `end` (exclusive), as the
+    Django Q scheduler evaluates it.
+
+    Expressions are evaluated with `parse`, a day at a time, and only fall back to croniter, if it is
+    installed, for the extensions `parse` does not support, such as `L`, `#` and a seconds field.
+
+    Raises:
+        ValueError: If `expression` is not a valid cron expression.
+    """
+    try:
+        cron_expression = parse(expression)
+    except ValueError:
+        validate(expression)
+        # `get_next` is exclusive, so start just before `start`
+        times = croniter(
+            expression, timezone.localtime(start) - timedelta(microseconds=1)
+        ).all_next(datetime)
+        return list(itertools.takewhile(lambda run_time: run_time < end, times))
+    return cron_expression.between(start, end)
+
+
+def _parse_field(
+    field: str, lowest: int, highest: int, names: dict[str, int] | None = None
+) -> set[int]:
+    values: set[int] = set()
+    for part in field.split(","):
+        step = None
+        if "/" in part:
+            part, step_value = part.split("/", 1)
+            step = _parse_value(step_value, 1, highest - lowest + 1)
+
+        if part in ("*", "?"):
+            first, last = lowest, highest
+        elif "-" in part:
+            first_value, last_value = part.split("-", 1)
+            first = _parse_value(first_value, lowest, highest, names)
+            last = _parse_value(last_value, lowest, highest, names)
+            if first > last:
+                msg = f"Invalid cron range {part!r}."
+                raise ValueError(msg)
+        else:
+            first = _parse_value(part, lowest, highest, names)
+            # `5/15` means every 15 starting at 5
+            last = first if step is None else highest
+
+        values.update(range(first, last + 1, step or 1))
+    return values
+
+
+def _parse_value(
+    value: str, lowest: int, highest: int, names: dict[str, int] | None = None
+) -> int:
+    if names and value.lower() in names:
+        return names[value.lower()]
+    try:
+        number = int(value)
+    except ValueError:
+        msg = f"Invalid cron value {value!r}."
+        raise ValueError(msg) from None
+    if not lowest <= number <= highest:
+        msg = f"Cron value {number} is out of range {lowest}-{highest}."
+        raise ValueError(msg)
+    return number
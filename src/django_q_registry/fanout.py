@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import importlib
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from django.db import models
+from django.utils import timezone
+from django_q.brokers import get_broker
+from django_q.brokers.orm import ORM
+from django_q.conf import Conf
+from django_q.humanhash import uuid
+from django_q.models import OrmQ
+from django_q.models import Task as QTask
+from django_q.signals import pre_enqueue
+from django_q.signing import SignedPackage
+from django_q.tasks import async_task
+
+from django_q_registry.models import FanoutDispatch
+from django_q_registry.registry import registry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Fanout:
+    """
+    Split a registered task over a large queryset into chunks that run in parallel across the cluster.
+
+    When a task is registered with `fanout=Fanout(...)`, its `django_q.models.Schedule` runs `dispatch`
+    instead of the task itself. `dispatch` splits `queryset` into primary key ranges of `chunk_size`
+    rows and enqueues one sub-task per range. Each sub-task calls the registered function with the slice of `queryset` in
+    its range. Once every sub-task has finished successfully, `reducer` is called with the list of
+    their return values.
+
+    Example:
+
+        from django_q.models import Schedule
+
+        from django_q_registry import register_task
+        from django_q_registry.fanout import Fanout
+
+
+        @register_task(
+            schedule_type=Schedule.DAILY,
+            fanout=Fanout(
+                queryset=lambda: Order.objects.filter(archived=False),
+                chunk_size=10_000,
+                reducer="myapp.tasks.report_totals",
+            ),
+        )
+        def archive_orders(orders):
+            return orders.update(archived=True)
+
+    Args:
+        queryset:
+            The queryset to split, or a callable returning it.
+        chunk_size:
+            The number of rows in each chunk. Rows added to `queryset` after `dispatch` are only picked
+            up by the last chunk, so it may hold more.
+        reducer:
+            Optional callable, or dotted path to one, that is called with the list of the sub-tasks'
+            return values. Sub-task results must be saved for this to work, so it does not run when
+            `Q_CLUSTER["save_limit"]` is negative.
+    """
+
+    queryset: models.QuerySet[Any] | Callable[[], models.QuerySet[Any]]
+    chunk_size: int = 1000
+    reducer: Callable[[list[Any]], Any] | str | None = None
+
+    def get_queryset(self) -> models.QuerySet[Any]:
+        if callable(self.queryset):
+            return self.queryset()
+        return self.queryset.all()
+
+    def chunks(self) -> list[tuple[Any, Any | None]]:
+        """
+        Returns `(start, end)` primary key ranges that split `queryset` into chunks of `chunk_size` rows,
+        with `start` inclusive and `end` exclusive, or `None` for the last range.
+
+        The ranges are found with one keyset query per chunk, which seeks to the start of the chunk
+        through the primary key index, so sparse tables and filtered querysets do not produce empty
+        chunks.
+        """
+        pks = self.get_queryset().order_by("pk").values_list("pk", flat=True)
+        starts = []
+        start = pks.first()
+        while start is not None:
+            starts.append(start)
+            start = next(
+                iter(pks.filter(pk__gte=start)[self.chunk_size : self.chunk_size + 1]),
+                None,
+            )
+        if not starts:
+            return []
+        return list(zip(starts, [*starts[1:], None], strict=True))
+
+
+def dispatch(schedule_name: str) -> int:
+    """
+    Entry point of the `django_q.models.Schedule` of a fan-out task. Enqueues one `run_chunk` sub-task
+    per chunk of the task's queryset, all in the same group, see `enqueue_many`.
+
+    Returns:
+        The number of sub-tasks enqueued.
+    """
+    task = _get_fanout_task(schedule_name)
+    chunks = task.fanout.chunks()
+    group = f"{schedule_name[:55]} - fanout {uuid()[1]}"
+    total = len(chunks)
+
+    q_options = {"group": group}
+    if task.fanout.reducer and chunks:
+        FanoutDispatch.objects.create(group=group)
+        q_options["hook"] = "django_q_registry.fanout.reduce_hook"
+
+    enqueue_many(
+        "django_q_registry.fanout.run_chunk",
+        [(schedule_name, start, end, total) for start, end in chunks],
+        q_options=q_options,
+    )
+    return total
+
+
+def enqueue_many(
+    func: str, args_list: list[tuple[Any, ...]], q_options: dict[str, Any]
+) -> list[str]:
+    """
+    Enqueue one task per item of `args_list`, like calling `django_q.tasks.async_task` for each of them,
+    but with a single insert when Django Q uses its ORM broker, rather than one round-trip per task.
+
+    Each package is built and signalled with `django_q.signals.pre_enqueue` the way `async_task` does it.
+    Other brokers have no bulk enqueue, so their packages are pushed one by one, and in sync mode each
+    task runs through `async_task` as usual.
+
+    Returns:
+        The ids of the enqueued tasks.
+    """
+    if q_options.get("sync", Conf.SYNC):
+        return [async_task(func, *args, q_options=q_options) for args in args_list]
+
+    packages = []
+    ids = []
+    for args in args_list:
+        name, task_id = uuid()
+        task = {"id": task_id, "name": name, "func": func, "args": args, **q_options}
+        if "cached" not in task and Conf.CACHED:
+            task["cached"] = Conf.CACHED
+        if "ack_failure" not in task and Conf.ACK_FAILURES:
+            task["ack_failure"] = Conf.ACK_FAILURES
+        task["kwargs"] = {}
+        task["started"] = timezone.now()
+        pre_enqueue.send(sender="django_q", task=task)
+        packages.append(SignedPackage.dumps(task))
+        ids.append(task_id)
+
+    broker = get_broker(q_options.get("cluster"))
+    if isinstance(broker, ORM):
+        lock = timezone.now()
+        broker.get_connection().bulk_create(
+            OrmQ(key=broker.list_key or Conf.CLUSTER_NAME, payload=package, lock=lock)
+            for package in packages
+        )
+    else:
+        for package in packages:
+            broker.enqueue(package)
+    return ids
+
+
+def run_chunk(schedule_name: str, start: Any, end: Any | None, total: int) -> Any:
+    """
+    Call the registered function of a fan-out task with the slice of its queryset between `start`
+    (inclusive) and `end` (exclusive), or to the end of the queryset if `end` is `None`.
+    """
+    task = _get_fanout_task(schedule_name)
+    module_path, function_name = task.func.rsplit(".", 1)
+    func = getattr(importlib.import_module(module_path), function_name)
+    queryset = task.fanout.get_queryset().filter(pk__gte=start)
+    if end is not None:
+        queryset = queryset.filter(pk__lt=end)
+    return func(queryset)
+
+
+def reduce_hook(q_task: QTask) -> None:
+    """
+    Hook of every fan-out sub-task. Runs the reducer once all sub-tasks in the group have finished.
+
+    Django Q calls a hook after saving the result of its sub-task, so the hook of whichever result is
+    saved last sees all of them. Hooks that see all results race to delete the `FanoutDispatch` of the
+    group, and only the one that deletes it runs the reducer, so it runs exactly once even when several
+    clusters save sub-task results at the same time. If any sub-task failed, the reducer is skipped.
+    """
+    schedule_name, _, _, total = q_task.args
+    runs = QTask.objects.filter(group=q_task.group)
+
+    if runs.count() < total:
+        return
+    deleted, _ = FanoutDispatch.objects.filter(group=q_task.group).delete()
+    if not deleted:
+        return
+    if runs.filter(success=False).exists():
+        logger.error("Skipping reducer of %s, some chunks failed", schedule_name)
+        return
+
+    reducer = _get_fanout_task(schedule_name).fanout.reducer
+    if isinstance(reducer, str):
+        module_path, function_name = reducer.rsplit(".", 1)
+        reducer = getattr(importlib.import_module(module_path), function_name)
+    reducer(list(runs.order_by("started").values_list("result", flat=True)))
+
+
+def _get_fanout_task(schedule_name: str):
+    task = registry.find_by_schedule_name(schedule_name)
+    if task is None or task.fanout is None:
+        msg = f"No fan-out task is registered for schedule {schedule_name}."
+        raise LookupError(msg)
+    return task
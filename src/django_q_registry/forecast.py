@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import itertools
+import logging
+from collections import Counter
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import datetime
+from datetime import timedelta
+from typing import TYPE_CHECKING
+from typing import Any
+
+from django.utils import timezone
+from django_q.conf import Conf
+from django_q.models import Schedule
+from django_q.utils import add_months
+
+from django_q_registry import cron
+
+if TYPE_CHECKING:
+    from django_q_registry.models import Task
+
+logger = logging.getLogger(__name__)
+INTERVALS = {
+    Schedule.HOURLY: timedelta(hours=1),
+    Schedule.DAILY: timedelta(days=1),
+    Schedule.WEEKLY: timedelta(weeks=1),
+    Schedule.BIWEEKLY: timedelta(weeks=2),
+}
+
+MONTH_INTERVALS = {
+    Schedule.MONTHLY: 1,
+    Schedule.BIMONTHLY: 2,
+    Schedule.QUARTERLY: 3,
+    Schedule.YEARLY: 12,
+}
+
+
+def get_run_times(
+    tasks: Iterable[Task], start: datetime, end: datetime
+) -> dict[Task, list[datetime]]:
+    """
+    Returns the times each of the in-memory `tasks` runs from `start` (inclusive) to `end` (exclusive),
+    according to the `django_q.models.Schedule` it is registered with.
+
+    Tasks that share a schedule are expanded once. Tasks registered `after` another task, or with only
+    a `trigger`, have no schedule and never run on their own.
+
+    Tasks with a `next_run` in the past are forecast from the next time on their cadence at or after
+    `start`. Tasks without a `next_run` run first at `start`, as their `Schedule` would run as soon as
+    it is created.
+
+    Tasks whose cron expression cannot be evaluated here, e.g. one using a croniter extension when
+    croniter is not installed, are logged and left out.
+    """
+    tasks_by_spec: dict[tuple[Any, ...], list[Task]] = defaultdict(list)
+    for task in tasks:
+        if task.is_periodic:
+            tasks_by_spec[_get_spec(task, start)].append(task)
+
+    run_times = {}
+    for spec, spec_tasks in tasks_by_spec.items():
+        try:
+            times = _expand(spec, start, end)
+        except ValueError as error:
+            logger.warning(
+                "Cannot forecast %s: %s", ", ".join(map(str, spec_tasks)), error
+            )
+            continue
+        for task in spec_tasks:
+            run_times[task] = times
+    return run_times
+
+
+def get_histogram(
+    tasks: Iterable[Task], start: datetime, end: datetime
+) -> Counter[datetime]:
+    """
+    Returns how many of `tasks` run in each minute from `start` to `end`, see `get_run_times`. Minutes
+    without any runs are left out.
+    """
+    histogram: Counter[datetime] = Counter()
+    for times in get_run_times(tasks, start, end).values():
+        histogram.update(
+            run_time.replace(second=0, microsecond=0) for run_time in times
+        )
+    return histogram
+
+
+def get_next_runs(tasks: Iterable[Task], after: datetime) -> dict[Task, datetime]:
+    """
+    Returns when each of the in-memory `tasks` with a repeating schedule and no `next_run` of its own
+    should first run after `after`: the next match of its cron expression, or one interval after
+    `after`.
+
+    Tasks that share a schedule are only evaluated once.
+    """
+    next_runs_by_spec: dict[tuple[Any, ...], datetime] = {}
+    next_runs = {}
+    for task in tasks:
+        schedule_type = task.kwargs.get("schedule_type", Schedule.ONCE)
+        if (
+            not task.is_periodic
+            or schedule_type == Schedule.ONCE
+            or task.kwargs.get("next_run")
+        ):
+            continue
+
+        spec = (schedule_type, task.kwargs.get("cron"), task.kwargs.get("minutes"))
+        if spec not in next_runs_by_spec:
+            next_runs_by_spec[spec] = _get_next_run(*spec, after=after)
+        next_runs[task] = next_runs_by_spec[spec]
+    return next_runs
+
+
+def get_following_run(schedule: Schedule, now: datetime) -> datetime:
+    """
+    Returns the `next_run` that `schedule` moves on to once its current `next_run` has run, like the
+    Django Q scheduler: one step past it, or past `now` if it is overdue and `Q_CLUSTER["catch_up"]`
+    is off.
+
+    Unlike `django_q.models.Schedule.calculate_next_run`, which evaluates cron expressions from the
+    current time whatever run it is given, cron schedules step from their own `next_run` too, and do
+    not need croniter.
+    """
+    if schedule.schedule_type == Schedule.CRON:
+        next_run = cron.get_next(schedule.cron or "", schedule.next_run)
+        if not Conf.CATCH_UP and next_run <= now:
+            next_run = cron.get_next(schedule.cron or "", now)
+        return next_run
+
+    next_run = schedule.calculate_next_run(schedule.next_run)
+    while not Conf.CATCH_UP and next_run <= now:
+        next_run = schedule.calculate_next_run(next_run)
+    return next_run
+
+
+def _get_next_run(
+    schedule_type: str,
+    cron_expression: str | None,
+    minutes: int | None,
+    after: datetime,
+) -> datetime:
+    if schedule_type == Schedule.CRON:
+        return cron.get_next(cron_expression or "", after)
+    if schedule_type in MONTH_INTERVALS:
+        local_after = timezone.localtime(after).replace(tzinfo=None)
+        return timezone.make_aware(
+            add_months(local_after, MONTH_INTERVALS[schedule_type])
+        )
+    if schedule_type == Schedule.MINUTES:
+        return after + timedelta(minutes=minutes or 1)
+    return after + INTERVALS[schedule_type]
+
+
+def _get_spec(task: Task, start: datetime) -> tuple[Any, ...]:
+    next_run = task.kwargs.get("next_run") or start
+    if timezone.is_naive(next_run):
+        next_run = timezone.make_aware(next_run)
+    return (
+        task.kwargs.get("schedule_type", Schedule.ONCE),
+        task.kwargs.get("cron"),
+        task.kwargs.get("minutes"),
+        task.kwargs.get("repeats", -1),
+        next_run,
+    )
+
+
+def _expand(spec: tuple[Any, ...], start: datetime, end: datetime) -> list[datetime]:
+    schedule_type, cron_expression, minutes, repeats, next_run = spec
+    if repeats == 0:
+        return []
+
+    if schedule_type == Schedule.CRON:
+        times = cron.between(cron_expression or "", max(start, next_run), end)
+        return times[:repeats] if repeats > 0 else times
+
+    if schedule_type == Schedule.ONCE:
+        return [next_run] if start <= next_run < end else []
+
+    if schedule_type in MONTH_INTERVALS:
+        # months vary in length, so step through them from `next_run`
+        months = MONTH_INTERVALS[schedule_type]
+        local_next_run = timezone.localtime(next_run).replace(tzinfo=None)
+        times = []
+        counts = range(repeats) if repeats > 0 else itertools.count()
+        for count in counts:
+            run_time = timezone.make_aware(add_months(local_next_run, months * count))
+            if run_time >= end:
+                break
+            if run_time >= start:
+                times.append(run_time)
+        return times
+
+    if schedule_type == Schedule.MINUTES:
+        step = timedelta(minutes=minutes or 1)
+    else:
+        step = INTERVALS[schedule_type]
+
+    skipped = max(0, -((next_run - start) // step))
+    count = max(0, -((next_run + skipped * step - end) // step))
+    if repeats > 0:
+        count = max(0, min(count, repeats - skipped))
+
+    if step < timedelta(days=1):
+        return [next_run + (skipped + i) * step for i in range(count)]
+
+    # like the Django Q scheduler, keep day based schedules at the same local time across DST changes
+    local_next_run = timezone.localtime(next_run).replace(tzinfo=None)
+    return [
+        timezone.make_aware(local_next_run + (skipped + i) * step) for i in range(count)
+    ]
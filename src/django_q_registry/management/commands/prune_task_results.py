@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from django_q_registry.models import Task
+
+
+class Command(BaseCommand):
+    help = "Delete old results of registered tasks, according to their `retain` and `keep_last` options."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Maximum number of results to delete in a single query.",
+        )
+
+    def handle(self, *args, **options):
+        deleted = Task.objects.prune_results(chunk_size=options["chunk_size"])
+        self.stdout.write(f"Deleted {deleted} task result(s).")
@@ -1,14 +1,200 @@
 from __future__ import annotations
 
+import asyncio
+import os
+import sys
+import time
+from collections.abc import Iterable
+
+from asgiref.sync import sync_to_async
 from django.core.management.base import BaseCommand
 
 from django_q_registry.models import Task
+from django_q_registry.models import _get_key
+from django_q_registry.models import _get_lookup
 from django_q_registry.registry import registry
+from django_q_registry.routing import get_routes
 
 
 class Command(BaseCommand):
     help = "Save all registered tasks to the database, create or update the associated schedules, and delete any dangling tasks and schedules."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            help="Database alias to save tasks and schedules to. Defaults to the one the database routers pick.",
+        )
+        parser.add_argument(
+            "--read-database",
+            help="Database alias, e.g. a replica, to read existing schedules and task runtimes from. Defaults to --database.",
+        )
+        parser.add_argument(
+            "--namespace",
+            help="Only save and clean up the tasks registered in this namespace, leaving the tasks of other namespaces alone. Defaults to all tasks.",
+        )
+        parser.add_argument(
+            "--generation",
+            help="The release running this command, e.g. a commit SHA. Tasks of the newest Q_REGISTRY['KEEP_GENERATIONS'] releases are kept, and other tasks that are no longer registered are tombstoned rather than deleted. Defaults to Q_REGISTRY['GENERATION'].",
+        )
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="use_async",
+            help="Sync the registry with Django's async ORM interface, in an event loop.",
+        )
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="For development: after syncing, watch the autodiscovered tasks modules and, when one changes, reload only that module and save or delete only the tasks that changed.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.5,
+            help="How often --watch checks the tasks modules for changes, in seconds. Defaults to 0.5.",
+        )
+
     def handle(self, *args, **kwargs):
-        Task.objects.create_from_registry(registry)
-        Task.objects.delete_dangling_objects(registry)
+        if kwargs.get("use_async"):
+            asyncio.run(self.ahandle(**kwargs))
+        else:
+            self.sync(**kwargs)
+
+        if kwargs.get("watch"):
+            self.watch(**kwargs)
+
+    def sync(self, **kwargs):
+        using = kwargs.get("database")
+        read_using = kwargs.get("read_database") or using
+        namespace = kwargs.get("namespace")
+        generation = kwargs.get("generation")
+
+        routes = get_routes(self.get_tasks(namespace), using=read_using)
+        self.write_routes(routes, **kwargs)
+
+        Task.objects.create_from_registry(
+            registry,
+            routes=routes,
+            using=using,
+            read_using=read_using,
+            namespace=namespace,
+            generation=generation,
+        )
+        Task.objects.delete_dangling_objects(
+            registry, using=using, namespace=namespace, generation=generation
+        )
+
+    async def ahandle(self, **kwargs):
+        using = kwargs.get("database")
+        read_using = kwargs.get("read_database") or using
+        namespace = kwargs.get("namespace")
+        generation = kwargs.get("generation")
+
+        routes = await sync_to_async(get_routes)(
+            self.get_tasks(namespace), using=read_using
+        )
+        self.write_routes(routes, **kwargs)
+
+        await Task.objects.acreate_from_registry(
+            registry,
+            routes=routes,
+            using=using,
+            read_using=read_using,
+            namespace=namespace,
+            generation=generation,
+        )
+        await Task.objects.adelete_dangling_objects(
+            registry, using=using, namespace=namespace, generation=generation
+        )
+
+    def watch(self, **kwargs):
+        mtimes = get_mtimes(registry.autodiscover_tasks())
+        self.stdout.write(f"Watching {len(mtimes)} tasks module(s) for changes.")
+        try:
+            while True:
+                time.sleep(kwargs.get("interval") or 0.5)
+                mtimes = self.reload_changed(mtimes, **kwargs)
+        except KeyboardInterrupt:
+            pass
+
+    def reload_changed(self, mtimes, **kwargs):
+        """
+        Reload the tasks modules whose files changed since `mtimes` were taken, and sync only the tasks
+        that changed in them. The tasks of a module whose file was deleted are all removed, until the
+        file comes back. Returns the new modification times.
+        """
+        new_mtimes = get_mtimes(mtimes)
+        for module_name, mtime in new_mtimes.items():
+            if mtime == mtimes[module_name]:
+                continue
+
+            if mtime is None:
+                removed = registry.unload_module(module_name)
+                self.sync_changes(removed, set(), **kwargs)
+                self.stdout.write(f"Removed {module_name}: {len(removed)} removed")
+                continue
+
+            try:
+                removed, changed = registry.reload_module(module_name)
+            except Exception as err:
+                self.stderr.write(f"Could not reload {module_name}: {err!r}")
+                continue
+
+            self.sync_changes(removed, changed, **kwargs)
+            self.stdout.write(
+                f"Reloaded {module_name}: {len(changed)} saved, {len(removed)} removed"
+            )
+        return new_mtimes
+
+    def sync_changes(self, removed, changed, **kwargs):
+        using = kwargs.get("database")
+        read_using = kwargs.get("read_database") or using
+        namespace = kwargs.get("namespace")
+        generation = kwargs.get("generation")
+
+        if changed:
+            Task.objects.create_from_registry(
+                registry,
+                using=using,
+                read_using=read_using,
+                namespace=namespace,
+                generation=generation,
+                only=changed,
+            )
+        if removed:
+            removed_keys = {_get_key(_get_lookup(task)) for task in removed}
+            registry.update_created_tasks(
+                obj
+                for obj in registry.created_tasks
+                if _get_key(obj) not in removed_keys
+            )
+            Task.objects.delete_dangling_objects(
+                registry, using=using, namespace=namespace, generation=generation
+            )
+
+    def get_tasks(self, namespace):
+        if namespace is None:
+            return registry.registered_tasks
+        return registry.filter(namespace=namespace)
+
+    def write_routes(self, routes, **kwargs):
+        if kwargs.get("verbosity", 1) >= 2:
+            for task, cluster in sorted(routes.items(), key=lambda item: item[0].name):
+                self.stdout.write(f"{task.name} -> {cluster or 'default cluster'}")
+
+
+def get_mtimes(modules: Iterable[str]) -> dict[str, int | None]:
+    """
+    Returns the modification time of the file of each of the imported `modules`, or `None` if the file
+    no longer exists, skipping modules without one.
+    """
+    mtimes: dict[str, int | None] = {}
+    for module_name in modules:
+        path = getattr(sys.modules.get(module_name), "__file__", None)
+        if path is None:
+            continue
+        try:
+            mtimes[module_name] = os.stat(path).st_mtime_ns
+        except OSError:
+            mtimes[module_name] = None
+    return mtimes
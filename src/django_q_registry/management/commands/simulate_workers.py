@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.utils import timezone
+from django_q.conf import Conf
+
+from django_q_registry.registry import registry
+from django_q_registry.routing import get_routes
+from django_q_registry.simulation import get_arrivals
+from django_q_registry.simulation import get_arrivals_by_cluster
+from django_q_registry.simulation import get_min_workers
+from django_q_registry.simulation import get_runtime_snapshot
+from django_q_registry.simulation import simulate
+from django_q_registry.simulation import simulate_clusters
+
+# how --cluster-workers refers to Django Q's default cluster
+DEFAULT_CLUSTER = "default"
+
+
+class Command(BaseCommand):
+    help = "Replay the coming runs of all registered tasks against a number of workers, and report queue waits, worker utilization, and the fewest workers that meet a wait target."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=Conf.WORKERS,
+            help="How many workers to simulate. Defaults to Q_CLUSTER['workers'].",
+        )
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=24,
+            help="How many hours of runs to replay.",
+        )
+        parser.add_argument(
+            "--start",
+            type=datetime.fromisoformat,
+            help="When to start the replay, as an ISO 8601 datetime. Defaults to now.",
+        )
+        parser.add_argument(
+            "--stats",
+            help="JSON file mapping task names to runtimes in seconds. Without it, historical runtimes are read from the database.",
+        )
+        parser.add_argument(
+            "--default-runtime",
+            type=float,
+            default=1.0,
+            help="Runtime in seconds of tasks without a known runtime.",
+        )
+        parser.add_argument(
+            "--target-wait",
+            type=float,
+            default=60.0,
+            help="Longest acceptable 95th percentile queue wait in seconds.",
+        )
+        parser.add_argument(
+            "--cluster-workers",
+            action="append",
+            metavar="CLUSTER=WORKERS",
+            help=f"Simulate each cluster the tasks are routed to, e.g. by priority, with its own queue and this many workers. Repeat for every cluster, and use '{DEFAULT_CLUSTER}' for Django Q's default cluster.",
+        )
+        parser.add_argument(
+            "--dump-stats",
+            help="Write the historical runtimes from the database to this JSON file, for use with --stats, and exit.",
+        )
+
+    def handle(self, *args, **options):
+        if options.get("dump_stats"):
+            snapshot = get_runtime_snapshot(registry.registered_tasks)
+            with open(options["dump_stats"], "w") as f:
+                json.dump(snapshot, f, indent=2, sort_keys=True)
+            self.stdout.write(
+                f"Wrote runtimes of {len(snapshot)} task(s) to {options['dump_stats']}."
+            )
+            return
+
+        if options.get("stats"):
+            with open(options["stats"]) as f:
+                runtimes = json.load(f)
+        else:
+            runtimes = get_runtime_snapshot(registry.registered_tasks)
+
+        start = options.get("start") or timezone.now()
+        if timezone.is_naive(start):
+            start = timezone.make_aware(start)
+        end = start + timedelta(hours=options.get("hours", 24))
+
+        if options.get("cluster_workers"):
+            self.handle_clusters(runtimes, start, end, options)
+            return
+
+        try:
+            arrivals = get_arrivals(
+                registry.registered_tasks,
+                start,
+                end,
+                runtimes,
+                default_runtime=options.get("default_runtime", 1.0),
+            )
+            result = simulate(arrivals, options.get("workers", Conf.WORKERS))
+        except ValueError as err:
+            raise CommandError(str(err)) from err
+
+        target_wait = options.get("target_wait", 60.0)
+        self.stdout.write(f"Runs: {result.runs}")
+        self.stdout.write(f"Workers: {result.workers}")
+        self.stdout.write(f"Mean wait: {result.mean_wait:.1f}s")
+        self.stdout.write(f"95th percentile wait: {result.p95_wait:.1f}s")
+        self.stdout.write(f"Max wait: {result.max_wait:.1f}s")
+        self.stdout.write(f"Utilization: {result.utilization:.1%}")
+        self.stdout.write(
+            f"Fewest workers for a {target_wait:g}s 95th percentile wait: {get_min_workers(arrivals, target_wait)}"
+        )
+
+    def handle_clusters(self, runtimes, start, end, options):
+        workers = {}
+        for value in options["cluster_workers"]:
+            cluster, _, count = value.rpartition("=")
+            try:
+                workers[None if cluster == DEFAULT_CLUSTER else cluster] = int(count)
+            except ValueError as err:
+                msg = f"--cluster-workers must be CLUSTER=WORKERS, got {value}."
+                raise CommandError(msg) from err
+
+        try:
+            arrivals = get_arrivals_by_cluster(
+                registry.registered_tasks,
+                start,
+                end,
+                runtimes,
+                get_routes(registry.registered_tasks),
+                default_runtime=options.get("default_runtime", 1.0),
+            )
+            results = simulate_clusters(arrivals, workers)
+        except ValueError as err:
+            raise CommandError(str(err)) from err
+
+        for cluster, result in sorted(
+            results.items(), key=lambda item: item[0] or DEFAULT_CLUSTER
+        ):
+            self.stdout.write(
+                f"{cluster or DEFAULT_CLUSTER}: {result.runs} runs on {result.workers} workers, "
+                f"{result.p95_wait:.1f}s 95th percentile wait, {result.max_wait:.1f}s max wait, "
+                f"{result.utilization:.1%} utilization"
+            )
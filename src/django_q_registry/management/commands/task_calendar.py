@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from datetime import datetime
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from django_q_registry.forecast import get_histogram
+from django_q_registry.registry import registry
+
+
+class Command(BaseCommand):
+    help = "Forecast how many registered tasks run in each minute of the coming hours, from the in-memory registry, and report the busiest minutes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=24,
+            help="How many hours ahead to forecast.",
+        )
+        parser.add_argument(
+            "--start",
+            type=datetime.fromisoformat,
+            help="When to start the forecast, as an ISO 8601 datetime. Defaults to now.",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=10,
+            help="How many of the busiest minutes to report.",
+        )
+
+    def handle(self, *args, **options):
+        start = options.get("start") or timezone.now()
+        if timezone.is_naive(start):
+            start = timezone.make_aware(start)
+        end = start + timedelta(hours=options.get("hours", 24))
+
+        try:
+            histogram = get_histogram(registry.registered_tasks, start, end)
+        except ValueError as err:
+            raise CommandError(str(err)) from err
+
+        if options.get("verbosity", 1) >= 2:
+            for minute, count in sorted(histogram.items()):
+                self.stdout.write(f"{_format(minute)}  {count:>4}  {'#' * count}")
+
+        total = sum(histogram.values())
+        self.stdout.write(
+            f"{total} run(s) from {_format(start)} to {_format(end)}, in {len(histogram)} minute(s)."
+        )
+        if histogram:
+            self.stdout.write("Busiest minutes:")
+        for minute, count in histogram.most_common(options.get("top", 10)):
+            self.stdout.write(f"{_format(minute)}  {count}")
+
+
+def _format(value: datetime) -> str:
+    return timezone.localtime(value).strftime("%Y-%m-%d %H:%M")
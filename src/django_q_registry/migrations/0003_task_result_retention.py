@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_q_registry", "0002_task_paused"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="keep_last",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Only keep this many of the newest results of this task.",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="result_sample_rate",
+            field=models.FloatField(
+                blank=True,
+                help_text="Fraction of successful runs of this task to save a result for, between 0 and 1.",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="retain",
+            field=models.DurationField(
+                blank=True,
+                help_text="Delete results of this task older than this.",
+                null=True,
+            ),
+        ),
+    ]
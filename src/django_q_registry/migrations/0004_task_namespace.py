@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_q_registry", "0003_task_result_retention"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="namespace",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                default="",
+                help_text="Only synced and cleaned up by setup_periodic_tasks runs for this namespace.",
+                max_length=100,
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_q_registry", "0004_task_namespace"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Generation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="deleted_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When this task was tombstoned, after no recent release registered it.",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="generation",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="The newest release that registered this task.",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="tasks",
+                to="django_q_registry.generation",
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations, models
+
+# An index on the results table of Django Q, which is not ours to change with `AddIndex`, so that the
+# results of a schedule can be read newest first, and pruned oldest first, without a full table scan.
+# See `TaskQuerySet.prune_results` and `django_q_registry.admin.add_run_stats`.
+INDEX = models.Index(
+    fields=["group", "stopped"],
+    include=["success"],
+    name="qregistry_group_stopped_idx",
+)
+
+
+def add_index(apps, schema_editor):
+    schema_editor.add_index(apps.get_model("django_q", "Task"), INDEX)
+
+
+def remove_index(apps, schema_editor):
+    schema_editor.remove_index(apps.get_model("django_q", "Task"), INDEX)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_q", "0017_task_cluster_alter"),
+        ("django_q_registry", "0007_fanoutdispatch"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_index, remove_index),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_q_registry", "0008_result_group_stopped_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PoolSlot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("pool", models.CharField(max_length=100)),
+                ("slot", models.PositiveIntegerField()),
+                ("holder", models.CharField(blank=True, max_length=64)),
+                ("expires_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("pool", "slot"), name="qregistry_unique_pool_slot"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,21 +1,82 @@
 from __future__ import annotations
 
+import ast
+import contextlib
+import inspect
 import json
 import logging
 from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from datetime import datetime
+from datetime import timedelta
+from typing import TYPE_CHECKING
 from typing import Any
 
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
 from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
 from django.db import models
+from django.db import router
+from django.db.models.functions import Coalesce
+from django.db.models.functions import Greatest
+from django.utils import timezone
 from django_q.models import Schedule
+from django_q.models import Task as QTask
+from django_q.tasks import async_task
 
+from django_q_registry import cron
+from django_q_registry._cache import make_key
+from django_q_registry.chains import get_task_by_name
 from django_q_registry.conf import app_settings
+from django_q_registry.forecast import get_next_runs
 from django_q_registry.registry import TaskRegistry
+from django_q_registry.routing import get_routes
+from django_q_registry.signals import task_created
+from django_q_registry.signals import task_deleted
+from django_q_registry.signals import task_updated
+from django_q_registry.timeouts import AUTO
+from django_q_registry.timeouts import get_timeouts
+from django_q_registry.timeouts import parse_kwargs
+from django_q_registry.timeouts import set_timeout
+from django_q_registry.tracing import SyncStats
+from django_q_registry.tracing import async_sync_signals
+from django_q_registry.tracing import sync_signals
+
+if TYPE_CHECKING:
+    from django_q_registry.fanout import Fanout
+    from django_q_registry.triggers import Trigger
 
 logger = logging.getLogger(__name__)
 
+# `Task` fields that can be passed when registering a task, but are options for the registry itself
+# rather than `django_q.models.Schedule` fields
+TASK_OPTIONS = (
+    "retain",
+    "keep_last",
+    "result_sample_rate",
+    "namespace",
+)
+
+# options that can be passed when registering a task, but only live on the in-memory `Task` in the
+# `TaskRegistry`, as they are not serializable to the database
+RUNTIME_OPTIONS = (
+    "fanout",
+    "skip_if",
+    "trigger",
+    "debounce",
+    "after",
+    "pool",
+    "priority",
+)
+
 
 class TaskQuerySet(models.QuerySet["Task"]):
+    def _get_write_alias(self, using: str | None) -> str:
+        # `QuerySet._db` is only set by `QuerySet.using`, otherwise the database routers decide
+        return using or self._db or router.db_for_write(self.model)  # type: ignore[attr-defined]
+
     def create_in_memory(
         self, func: Callable[..., Any], kwargs: dict[str, Any]
     ) -> Task:
@@ -36,7 +97,10 @@ class TaskQuerySet(models.QuerySet["Task"]):
                 instance for the `Task` instance. Corresponds to the remaining fields in
                 `django_q.models.Schedule`. One special case is the `name` field that can be passed in here to
                 specify the name of the `Task` and `Schedule` instance. If not passed in, the `name` field
-                will be set to the name of the `func`.
+                will be set to the name of the `func`. The other special cases are the registry options in
+                `TASK_OPTIONS`, which are set on the `Task` itself and not passed to the `Schedule`, and
+                `RUNTIME_OPTIONS`, which are set on the in-memory `Task` only. `queue` is accepted as an
+                alias of the `cluster` field.
 
                 Given the following `kwargs`:
 
@@ -72,13 +136,101 @@ class TaskQuerySet(models.QuerySet["Task"]):
             `django_q_registry.registry.TaskRegistry` to actually create the `Task` instance in the database.
         """
 
-        return Task(
+        options = {key: kwargs.pop(key) for key in TASK_OPTIONS if key in kwargs}
+
+        if "queue" in kwargs:
+            queue = kwargs.pop("queue")
+            if kwargs.setdefault("cluster", queue) != queue:
+                msg = "queue is an alias of cluster, they cannot both be set to different values."
+                raise ValueError(msg)
+        runtime_options = {
+            key: kwargs.pop(key) for key in RUNTIME_OPTIONS if key in kwargs
+        }
+
+        sample_rate = options.get("result_sample_rate")
+        if sample_rate is not None and not 0 <= sample_rate <= 1:
+            msg = f"result_sample_rate must be between 0 and 1, got {sample_rate}."
+            raise ValueError(msg)
+
+        # imported here to avoid a circular import, since these modules use the `registry`
+        from django_q_registry.fanout import Fanout
+        from django_q_registry.triggers import Trigger
+
+        fanout = runtime_options.get("fanout")
+        if fanout is not None and not isinstance(fanout, Fanout):
+            msg = f"fanout must be a {Fanout.__name__}, got {fanout!r}."
+            raise TypeError(msg)
+        if fanout is not None and inspect.iscoroutinefunction(func):
+            msg = "A fan-out task cannot be an async function."
+            raise ValueError(msg)
+
+        skip_if = runtime_options.get("skip_if")
+        if skip_if is not None and not (
+            callable(skip_if) or isinstance(skip_if, models.QuerySet)
+        ):
+            msg = f"skip_if must be a callable or a QuerySet, got {skip_if!r}."
+            raise TypeError(msg)
+
+        trigger = runtime_options.get("trigger")
+        if trigger is not None and not isinstance(trigger, Trigger):
+            msg = f"trigger must be a {Trigger.__name__}, got {trigger!r}."
+            raise TypeError(msg)
+        if "debounce" in runtime_options and trigger is None:
+            msg = "debounce can only be used together with trigger."
+            raise ValueError(msg)
+        if isinstance(runtime_options.get("debounce"), (int, float)):
+            runtime_options["debounce"] = timedelta(seconds=runtime_options["debounce"])
+        if "after" in runtime_options and "schedule_type" in kwargs:
+            msg = "A task registered with after is enqueued by its parent and cannot have a schedule_type."
+            raise ValueError(msg)
+
+        if kwargs.get("schedule_type") == Schedule.CRON:
+            cron.validate(kwargs.get("cron") or "")
+
+        if "timeout" in kwargs:
+            timeout = kwargs["timeout"]
+            if timeout != AUTO and not (
+                isinstance(timeout, int)
+                and not isinstance(timeout, bool)
+                and timeout > 0
+            ):
+                msg = f'timeout must be a positive number of seconds or "{AUTO}", got {timeout!r}.'
+                raise ValueError(msg)
+            parse_kwargs(kwargs.get("kwargs"))
+
+        pool = runtime_options.get("pool")
+        if pool is not None and pool not in app_settings.POOLS:
+            msg = f"Pool {pool} is not configured in Q_REGISTRY['POOLS']."
+            raise ValueError(msg)
+
+        priority = runtime_options.get("priority")
+        if priority is not None and priority not in app_settings.PRIORITIES:
+            msg = f"Priority {priority} is not configured in Q_REGISTRY['PRIORITIES']."
+            raise ValueError(msg)
+
+        task = Task(
             name=kwargs.pop("name", func.__name__),
             func=f"{func.__module__}.{func.__name__}",
             kwargs=kwargs,
+            **options,
         )
+        for key, value in runtime_options.items():
+            setattr(task, key, value)
+        # run on the worker's event loop, see `django_q_registry.aio`
+        task.is_async = inspect.iscoroutinefunction(func)
+
+        return task
 
-    def create_from_registry(self, registry: TaskRegistry) -> TaskQuerySet:
+    def create_from_registry(
+        self,
+        registry: TaskRegistry,
+        routes: dict[Task, str | None] | None = None,
+        using: str | None = None,
+        read_using: str | None = None,
+        namespace: str | None = None,
+        generation: str | None = None,
+        only: Iterable[Task] | None = None,
+    ) -> TaskQuerySet:
         """
         Given a `TaskRegistry` that contains a set of in-memory `Task` instances, save them to the database
         and add them to the `TaskRegistry.created_tasks` attribute.
@@ -97,42 +249,395 @@ class TaskQuerySet(models.QuerySet["Task"]):
             registry:
                 A TaskRegistry instance containing all of the `Task` instances that are currently registered
                 in-memory, but not yet in the database.
+            routes:
+                The Django Q cluster to run each `Task` on, as returned by
+                `django_q_registry.routing.get_routes`. If not passed in, it is computed from the
+                `Q_REGISTRY["ROUTING"]` setting.
+            using:
+                The database alias to save `Task` and `django_q.models.Schedule` instances to. Defaults to
+                the alias of this queryset, or the one the database routers pick for writes.
+            read_using:
+                The database alias, e.g. a replica, to read existing `Schedule` instances and the runtimes
+                used for routing from. Defaults to `using`. `Schedule` instances missing from it, e.g.
+                because of replication lag, are read from `using` instead.
+            namespace:
+                Only save the `Task` instances registered in this namespace. Defaults to all of them.
+            generation:
+                The release syncing the registry, e.g. a commit SHA. Saved `Task` instances are tagged
+                with it, except those already tagged with a newer generation, which are left as the newer
+                release saved them. Tombstoned `Task` instances that are registered again are revived
+                with their `next_run`. Defaults to `Q_REGISTRY["GENERATION"]`.
+            only:
+                Only save these registered `Task` instances, e.g. the ones of a tasks module that was
+                reloaded, see `TaskRegistry.reload_module`. They are added to `TaskRegistry.created_tasks`
+                rather than replacing it. Defaults to all of them.
 
         Returns:
             A TaskQuerySet containing all of the `Task` instances that were saved to the database.
         """
 
-        task_objs = []
+        using = self._get_write_alias(using)
+        read_using = read_using or using
 
-        for task in registry.registered_tasks:
-            if task.pk:
-                logger.error("Task %s has already been registered", task.pk)
-                continue
+        saved: dict[bool, list[Task]] = {True: [], False: []}
+        saved_stats = {True: SyncStats(), False: SyncStats()}
+        with sync_signals(
+            self.model, "create_from_registry", using, namespace
+        ) as stats:
+            tasks = _get_namespace_tasks(registry, namespace, only)
+            if routes is None:
+                routes = get_routes(tasks, using=read_using)
+            timeouts = get_timeouts(tasks, using=read_using)
+
+            generation_obj = None
+            newer_objs: dict[tuple[str, str, str], Task] = {}
+            if generation := generation or app_settings.GENERATION:
+                generation_obj, _ = Generation.objects.using(using).get_or_create(
+                    name=generation
+                )
+                newer_objs = {
+                    _get_key(obj): obj
+                    for obj in self.using(using).filter(
+                        generation__pk__gt=generation_obj.pk,
+                        name__in=[task.name for task in tasks],
+                    )
+                }
+
+            task_objs: dict[Task, Task] = {}
+            for task in _get_new_tasks(registry, tasks):
+                lookup = _get_lookup(task, generation_obj)
+                if _get_key(lookup) in newer_objs:
+                    continue
+                with (task_stats := SyncStats(rows=1)).measure(using):
+                    obj, created = self.using(using).update_or_create(**lookup)
+                saved[created].append(obj)
+                saved_stats[created].add(task_stats)
+                task_objs[task] = obj
+            revived_pks = [obj.pk for obj in task_objs.values() if obj.deleted_at]
+
+            schedule_pks = _get_schedule_pks(task_objs.values())
+            schedules = Schedule.objects.using(read_using).in_bulk(schedule_pks)
+            if missing_pks := set(schedule_pks) - schedules.keys():
+                schedules.update(Schedule.objects.using(using).in_bulk(missing_pks))
+            new_schedules, updates = _plan_schedules(
+                task_objs, schedules, routes, timeouts
+            )
+
+            for pk, schedule_dict in updates:
+                Schedule.objects.using(using).filter(pk=pk).update(**schedule_dict)
+
+            if new_schedules:
+                _create_schedules(list(new_schedules.values()), using)
+                for task_obj, schedule in new_schedules.items():
+                    task_obj.q_schedule = schedule
+                self.model.objects.using(using).bulk_update(
+                    new_schedules, ["q_schedule"]
+                )
+
+            if revived_pks:
+                self.using(using).filter(pk__in=revived_pks).update(
+                    **_get_revive_fields()
+                )
+
+            stats.rows = len(task_objs)
+            _send_saved(self.model, saved, saved_stats, using)
 
-            obj, _ = self.update_or_create(
-                name=task.name,
-                func=task.func,
-                kwargs=json.dumps(task.kwargs, cls=DjangoJSONEncoder),
+        return_qs = self.using(using).filter(
+            pk__in=[task_obj.pk for task_obj in task_objs.values()]
+            + [obj.pk for obj in newer_objs.values()]
+        )
+
+        if only is None:
+            registry.update_created_tasks(return_qs)
+        else:
+            registry.update_created_tasks([*registry.created_tasks, *return_qs])
+
+        return return_qs
+
+    async def acreate_from_registry(
+        self,
+        registry: TaskRegistry,
+        routes: dict[Task, str | None] | None = None,
+        using: str | None = None,
+        read_using: str | None = None,
+        namespace: str | None = None,
+        generation: str | None = None,
+        only: Iterable[Task] | None = None,
+    ) -> TaskQuerySet:
+        """
+        Async version of `create_from_registry`, built on Django's async ORM interface. It runs the same
+        queries, in the same order.
+        """
+
+        using = self._get_write_alias(using)
+        read_using = read_using or using
+
+        saved: dict[bool, list[Task]] = {True: [], False: []}
+        saved_stats = {True: SyncStats(), False: SyncStats()}
+        async with async_sync_signals(
+            self.model, "create_from_registry", using, namespace
+        ) as stats:
+            tasks = _get_namespace_tasks(registry, namespace, only)
+            if routes is None:
+                routes = await sync_to_async(get_routes)(tasks, using=read_using)
+            timeouts = await sync_to_async(get_timeouts)(tasks, using=read_using)
+
+            generation_obj = None
+            newer_objs: dict[tuple[str, str, str], Task] = {}
+            if generation := generation or app_settings.GENERATION:
+                generation_obj, _ = await Generation.objects.using(
+                    using
+                ).aget_or_create(name=generation)
+                newer_objs = {
+                    _get_key(obj): obj
+                    async for obj in self.using(using).filter(
+                        generation__pk__gt=generation_obj.pk,
+                        name__in=[task.name for task in tasks],
+                    )
+                }
+
+            task_objs: dict[Task, Task] = {}
+            for task in _get_new_tasks(registry, tasks):
+                lookup = _get_lookup(task, generation_obj)
+                if _get_key(lookup) in newer_objs:
+                    continue
+                async with (task_stats := SyncStats(rows=1)).ameasure(using):
+                    obj, created = await self.using(using).aupdate_or_create(**lookup)
+                saved[created].append(obj)
+                saved_stats[created].add(task_stats)
+                task_objs[task] = obj
+            revived_pks = [obj.pk for obj in task_objs.values() if obj.deleted_at]
+
+            schedule_pks = _get_schedule_pks(task_objs.values())
+            schedules = await Schedule.objects.using(read_using).ain_bulk(schedule_pks)
+            if missing_pks := set(schedule_pks) - schedules.keys():
+                schedules.update(
+                    await Schedule.objects.using(using).ain_bulk(missing_pks)
+                )
+            new_schedules, updates = _plan_schedules(
+                task_objs, schedules, routes, timeouts
             )
 
-            if obj.q_schedule is None:
-                obj.q_schedule = Schedule.objects.create(
-                    **task.to_schedule_dict(),
+            for pk, schedule_dict in updates:
+                await (
+                    Schedule.objects.using(using).filter(pk=pk).aupdate(**schedule_dict)
+                )
+
+            if new_schedules:
+                await _acreate_schedules(list(new_schedules.values()), using)
+                for task_obj, schedule in new_schedules.items():
+                    task_obj.q_schedule = schedule
+                await self.model.objects.using(using).abulk_update(
+                    new_schedules, ["q_schedule"]
                 )
-                obj.save()
-            else:
-                Schedule.objects.filter(pk=obj.q_schedule.pk).update(
-                    **task.to_schedule_dict(),
+
+            if revived_pks:
+                await (
+                    self.using(using)
+                    .filter(pk__in=revived_pks)
+                    .aupdate(**_get_revive_fields())
                 )
 
-            task_objs.append(obj)
+            stats.rows = len(task_objs)
+            _send_saved(self.model, saved, saved_stats, using)
 
-        return_qs = self.filter(pk__in=[task.pk for task in task_objs])
+        return_qs = self.using(using).filter(
+            pk__in=[task_obj.pk for task_obj in task_objs.values()]
+            + [obj.pk for obj in newer_objs.values()]
+        )
 
-        registry.update_created_tasks(return_qs)
+        objs: list[Task] = [obj async for obj in return_qs]
+        if only is not None:
+            objs = [*registry.created_tasks, *objs]
+        registry.update_created_tasks(objs)
 
         return return_qs
 
+    def pause(self) -> int:
+        """
+        Pause all `Task` instances in this queryset, so Django Q stops enqueueing their schedules.
+
+        The current `next_run` of each `Task`'s `django_q.models.Schedule` is saved to
+        `Task.paused_next_run` and then cleared, which the Django Q scheduler skips over. Because the
+        pause is recorded on the `Task`, a later `create_from_registry` keeps the schedule paused. Only
+        schedules owned by the registry, i.e. named with `PERIODIC_TASK_SUFFIX`, are paused, so tasks with
+        any other schedule, and tasks that are already paused or tombstoned, are left alone. Writes go to
+        the database this queryset reads from.
+
+        This runs a constant number of queries, regardless of the number of `Task` instances.
+
+        Returns:
+            The number of `Task` instances that were paused.
+        """
+
+        using = self._get_write_alias(None)
+        pks = list(
+            self.filter(
+                paused_at__isnull=True,
+                deleted_at__isnull=True,
+                q_schedule__name__endswith=app_settings.PERIODIC_TASK_SUFFIX,
+            ).values_list("pk", flat=True)
+        )
+        if not pks:
+            return 0
+
+        self.model.objects.using(using).filter(pk__in=pks).update(
+            paused_at=timezone.now(),
+            paused_next_run=models.Subquery(
+                Schedule.objects.filter(pk=models.OuterRef("q_schedule")).values(
+                    "next_run"
+                )[:1]
+            ),
+        )
+        _owned_schedules(pks, using).update(next_run=None)
+
+        return len(pks)
+
+    def resume(self) -> int:
+        """
+        Resume all paused `Task` instances in this queryset.
+
+        Each `Task`'s `django_q.models.Schedule` gets back the `next_run` it had when it was paused. If
+        that time passed while the task was paused, the schedule runs once as soon as possible and
+        then carries on with its normal cadence.
+
+        This runs a constant number of queries, regardless of the number of `Task` instances.
+
+        Returns:
+            The number of `Task` instances that were resumed.
+        """
+
+        using = self._get_write_alias(None)
+        pks = list(self.filter(paused_at__isnull=False).values_list("pk", flat=True))
+        if not pks:
+            return 0
+
+        now = models.Value(timezone.now(), output_field=models.DateTimeField())
+        _owned_schedules(pks, using).update(
+            next_run=Greatest(
+                Coalesce(
+                    models.Subquery(
+                        self.model.objects.filter(
+                            q_schedule=models.OuterRef("pk")
+                        ).values("paused_next_run")[:1]
+                    ),
+                    now,
+                ),
+                now,
+            )
+        )
+        self.model.objects.using(using).filter(pk__in=pks).update(
+            paused_at=None, paused_next_run=None
+        )
+
+        return len(pks)
+
+    def tombstone(self) -> int:
+        """
+        Mark all `Task` instances in this queryset as deleted, without deleting them, so that a later
+        `create_from_registry` that registers them again reuses their rows and schedules.
+
+        Like `pause`, the current `next_run` of each `Task`'s `django_q.models.Schedule` is saved to
+        `Task.paused_next_run`, unless the task is paused already, and then cleared.
+        `delete_dangling_objects` deletes tombstoned tasks for good once they are older than
+        `Q_REGISTRY["TOMBSTONE_RETENTION"]`.
+
+        This runs a constant number of queries, regardless of the number of `Task` instances.
+
+        Returns:
+            The number of `Task` instances that were tombstoned.
+        """
+
+        using = self._get_write_alias(None)
+        pks = list(self.filter(deleted_at__isnull=True).values_list("pk", flat=True))
+        if not pks:
+            return 0
+
+        tasks = self.model.objects.using(using).filter(pk__in=pks)
+        tasks.filter(paused_at__isnull=True).update(
+            paused_next_run=models.Subquery(
+                Schedule.objects.filter(pk=models.OuterRef("q_schedule")).values(
+                    "next_run"
+                )[:1]
+            ),
+        )
+        tasks.update(deleted_at=timezone.now())
+        _owned_schedules(pks, using).update(next_run=None)
+
+        return len(pks)
+
+    def run_now(self) -> list[Schedule]:
+        """
+        Run all `Task` instances in this queryset once, as soon as possible, without changing their
+        regular schedules.
+
+        One-off `django_q.models.Schedule` instances are created with a single bulk insert and picked up
+        on the Django Q scheduler's next tick. See `Task.to_run_once_schedule`.
+
+        Returns:
+            The one-off `Schedule` instances that were created.
+        """
+
+        now = timezone.now()
+        return Schedule.objects.using(self._get_write_alias(None)).bulk_create(
+            [
+                task.to_run_once_schedule(next_run=now)
+                for task in self.filter(q_schedule__isnull=False).select_related(
+                    "q_schedule"
+                )
+            ]
+        )
+
+    def prune_results(self, chunk_size: int = 1000) -> int:
+        """
+        Delete old `django_q.models.Task` results of all `Task` instances in this queryset, according to
+        their `retain` and `keep_last` options.
+
+        A result is deleted if it is older than `retain`, or if it is not one of the newest `keep_last`
+        results of its `Task`. Results are matched on their `group`, which Django Q sets to the name of
+        the `Schedule` that enqueued them, and deleted oldest first in chunks of at most `chunk_size`
+        rows, to keep each delete short and avoid long-held locks on large result tables. Each chunk is
+        read through an index on the `group` and `stopped` columns of the results table, which the
+        `0008_result_group_stopped_index` migration adds, rather than with a full table scan.
+
+        Args:
+            chunk_size:
+                The maximum number of results to delete in a single query.
+
+        Returns:
+            The number of results deleted.
+        """
+
+        now = timezone.now()
+        deleted = 0
+
+        for task in self.filter(
+            models.Q(retain__isnull=False) | models.Q(keep_last__isnull=False)
+        ):
+            results = QTask.objects.filter(group=task.schedule_name)
+
+            cutoffs = []
+            if task.retain is not None:
+                cutoffs.append(now - task.retain)
+            if task.keep_last == 0:
+                cutoffs.append(now)
+            elif task.keep_last is not None:
+                # the oldest of the newest `keep_last` results, anything older goes
+                cutoffs.extend(
+                    results.order_by("-stopped").values_list("stopped", flat=True)[
+                        task.keep_last - 1 : task.keep_last
+                    ]
+                )
+            if not cutoffs:
+                continue
+
+            to_delete = results.filter(stopped__lt=max(cutoffs)).order_by("stopped")
+            while pks := list(to_delete.values_list("pk", flat=True)[:chunk_size]):
+                count, _ = QTask.objects.filter(pk__in=pks).delete()
+                deleted += count
+
+        return deleted
+
     def exclude_registered(self, registry: TaskRegistry) -> TaskQuerySet:
         """
         Get all `Task` instances that are no longer registered in the `TaskRegistry`.
@@ -153,28 +658,405 @@ class TaskQuerySet(models.QuerySet["Task"]):
 
         return self.exclude(pk__in=[task.pk for task in registry.created_tasks])
 
-    def delete_dangling_objects(self, registry: TaskRegistry) -> None:
+    def delete_dangling_objects(
+        self,
+        registry: TaskRegistry,
+        using: str | None = None,
+        namespace: str | None = None,
+        generation: str | None = None,
+        keep_generations: int | None = None,
+    ) -> None:
         """
         Delete all `Task` instances from the database and the associated `django_q.models.Schedule` instances
         no longer associated with a `TaskRegistry`.
+
+        Args:
+            registry:
+                A TaskRegistry instance containing all of the `Task` instances that are currently registered
+                and in the database.
+            using:
+                The database alias to delete from. Defaults to the alias of this queryset, or the one the
+                database routers pick for writes.
+            namespace:
+                Only delete `Task` instances, and their `Schedule` instances, in this namespace. Schedules
+                not owned by any `Task` are left alone, as they may belong to a namespace that has not
+                been synced yet. Defaults to all namespaces.
+            generation:
+                The release syncing the registry, see `create_from_registry`. If given, `Task` instances
+                that are no longer registered are tombstoned rather than deleted, unless a release of the
+                newest `keep_generations` generations still saves them, and are only deleted once their
+                tombstone is older than `Q_REGISTRY["TOMBSTONE_RETENTION"]`. Defaults to
+                `Q_REGISTRY["GENERATION"]`.
+            keep_generations:
+                How many of the newest generations to keep the `Task` instances of. Defaults to
+                `Q_REGISTRY["KEEP_GENERATIONS"]`.
         """
-        to_delete = self.exclude_registered(registry)
+        using = self._get_write_alias(using)
+        schedules = Schedule.objects.using(using)
+        with sync_signals(
+            self.model, "delete_dangling_objects", using, namespace
+        ) as stats:
+            to_delete = self.using(using).exclude_registered(registry)
+            if namespace is not None:
+                to_delete = to_delete.filter(namespace=namespace)
 
-        q_schedule_pks = to_delete.values_list("q_schedule", flat=True)
+            if generation or app_settings.GENERATION:
+                kept_pks = list(
+                    Generation.objects.using(using)
+                    .order_by("-pk")
+                    .values_list("pk", flat=True)[
+                        : keep_generations or app_settings.KEEP_GENERATIONS
+                    ]
+                )
+                to_delete.exclude(generation__in=kept_pks).tombstone()
+                to_delete = to_delete.filter(deleted_at__lt=_get_tombstone_cutoff())
+
+            with (deleted_stats := SyncStats()).measure(using):
+                deleted = list(to_delete)
+                to_delete.delete()
+            deleted_stats.rows = stats.rows = len(deleted)
 
-        to_delete.delete()
+            if namespace is None:
+                suffix = app_settings.PERIODIC_TASK_SUFFIX
+                legacy_suffix = " - CRON"
 
-        suffix = app_settings.PERIODIC_TASK_SUFFIX
-        legacy_suffix = " - CRON"
+                # clean up legacy registered schedules
+                schedules.filter(name__endswith=legacy_suffix).delete()
+                # clean up dangling schedules
+                schedules.filter(
+                    models.Q(name__endswith=suffix)
+                    & models.Q(registered_task__isnull=True)
+                ).delete()
+            # clean up schedules of tasks that were just deleted
+            schedules.filter(pk__in=_get_schedule_pks(deleted)).delete()
+
+            if deleted:
+                task_deleted.send(
+                    sender=self.model, tasks=deleted, using=using, stats=deleted_stats
+                )
+
+    async def adelete_dangling_objects(
+        self,
+        registry: TaskRegistry,
+        using: str | None = None,
+        namespace: str | None = None,
+        generation: str | None = None,
+        keep_generations: int | None = None,
+    ) -> None:
+        """
+        Async version of `delete_dangling_objects`, built on Django's async ORM interface.
+        """
+        using = self._get_write_alias(using)
+        schedules = Schedule.objects.using(using)
+        async with async_sync_signals(
+            self.model, "delete_dangling_objects", using, namespace
+        ) as stats:
+            to_delete = self.using(using).exclude_registered(registry)
+            if namespace is not None:
+                to_delete = to_delete.filter(namespace=namespace)
 
-        # clean up legacy registered schedules
-        Schedule.objects.filter(name__endswith=legacy_suffix).delete()
-        # clean up dangling schedules
-        Schedule.objects.filter(
-            models.Q(name__endswith=suffix) & models.Q(registered_task__isnull=True)
-        ).delete()
-        # clean up schedules of tasks that were just deleted
-        Schedule.objects.filter(pk__in=q_schedule_pks).delete()
+            if generation or app_settings.GENERATION:
+                kept_pks = [
+                    pk
+                    async for pk in Generation.objects.using(using)
+                    .order_by("-pk")
+                    .values_list("pk", flat=True)[
+                        : keep_generations or app_settings.KEEP_GENERATIONS
+                    ]
+                ]
+                await sync_to_async(
+                    to_delete.exclude(generation__in=kept_pks).tombstone
+                )()
+                to_delete = to_delete.filter(deleted_at__lt=_get_tombstone_cutoff())
+
+            async with (deleted_stats := SyncStats()).ameasure(using):
+                deleted = [obj async for obj in to_delete]
+                await to_delete.adelete()
+            deleted_stats.rows = stats.rows = len(deleted)
+
+            if namespace is None:
+                suffix = app_settings.PERIODIC_TASK_SUFFIX
+                legacy_suffix = " - CRON"
+
+                await schedules.filter(name__endswith=legacy_suffix).adelete()
+                await schedules.filter(
+                    models.Q(name__endswith=suffix)
+                    & models.Q(registered_task__isnull=True)
+                ).adelete()
+            await schedules.filter(pk__in=_get_schedule_pks(deleted)).adelete()
+
+            if deleted:
+                task_deleted.send(
+                    sender=self.model, tasks=deleted, using=using, stats=deleted_stats
+                )
+
+
+def _send_saved(
+    sender: type[Task],
+    saved: dict[bool, list[Task]],
+    saved_stats: dict[bool, SyncStats],
+    using: str,
+) -> None:
+    """
+    Send `task_created` and `task_updated` for the `Task` instances `create_from_registry` saved, by
+    whether they were created.
+    """
+    for created, signal in ((True, task_created), (False, task_updated)):
+        if saved[created]:
+            signal.send(
+                sender=sender,
+                tasks=saved[created],
+                using=using,
+                stats=saved_stats[created],
+            )
+
+
+def _get_namespace_tasks(
+    registry: TaskRegistry, namespace: str | None, only: Iterable[Task] | None = None
+) -> set[Task]:
+    if namespace is None:
+        tasks = set(registry.registered_tasks)
+    else:
+        tasks = registry.filter(namespace=namespace)
+    if only is not None:
+        only = set(only)
+        tasks = {task for task in tasks if task in only}
+    return tasks
+
+
+def _get_new_tasks(registry: TaskRegistry, tasks: Iterable[Task]) -> Iterator[Task]:
+    """
+    Yields the in-memory `Task` instances of `tasks`, logging the ones that cannot be saved.
+    """
+    for task in tasks:
+        if task.pk:
+            logger.error("Task %s has already been registered", task.pk)
+            continue
+
+        if task.after is not None and get_task_by_name(registry, task.after) is None:
+            logger.error(
+                "Task %s is registered after %s, which is not registered",
+                task.name,
+                task.after,
+            )
+
+        yield task
+
+
+def _get_lookup(task: Task, generation: Generation | None = None) -> dict[str, Any]:
+    defaults = {key: getattr(task, key) for key in TASK_OPTIONS}
+    if generation is not None:
+        defaults["generation"] = generation
+    return {
+        "name": task.name,
+        "func": task.func,
+        "kwargs": json.dumps(task.kwargs, cls=DjangoJSONEncoder),
+        "defaults": defaults,
+    }
+
+
+def _get_key(obj: Task | dict[str, Any]) -> tuple[str, str, str]:
+    """
+    Returns what `update_or_create` looks a saved `Task`, or a lookup from `_get_lookup`, up by.
+    """
+    if isinstance(obj, dict):
+        return obj["name"], obj["func"], obj["kwargs"]
+    return obj.name, obj.func, obj.kwargs
+
+
+def _get_revive_fields() -> dict[str, Any]:
+    """
+    Returns the fields that bring tombstoned `Task` instances back, see `TaskQuerySet.tombstone`. Their
+    schedules get their `next_run` back in `_plan_schedules`, unless they are paused.
+    """
+    return {
+        "deleted_at": None,
+        "paused_next_run": models.Case(
+            models.When(paused_at__isnull=True, then=models.Value(None)),
+            default=models.F("paused_next_run"),
+        ),
+    }
+
+
+def _get_tombstone_cutoff() -> datetime:
+    return timezone.now() - app_settings.TOMBSTONE_RETENTION
+
+
+def _get_schedule_pks(objs: Iterable[Task]) -> list[int]:
+    return [
+        obj.q_schedule_id  # type: ignore[attr-defined]
+        for obj in objs
+        if obj.q_schedule_id is not None  # type: ignore[attr-defined]
+    ]
+
+
+def _plan_schedules(
+    task_objs: dict[Task, Task],
+    schedules: dict[int, Schedule],
+    routes: dict[Task, str | None],
+    timeouts: dict[Task, int] | None = None,
+) -> tuple[dict[Task, Schedule], list[tuple[int, dict[str, Any]]]]:
+    """
+    Work out which `django_q.models.Schedule` instances `create_from_registry` has to create and update,
+    without running any queries.
+
+    Args:
+        task_objs:
+            The in-memory `Task` instances of the registry, mapped to their saved counterparts.
+        schedules:
+            The existing `Schedule` instances of the saved `Task` instances, by primary key.
+        routes:
+            The Django Q cluster to run each in-memory `Task` on.
+        timeouts:
+            The timeout of each in-memory `Task` registered with `timeout="auto"` that has one yet, see
+            `django_q_registry.timeouts.get_timeouts`.
+
+    Returns:
+        The unsaved `Schedule` to create for each saved `Task` without one, and the fields to update
+        for each existing `Schedule`, by primary key.
+    """
+    periodic_objs = {task: obj for task, obj in task_objs.items() if task.is_periodic}
+    now = timezone.now()
+    next_runs = get_next_runs(periodic_objs, now)
+    new_schedules = {}
+    updates = []
+
+    for task, obj in periodic_objs.items():
+        schedule_dict = task.to_schedule_dict()
+        schedule_dict["cluster"] = routes.get(task, schedule_dict.get("cluster"))
+        if timeouts and task in timeouts:
+            set_timeout(schedule_dict, timeouts[task])
+        schedule = schedules.get(obj.q_schedule_id)  # type: ignore[attr-defined]
+
+        if schedule is None:
+            if task in next_runs:
+                schedule_dict["next_run"] = next_runs[task]
+            new_schedules[obj] = Schedule(**schedule_dict)
+            continue
+
+        if obj.paused_at is not None:
+            # keep paused schedules paused, see `TaskQuerySet.pause`
+            schedule_dict.pop("next_run", None)
+        elif task in next_runs and _timing_changed(schedule, schedule_dict):
+            schedule_dict["next_run"] = next_runs[task]
+        elif obj.deleted_at is not None:
+            # revive tombstoned schedules where they left off, see `TaskQuerySet.tombstone`
+            schedule_dict.setdefault("next_run", max(obj.paused_next_run or now, now))
+        updates.append((schedule.pk, schedule_dict))
+
+    return new_schedules, updates
+
+
+def _timing_changed(schedule: Schedule, schedule_dict: dict[str, Any]) -> bool:
+    return (
+        schedule.schedule_type != schedule_dict.get("schedule_type", Schedule.ONCE)
+        or schedule.cron != schedule_dict.get("cron")
+        or schedule.minutes != schedule_dict.get("minutes")
+    )
+
+
+def _create_schedules(schedules: list[Schedule], using: str) -> None:
+    """
+    Save new `django_q.models.Schedule` instances with the `next_run` they were given.
+
+    `Schedule.save` replaces the `next_run` of new cron schedules with one computed by croniter, so it
+    is bypassed, with a single bulk insert where the database returns the new primary keys.
+    """
+    if connections[using].features.can_return_rows_from_bulk_insert:
+        Schedule.objects.using(using).bulk_create(schedules)
+    else:
+        for schedule in schedules:
+            models.Model.save(schedule, using=using)
+
+
+async def _acreate_schedules(schedules: list[Schedule], using: str) -> None:
+    if connections[using].features.can_return_rows_from_bulk_insert:
+        await Schedule.objects.using(using).abulk_create(schedules)
+    else:
+        for schedule in schedules:
+            await sync_to_async(models.Model.save)(schedule, using=using)
+
+
+def _owned_schedules(task_pks: list[int], using: str) -> models.QuerySet[Schedule]:
+    return Schedule.objects.using(using).filter(
+        registered_task__in=task_pks,
+        name__endswith=app_settings.PERIODIC_TASK_SUFFIX,
+    )
+
+
+class Generation(models.Model):
+    """
+    A release that synced the registry, see `TaskQuerySet.create_from_registry`. Newer generations have
+    higher primary keys.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects: models.Manager[Generation] = models.Manager()
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class SyncLease(models.Model):
+    """
+    The lease that elects one Django Q cluster process to sync the registry on startup, and the digest of
+    the registry it last synced, see `django_q_registry.startup`.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    digest = models.CharField(max_length=64, blank=True)
+    holder = models.CharField(max_length=255, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    synced_at = models.DateTimeField(null=True, blank=True)
+
+    objects: models.Manager[SyncLease] = models.Manager()
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class PoolSlot(models.Model):
+    """
+    One of the slots of a concurrency pool, held by the run that leased it until `expires_at`, see
+    `django_q_registry.pools`.
+    """
+
+    pool = models.CharField(max_length=100)
+    slot = models.PositiveIntegerField()
+    holder = models.CharField(max_length=64, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    objects: models.Manager[PoolSlot] = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["pool", "slot"], name="qregistry_unique_pool_slot"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.pool} {self.slot}"
+
+
+class FanoutDispatch(models.Model):
+    """
+    A run of a fan-out task with a reducer whose sub-tasks have not all finished, see
+    `django_q_registry.fanout`. The hook that deletes it runs the reducer.
+    """
+
+    group = models.CharField(
+        max_length=100,  # max_length inherited from `django_q.models.Task.group`
+        unique=True,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects: models.Manager[FanoutDispatch] = models.Manager()
+
+    def __str__(self) -> str:
+        return self.group
 
 
 class Task(models.Model):
@@ -191,9 +1073,56 @@ class Task(models.Model):
         max_length=256  # max_length inherited from `django_q.models.Schedule`
     )
     kwargs = models.JSONField(default=dict)
+    paused_at = models.DateTimeField(null=True, blank=True)
+    paused_next_run = models.DateTimeField(null=True, blank=True)
+    retain = models.DurationField(
+        null=True,
+        blank=True,
+        help_text="Delete results of this task older than this.",
+    )
+    keep_last = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Only keep this many of the newest results of this task.",
+    )
+    result_sample_rate = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Fraction of successful runs of this task to save a result for, between 0 and 1.",
+    )
+    namespace = models.CharField(
+        max_length=100,
+        blank=True,
+        default="",
+        db_index=True,
+        help_text="Only synced and cleaned up by setup_periodic_tasks runs for this namespace.",
+    )
+    generation = models.ForeignKey(
+        Generation,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="tasks",
+        help_text="The newest release that registered this task.",
+    )
+    deleted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When this task was tombstoned, after no recent release registered it.",
+    )
 
     objects = TaskQuerySet.as_manager()
 
+    # see `RUNTIME_OPTIONS`
+    fanout: Fanout | None = None
+    skip_if: Callable[[], bool] | models.QuerySet[Any] | None = None
+    trigger: Trigger | None = None
+    debounce: timedelta = timedelta(minutes=1)
+    after: str | None = None
+    pool: str | None = None
+    priority: str | None = None
+    is_async: bool = False
+
     def __str__(self) -> str:
         return self.name
 
@@ -248,9 +1177,143 @@ class Task(models.Model):
             and self.kwargs == other.kwargs
         )
 
+    @property
+    def is_periodic(self) -> bool:
+        """
+        Whether this `Task` has a `django_q.models.Schedule`. Tasks registered with a `trigger` and no
+        `schedule_type` only run when triggered, and tasks registered `after` another task only run when
+        their parent succeeds. Any other task is periodic.
+        """
+        if self.after is not None:
+            return False
+        return self.trigger is None or "schedule_type" in self.kwargs
+
+    def enqueue(self) -> str:
+        """
+        Enqueue a run of this in-memory `Task` right away, with the same function, arguments and options
+        its `django_q.models.Schedule` would use, and grouped under its `Schedule` name.
+
+        Returns:
+            The id of the enqueued Django Q task.
+        """
+        schedule_dict = self.to_schedule_dict()
+
+        args = schedule_dict.get("args") or ()
+        if isinstance(args, str):
+            args = ast.literal_eval(args)
+            # a single value won't be evaluated as a tuple
+            if not isinstance(args, tuple):
+                args = (args,)
+
+        kwargs = schedule_dict.get("kwargs") or {}
+        if isinstance(kwargs, str):
+            kwargs = ast.literal_eval(kwargs)
+        kwargs = dict(kwargs)
+
+        q_options = {"group": self.schedule_name, **kwargs.pop("q_options", {})}
+        if self.priority is not None and app_settings.PRIORITIES[self.priority]:
+            q_options.setdefault("cluster", app_settings.PRIORITIES[self.priority])
+        for key in ("hook", "cluster"):
+            if schedule_dict.get(key):
+                q_options[key] = schedule_dict[key]
+
+        return async_task(schedule_dict["func"], *args, q_options=q_options, **kwargs)
+
+    def should_skip(self) -> bool:
+        """
+        Evaluate the `skip_if` option of this in-memory `Task`.
+
+        `skip_if` is either a callable, in which case the task is skipped when it returns a truthy value,
+        or a `QuerySet` of the task's work, in which case the task is skipped when the queryset is empty.
+        """
+        if self.skip_if is None:
+            return False
+        if isinstance(self.skip_if, models.QuerySet):
+            return not self.skip_if.exists()
+        return bool(self.skip_if())
+
+    @property
+    def skip_count(self) -> int:
+        """
+        The number of runs of this task that were skipped by `skip_if`, as counted in the default cache.
+        """
+        return cache.get(make_key("skip_count", self.schedule_name), 0)
+
+    def record_skip(self) -> None:
+        key = make_key("skip_count", self.schedule_name)
+        cache.add(key, 0, timeout=None)
+        # the key may have been evicted, or the cache may not store anything, e.g. `DummyCache`
+        with contextlib.suppress(ValueError):
+            cache.incr(key)
+
+    @property
+    def schedule_name(self) -> str:
+        return f"{self.name}{app_settings.PERIODIC_TASK_SUFFIX}"
+
     def to_schedule_dict(self) -> dict[str, Any]:
-        return {
-            "name": f"{self.name}{app_settings.PERIODIC_TASK_SUFFIX}",
+        schedule_dict = {
+            "name": self.schedule_name,
             "func": self.func,
             **self.kwargs,
         }
+
+        if self.fanout is not None:
+            # the schedule splits the work up and enqueues it, see `django_q_registry.fanout`
+            schedule_dict.pop("kwargs", None)
+            schedule_dict["func"] = "django_q_registry.fanout.dispatch"
+            schedule_dict["args"] = repr(self.schedule_name)
+
+        # a timeout of "auto" is set during the sync, see `django_q_registry.timeouts.get_timeouts`
+        timeout = schedule_dict.pop("timeout", None)
+        if timeout is not None and timeout != AUTO:
+            set_timeout(schedule_dict, timeout)
+
+        return schedule_dict
+
+    def to_run_once_schedule(
+        self, next_run: datetime, suffix: str = " - run now"
+    ) -> Schedule:
+        """
+        Returns an unsaved, one-off `django_q.models.Schedule` that runs this `Task` once at `next_run`.
+
+        The new `Schedule` copies what to run from the `Task`'s current `q_schedule`, or for an in-memory
+        `Task` from its registered `Schedule` fields. It is named with `suffix` rather than
+        `PERIODIC_TASK_SUFFIX`, so `delete_dangling_objects` leaves it alone. Django Q deletes it after it
+        runs.
+
+        Its run is still in the group of the registered `Schedule`, unless that sets a group of its own,
+        so it is saved, pruned, and handled by the receivers like any other run of the `Task`.
+        """
+        fields = ("func", "hook", "args", "kwargs", "cluster", "intended_date_kwarg")
+
+        if self.q_schedule is not None:
+            schedule_dict = {field: getattr(self.q_schedule, field) for field in fields}
+            group = self.q_schedule.name
+        elif self.pk is None:
+            schedule_dict = {
+                field: value
+                for field, value in self.to_schedule_dict().items()
+                if field in fields
+            }
+            group = self.schedule_name
+        else:
+            msg = f"Task {self.pk} has no schedule to run."
+            raise ValueError(msg)
+
+        try:
+            kwargs = parse_kwargs(schedule_dict.get("kwargs"))
+        except ValueError:
+            # Django Q's `"a=1, b=2"` form, which takes `q_options` as one more keyword
+            if "q_options" not in schedule_dict["kwargs"]:
+                schedule_dict["kwargs"] += f", q_options={{'group': {group!r}}}"
+        else:
+            kwargs["q_options"] = {"group": group, **kwargs.get("q_options", {})}
+            schedule_dict["kwargs"] = repr(kwargs)
+
+        return Schedule(
+            name=f"{self.name[: 100 - len(suffix)]}{suffix}",
+            schedule_type=Schedule.ONCE,
+            repeats=-1,
+            next_run=next_run,
+            **schedule_dict,
+        )
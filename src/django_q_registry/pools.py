@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import logging
+import pydoc
+from datetime import timedelta
+from typing import Any
+
+from django.db import models
+from django.db import router
+from django.utils import timezone
+from django_q.conf import Conf
+from django_q.humanhash import uuid
+from django_q.models import Schedule
+
+from django_q_registry.conf import app_settings
+from django_q_registry.models import PoolSlot
+
+logger = logging.getLogger(__name__)
+
+# the result of a run that was deferred because its pool was full, see `run_in_pool`
+DEFERRED = "django_q_registry.pools.DEFERRED"
+
+# the options of a Django Q task that a deferred run keeps, see `defer`
+Q_OPTIONS = ("group", "hook", "cluster", "timeout", "save", "cached", "ack_failure")
+
+
+def get_lease_ttl() -> int:
+    """
+    How long a pool slot is held before it is considered abandoned, e.g. because the worker holding it
+    was killed. Defaults to the Django Q cluster's `timeout` plus a minute, or an hour if there is none.
+    """
+    if app_settings.POOL_LEASE_TTL is not None:
+        return app_settings.POOL_LEASE_TTL
+    if Conf.TIMEOUT:
+        return Conf.TIMEOUT + 60
+    return 60 * 60
+
+
+def acquire(pool: str) -> tuple[int, str] | None:
+    """
+    Try to take one of the slots of `pool`, as configured in `Q_REGISTRY["POOLS"]`.
+
+    Each slot is a `PoolSlot` row, shared by every cluster that uses the database. A free slot is taken
+    with a conditional update, so only one process can hold it, and its lease expires after
+    `get_lease_ttl` seconds so that slots held by crashed workers are recovered. The rows of a pool are
+    created the first time it is full.
+
+    Returns:
+        The lease, to pass to `release`, or `None` if all slots are taken.
+    """
+    using = router.db_for_write(PoolSlot)
+    size = app_settings.POOLS[pool]
+    slots = PoolSlot.objects.using(using).filter(pool=pool, slot__lt=size)
+    holder = uuid()[1]
+
+    for attempt in range(2):
+        now = timezone.now()
+        free = slots.filter(
+            models.Q(expires_at__isnull=True) | models.Q(expires_at__lt=now)
+        )
+        for pk in free.values_list("pk", flat=True):
+            if free.filter(pk=pk).update(
+                holder=holder, expires_at=now + timedelta(seconds=get_lease_ttl())
+            ):
+                return pk, holder
+        if attempt or slots.count() == size:
+            break
+        PoolSlot.objects.using(using).bulk_create(
+            [PoolSlot(pool=pool, slot=slot) for slot in range(size)],
+            ignore_conflicts=True,
+        )
+    return None
+
+
+def release(lease: tuple[int, str]) -> None:
+    """
+    Give back a slot taken with `acquire`, unless its lease expired and another process took it since.
+    """
+    pk, holder = lease
+    PoolSlot.objects.using(router.db_for_write(PoolSlot)).filter(
+        pk=pk, holder=holder
+    ).update(holder="", expires_at=None)
+
+
+def run_in_pool(
+    pool: str, q_options: dict[str, Any], func: Any, /, *args: Any, **kwargs: Any
+) -> Any:
+    """
+    Run `func` if a slot of `pool` is free, or defer it if not, see `defer`.
+
+    The Django Q scheduler enqueues registered tasks with a `pool` through this function, with the
+    `q_options` they were enqueued with, see `django_q_registry.receivers.limit_concurrency`.
+
+    Returns:
+        The result of `func`, or `DEFERRED` if the run was deferred. The result of a deferred run is not
+        saved, and it does not count as a run of the task, e.g. for its chain.
+    """
+    lease = acquire(pool)
+    if lease is None:
+        logger.info("Pool %s is full, deferring %s", pool, q_options.get("group"))
+        defer(pool, q_options, func, args, kwargs)
+        return DEFERRED
+
+    try:
+        if not callable(func):
+            func = pydoc.locate(func)
+        return func(*args, **kwargs)
+    finally:
+        release(lease)
+
+
+def defer(
+    pool: str,
+    q_options: dict[str, Any],
+    func: str,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> Schedule:
+    """
+    Run `func` through `run_in_pool` again after `Q_REGISTRY["POOL_RETRY_DELAY"]` seconds, with the same
+    `q_options`, e.g. its group, hook, cluster, and timeout.
+
+    The retry is a one-off `django_q.models.Schedule`, so it is delayed with every broker, does not hold
+    a worker while it waits, and is enqueued by the scheduler of the run's cluster.
+    """
+    return Schedule.objects.create(
+        name=f"{q_options.get('group', '')[:90]} - deferred",
+        func="django_q_registry.pools.run_in_pool",
+        args=repr((pool, q_options, func, *args)),
+        kwargs=repr(
+            {
+                **kwargs,
+                "q_options": {
+                    key: value
+                    for key, value in q_options.items()
+                    if key not in ("hook", "cluster")
+                },
+            }
+        ),
+        hook=q_options.get("hook"),
+        cluster=q_options.get("cluster"),
+        schedule_type=Schedule.ONCE,
+        repeats=-1,
+        next_run=timezone.now() + timedelta(seconds=app_settings.POOL_RETRY_DELAY),
+    )
@@ -0,0 +1,50 @@
+"""
+Pytest fixtures for testing code that registers tasks. Enable them in a `conftest.py` with:
+
+    pytest_plugins = ["django_q_registry.pytest_plugin"]
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from django_q_registry.registry import TaskRegistry
+    from django_q_registry.testing import InMemoryScheduleStore
+
+
+@pytest.fixture
+def q_registry() -> Iterator[TaskRegistry]:
+    """
+    The global registry, emptied for the test, see `TaskRegistry.override`.
+    """
+    from django_q_registry.registry import registry
+
+    with registry.override():
+        yield registry
+
+
+@pytest.fixture
+def q_registry_snapshot() -> Iterator[TaskRegistry]:
+    """
+    The global registry, with changes made by the test undone afterwards.
+    """
+    from django_q_registry.registry import registry
+
+    with registry.override(snapshot=True):
+        yield registry
+
+
+@pytest.fixture
+def q_schedule_store() -> Iterator[InMemoryScheduleStore]:
+    """
+    An `InMemoryScheduleStore` that `Task.objects` syncs the registry to for the test, so that no
+    database is needed.
+    """
+    from django_q_registry.testing import InMemoryScheduleStore
+
+    with InMemoryScheduleStore().patch() as store:
+        yield store
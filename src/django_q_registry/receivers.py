@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import random
+from collections.abc import Callable
+from typing import Any
+
+from django.dispatch import receiver
+from django_q.signals import post_execute
+from django_q.signals import post_execute_in_worker
+from django_q.signals import pre_enqueue
+
+from django_q_registry import pools
+from django_q_registry import tracing
+from django_q_registry.chains import enqueue_dependents
+from django_q_registry.registry import registry
+from django_q_registry.signals import post_sync
+from django_q_registry.signals import pre_sync
+from django_q_registry.signals import task_created
+from django_q_registry.signals import task_deleted
+from django_q_registry.signals import task_updated
+
+
+@receiver(post_execute_in_worker, dispatch_uid="django_q_registry_sample_results")
+def sample_results(
+    sender: str, func: Callable[..., Any], task: dict[str, Any], **kwargs: Any
+) -> None:
+    """
+    Skip saving the result of a successful run of a registered task that is sampled out by its
+    `result_sample_rate`. Failed runs are always saved.
+    """
+    if not task.get("success") or not task.get("group"):
+        return
+
+    registered_task = registry.find_by_schedule_name(task["group"])
+    if registered_task is None or registered_task.result_sample_rate is None:
+        return
+
+    if random.random() >= registered_task.result_sample_rate:  # noqa: S311
+        task["save"] = False
+
+
+@receiver(pre_enqueue, dispatch_uid="django_q_registry_run_coroutines")
+def run_coroutines(sender: str, task: dict[str, Any], **kwargs: Any) -> None:
+    """
+    Run a registered `async def` task on the worker's event loop, through
+    `django_q_registry.aio.run_coroutine`. Runs that `django_q_registry.aio.batch_due_runs` claimed
+    are enqueued together in a `run_batch` task instead, and never get here.
+
+    This is connected before `limit_concurrency`.
+    """
+    if not task.get("group") or task.get("func") in (
+        "django_q_registry.aio.run_coroutine",
+        "django_q_registry.pools.run_in_pool",
+    ):
+        return
+
+    registered_task = registry.find_by_schedule_name(task["group"])
+    if registered_task is None or not registered_task.is_async:
+        return
+
+    task["args"] = (task["func"], *task.get("args", ()))
+    task["func"] = "django_q_registry.aio.run_coroutine"
+
+
+@receiver(pre_enqueue, dispatch_uid="django_q_registry_limit_concurrency")
+def limit_concurrency(sender: str, task: dict[str, Any], **kwargs: Any) -> None:
+    """
+    Route a registered task with a `pool` through `django_q_registry.pools.run_in_pool`, so that it
+    only runs while a slot of its pool is free.
+    """
+    if (
+        not task.get("group")
+        or task.get("func") == "django_q_registry.pools.run_in_pool"
+    ):
+        return
+
+    registered_task = registry.find_by_schedule_name(task["group"])
+    if registered_task is None or registered_task.pool is None:
+        return
+
+    task["args"] = (
+        registered_task.pool,
+        {key: task[key] for key in pools.Q_OPTIONS if key in task},
+        task["func"],
+        *task.get("args", ()),
+    )
+    task["func"] = "django_q_registry.pools.run_in_pool"
+
+
+@receiver(post_execute_in_worker, dispatch_uid="django_q_registry_discard_deferred")
+def discard_deferred(
+    sender: str, func: Callable[..., Any], task: dict[str, Any], **kwargs: Any
+) -> None:
+    """
+    Skip saving the result of a run that was deferred because its pool was full, so it does not count
+    as a successful run, e.g. in run stats and runtimes. See `django_q_registry.pools.run_in_pool`.
+    """
+    if _is_deferred(task):
+        task["save"] = False
+
+
+def _is_deferred(task: dict[str, Any]) -> bool:
+    return (
+        task.get("func") == "django_q_registry.pools.run_in_pool"
+        and task.get("result") == pools.DEFERRED
+    )
+
+
+@receiver(post_execute, dispatch_uid="django_q_registry_enqueue_dependents")
+def run_dependents(sender: str, task: dict[str, Any], **kwargs: Any) -> None:
+    """
+    Enqueue the tasks registered `after` a registered task, once a run of it has succeeded.
+
+    This is connected to `post_execute`, which Django Q sends after every run whether or not its result
+    is saved, so chains keep working for tasks with a `result_sample_rate`.
+    """
+    if not task.get("success") or not task.get("group"):
+        return
+    if _is_deferred(task):
+        return
+
+    registered_task = registry.find_by_schedule_name(task["group"])
+    if registered_task is None:
+        return
+
+    enqueue_dependents(registry, registered_task, task["started"], task["stopped"])
+
+
+@receiver(pre_sync, dispatch_uid="django_q_registry_start_sync_span")
+def start_sync_span(
+    sender: type, operation: str, using: str, namespace: str | None, **kwargs: Any
+) -> None:
+    """
+    Trace registry syncs with OpenTelemetry, if it is installed. See `django_q_registry.tracing`.
+    """
+    tracing.start_span(operation, using, namespace)
+
+
+@receiver(
+    [task_created, task_updated, task_deleted],
+    dispatch_uid="django_q_registry_add_sync_event",
+)
+def add_sync_event(
+    sender: type, signal: Any, stats: tracing.SyncStats, **kwargs: Any
+) -> None:
+    name = {
+        task_created: "task_created",
+        task_updated: "task_updated",
+        task_deleted: "task_deleted",
+    }[signal]
+    tracing.add_event(name, stats)
+
+
+@receiver(post_sync, dispatch_uid="django_q_registry_end_sync_span")
+def end_sync_span(
+    sender: type,
+    stats: tracing.SyncStats,
+    exception: Exception | None = None,
+    **kwargs: Any,
+) -> None:
+    tracing.end_span(stats, exception)
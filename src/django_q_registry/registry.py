@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import contextlib
 import importlib
+import sys
+from collections import defaultdict
 from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Set as AbstractSet
 from dataclasses import dataclass
 from dataclasses import field
 from functools import wraps
@@ -11,19 +17,182 @@ from typing import cast
 
 from django.conf import settings
 
+from django_q_registry.chains import check_acyclic
 from django_q_registry.conf import app_settings
 
 if TYPE_CHECKING:
+    from typing_extensions import Self
+
     from django_q_registry.models import Task
-    from django_q_registry.models import TaskQuerySet
+
+
+class TaskSet(set["Task"]):
+    """
+    A set of in-memory `Task` instances that keeps them indexed by name, function path, module, and
+    namespace, so that `filter` does not have to scan every task.
+
+    It is a regular `set`, and every way of adding or removing tasks keeps the indexes up to date.
+    Operations that return a new set, such as `union` or `|`, return a plain `set`, except `copy`.
+    """
+
+    def __init__(self, tasks: Iterable[Task] = ()):
+        super().__init__()
+        self._by_name: dict[str, set[Task]] = defaultdict(set)
+        self._by_func: dict[str, set[Task]] = defaultdict(set)
+        self._by_module: dict[str, set[Task]] = defaultdict(set)
+        self._by_namespace: dict[str, set[Task]] = defaultdict(set)
+        self.update(tasks)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({set(self)!r})"
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # rebuild the indexes rather than pickling them
+        return (self.__class__, (list(self),))
+
+    def add(self, task: Task) -> None:
+        if task in self:
+            return
+        super().add(task)
+        for index, key in self._get_index_keys(task):
+            index[key].add(task)
+
+    def discard(self, task: object) -> None:
+        if task not in self:
+            return
+        super().discard(task)
+        self._unindex(cast("Task", task))
+
+    def remove(self, task: Task) -> None:
+        if task not in self:
+            raise KeyError(task)
+        self.discard(task)
+
+    def pop(self) -> Task:
+        task = super().pop()
+        self._unindex(task)
+        return task
+
+    def clear(self) -> None:
+        super().clear()
+        self._by_name.clear()
+        self._by_func.clear()
+        self._by_module.clear()
+        self._by_namespace.clear()
+
+    def update(self, *others: Iterable[Task]) -> None:
+        for tasks in others:
+            for task in tasks:
+                self.add(task)
+
+    def difference_update(self, *others: Iterable[Any]) -> None:
+        # materialized first, as one of `others` may be this set
+        for task in [task for tasks in others for task in tasks]:
+            self.discard(task)
+
+    def intersection_update(self, *others: Iterable[Any]) -> None:
+        self.difference_update(set(self).difference(*others))
+
+    def symmetric_difference_update(self, other: Iterable[Task]) -> None:
+        other = set(other)
+        added = other - self
+        self.difference_update(other & self)
+        self.update(added)
+
+    def __ior__(self, other: AbstractSet[Task]) -> Self:  # type: ignore[override,misc]
+        if not isinstance(other, AbstractSet):
+            return NotImplemented
+        self.update(other)
+        return self
+
+    def __iand__(self, other: AbstractSet[object]) -> Self:
+        if not isinstance(other, AbstractSet):
+            return NotImplemented
+        self.intersection_update(other)
+        return self
+
+    def __isub__(self, other: AbstractSet[object]) -> Self:
+        if not isinstance(other, AbstractSet):
+            return NotImplemented
+        self.difference_update(other)
+        return self
+
+    def __ixor__(self, other: AbstractSet[Task]) -> Self:  # type: ignore[override,misc]
+        if not isinstance(other, AbstractSet):
+            return NotImplemented
+        self.symmetric_difference_update(other)
+        return self
+
+    def copy(self) -> TaskSet:
+        """
+        Returns a copy of this set, copying the indexes rather than rebuilding them.
+        """
+        copy = TaskSet()
+        set.update(copy, self)
+        for name in ("_by_name", "_by_func", "_by_module", "_by_namespace"):
+            index = getattr(copy, name)
+            for key, tasks in getattr(self, name).items():
+                index[key] = set(tasks)
+        return copy
+
+    def filter(
+        self,
+        name: str | None = None,
+        func: str | None = None,
+        module: str | None = None,
+        namespace: str | None = None,
+    ) -> set[Task]:
+        """
+        Returns the tasks matching all of the given `name`, dotted `func` path, `module`, and
+        `namespace`, or every task if none are given.
+        """
+        matches = [
+            index.get(key, set())
+            for index, key in (
+                (self._by_name, name),
+                (self._by_func, func),
+                (self._by_module, module),
+                (self._by_namespace, namespace),
+            )
+            if key is not None
+        ]
+        if not matches:
+            return set(self)
+        return set.intersection(*matches)
+
+    def _get_index_keys(self, task: Task) -> list[tuple[dict[str, set[Task]], str]]:
+        return [
+            (self._by_name, task.name),
+            (self._by_func, task.func),
+            (self._by_module, task.func.rpartition(".")[0]),
+            (self._by_namespace, task.namespace),
+        ]
+
+    def _unindex(self, task: Task) -> None:
+        for index, key in self._get_index_keys(task):
+            index[key].discard(task)
+            if not index[key]:
+                del index[key]
 
 
 @dataclass
 class TaskRegistry:
-    registered_tasks: set[Task] = field(default_factory=set)
+    registered_tasks: TaskSet = field(default_factory=TaskSet)
     created_tasks: set[Task] = field(default_factory=set)
+    created_tasks_by_pk: dict[int, Task] = field(default_factory=dict)
+    # the tasks registered by each imported tasks module, see `reload_module`
+    _module_tasks: dict[str, set[Task]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _recording: set[Task] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self):
+        if not isinstance(self.registered_tasks, TaskSet):
+            self.registered_tasks = TaskSet(self.registered_tasks)
+        if self.created_tasks and not self.created_tasks_by_pk:
+            self.created_tasks_by_pk = {task.pk: task for task in self.created_tasks}
         self._register_settings()
 
     def register(self, *args, **kwargs):
@@ -128,32 +297,246 @@ class TaskRegistry:
         # make mypy happy
         func = cast(Callable[..., Any], func)
 
-        self.registered_tasks.add(Task.objects.create_in_memory(func, kwargs))
+        task = Task.objects.create_in_memory(func, kwargs)
+        if task.after is not None:
+            check_acyclic(self, task)
+        self.registered_tasks.add(task)
+        if self._recording is not None:
+            self._recording.add(task)
+
+        if task.trigger is not None:
+            task.trigger.connect(task)
 
         return func
 
-    def autodiscover_tasks(self):
+    def autodiscover_tasks(self) -> list[str]:
         """
         Autodiscover tasks from all apps in INSTALLED_APPS.
 
         This is a simplified version of Celery's autodiscover_tasks function.
+
+        Returns:
+            The dotted paths of the tasks modules that were found.
         """
+        modules = []
         for app_name in settings.INSTALLED_APPS:
             tasks_module = f"{app_name}.tasks"
             try:
-                importlib.import_module(tasks_module)
+                with self._record_tasks(tasks_module):
+                    importlib.import_module(tasks_module)
             except ImportError:
                 continue
+            modules.append(tasks_module)
+        return modules
+
+    def reload_module(self, module_name: str) -> tuple[set[Task], set[Task]]:
+        """
+        Import a tasks module again, e.g. after it was edited, replacing the tasks it registered with the
+        ones it registers now. The tasks of other modules are left alone. A module that was not imported
+        yet is imported.
+
+        If the module fails to import, its previous tasks are registered again and the error is raised.
+
+        Returns:
+            The tasks that are no longer registered, and the tasks that are new or whose options,
+            planned `django_q.models.Schedule`, or cluster changed, i.e. the ones that have to be
+            deleted from and saved to the database.
+        """
+        from django_q_registry.models import TASK_OPTIONS
+        from django_q_registry.routing import get_routes
+
+        module = sys.modules.get(module_name)
+        old = {
+            task
+            for task in self._module_tasks.get(module_name, set())
+            | self.filter(module=module_name)
+            if task in self.registered_tasks
+        }
+        self._remove(old)
+
+        self._module_tasks[module_name] = set()
+        try:
+            with self._record_tasks(module_name) as new:
+                if module is None:
+                    importlib.import_module(module_name)
+                else:
+                    importlib.reload(module)
+        except BaseException:
+            self._remove(new)
+            for task in old:
+                self._add(task)
+            self._module_tasks[module_name] = old
+            raise
+
+        def get_state(task: Task, routes: dict[Task, str | None]) -> list[Any]:
+            return [
+                [getattr(task, key) for key in TASK_OPTIONS],
+                task.to_schedule_dict() if task.is_periodic else None,
+                routes[task],
+            ]
+
+        old_routes = get_routes(old)
+        old_states = {task: get_state(task, old_routes) for task in old}
+        new_routes = get_routes(new)
+        changed = {
+            task for task in new if old_states.get(task) != get_state(task, new_routes)
+        }
+        return old - new, changed
+
+    def unload_module(self, module_name: str) -> set[Task]:
+        """
+        Unregister every task a tasks module registered, e.g. after its file was deleted. The module
+        itself stays imported, so `reload_module` can import it again if its file comes back.
+
+        Returns:
+            The tasks that are no longer registered.
+        """
+        removed = {
+            task
+            for task in self._module_tasks.pop(module_name, set())
+            | self.filter(module=module_name)
+            if task in self.registered_tasks
+        }
+        self._remove(removed)
+        return removed
+
+    @contextlib.contextmanager
+    def _record_tasks(self, module_name: str) -> Iterator[set[Task]]:
+        """
+        Record the tasks registered in the block as tasks of `module_name`, see `reload_module`.
+        """
+        outer, self._recording = self._recording, set()
+        try:
+            yield self._recording
+        finally:
+            self._module_tasks.setdefault(module_name, set()).update(self._recording)
+            self._recording = outer
+
+    def _add(self, task: Task) -> None:
+        self.registered_tasks.add(task)
+        if task.trigger is not None:
+            task.trigger.connect(task)
+
+    def _remove(self, tasks: Iterable[Task]) -> None:
+        for task in list(tasks):
+            self.registered_tasks.discard(task)
+            if task.trigger is not None:
+                task.trigger.disconnect(task)
+
+    @contextlib.contextmanager
+    def override(
+        self, tasks: Iterable[Task] = (), *, snapshot: bool = False
+    ) -> Iterator[TaskRegistry]:
+        """
+        Swap in an empty set of registered tasks, or `tasks`, for the duration of the block, and put the
+        original ones back afterwards, e.g. in tests. With `snapshot`, the block starts from a copy of the
+        currently registered tasks instead, so changes made in it do not leak out.
+
+        The registry is changed in place, so code that imported it sees the override. Unlike creating a
+        new `TaskRegistry`, this does not register `Q_REGISTRY["TASKS"]` again. Tasks registered in the
+        block have their `trigger` disconnected when it ends.
+
+            with registry.override():
+                registry.register(my_task, name="test")
+                ...
+        """
+        original = (self.registered_tasks, self.created_tasks, self.created_tasks_by_pk)
+        registered_tasks = self.registered_tasks.copy() if snapshot else TaskSet()
+        registered_tasks.update(tasks)
+        self.registered_tasks = registered_tasks
+        self.created_tasks = set()
+        self.created_tasks_by_pk = {}
+        try:
+            yield self
+        finally:
+            for task in self.registered_tasks:
+                if task.trigger is None or task in original[0]:
+                    continue
+                task.trigger.disconnect(task)
+                # put back the trigger of a task with the same name it replaced
+                for replaced in original[0].filter(name=task.name):
+                    if replaced.trigger is not None:
+                        replaced.trigger.connect(replaced)
+            self.registered_tasks, self.created_tasks, self.created_tasks_by_pk = (
+                original
+            )
+
+    def unregister(self, task: Task | str) -> set[Task]:
+        """
+        Remove a registered task, or every registered task with the given name, from the registry, e.g.
+        to drop feature-flagged tasks before `setup_periodic_tasks` syncs the registry to the database.
+        Any `trigger` of the removed tasks is disconnected.
+
+        Returns:
+            The tasks that were removed, which is empty if none matched.
+        """
+        if isinstance(task, str):
+            tasks = self.registered_tasks.filter(name=task)
+        else:
+            tasks = {task} & self.registered_tasks.filter(name=task.name)
+
+        self._remove(tasks)
+        return tasks
+
+    def filter(
+        self,
+        name: str | None = None,
+        func: str | None = None,
+        module: str | None = None,
+        namespace: str | None = None,
+    ) -> set[Task]:
+        """
+        Returns the registered tasks matching all of the given `name`, dotted `func` path, `module`,
+        and `namespace`, e.g. `registry.filter(module="myapp.tasks")`.
+        """
+        return self.registered_tasks.filter(
+            name=name, func=func, module=module, namespace=namespace
+        )
+
+    def get(
+        self,
+        name: str | None = None,
+        func: str | None = None,
+        module: str | None = None,
+        namespace: str | None = None,
+    ) -> Task:
+        """
+        Returns the one registered task matching all of the given `name`, dotted `func` path,
+        `module`, and `namespace`.
+
+        Raises:
+            LookupError: If no task, or more than one task, matches.
+        """
+        tasks = self.filter(name=name, func=func, module=module, namespace=namespace)
+        if len(tasks) != 1:
+            msg = f"Expected one registered task to match, found {len(tasks)}."
+            raise LookupError(msg)
+        return tasks.pop()
+
+    def find_by_schedule_name(self, schedule_name: str) -> Task | None:
+        """
+        Find the registered task whose `django_q.models.Schedule` is named `schedule_name`.
+
+        Django Q uses the `Schedule` name as the `group` of every task it enqueues from that `Schedule`,
+        so this maps a running or finished Django Q task back to the registered task it came from.
+        """
+        suffix = app_settings.PERIODIC_TASK_SUFFIX
+        if not schedule_name.endswith(suffix):
+            return None
+        tasks = self.filter(name=schedule_name[: -len(suffix)])
+        return next(iter(tasks), None)
 
-    def update_created_tasks(self, tasks: TaskQuerySet) -> None:
+    def update_created_tasks(self, tasks: Iterable[Task]) -> None:
         """
-        Update the `created_tasks` class attribute with the tasks that were created in the database.
+        Update the `created_tasks` class attribute with the tasks that were created in the database,
+        and `created_tasks_by_pk` with the same tasks by primary key.
 
         Args:
             tasks:
-                A queryset of `Task` objects that were created in the database.
+                The `Task` objects that were created in the database, e.g. a queryset.
         """
-        self.created_tasks = set(tasks)
+        self.created_tasks_by_pk = {task.pk: task for task in tasks}
+        self.created_tasks = set(self.created_tasks_by_pk.values())
 
 
 registry = TaskRegistry()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from django.db import models
+from django_q.models import Task as QTask
+
+from django_q_registry.conf import app_settings
+
+if TYPE_CHECKING:
+    from django_q_registry.models import Task
+
+
+def get_runtimes(
+    schedule_names: Iterable[str], using: str | None = None
+) -> dict[str, timedelta]:
+    """
+    Returns the average runtime of the successful runs of each schedule in `schedule_names` that has
+    any, in a single query, on the `using` database alias if given.
+    """
+    return dict(
+        QTask.objects.db_manager(using)
+        .filter(group__in=list(schedule_names), success=True)
+        .order_by()
+        .values("group")
+        .annotate(
+            runtime=models.Avg(
+                models.ExpressionWrapper(
+                    models.F("stopped") - models.F("started"),
+                    output_field=models.DurationField(),
+                )
+            )
+        )
+        .values_list("group", "runtime")
+    )
+
+
+def get_routes(
+    tasks: Iterable[Task], using: str | None = None
+) -> dict[Task, str | None]:
+    """
+    Returns the Django Q cluster each of `tasks` should run on, according to the `Q_REGISTRY["ROUTING"]`
+    setting.
+
+    A task registered with an explicit `cluster` (or `queue`) always runs there, and a task registered
+    with a `priority` runs on the cluster `Q_REGISTRY["PRIORITIES"]` maps it to. Every other task is
+    routed to `ROUTING["DEFAULT_CLUSTER"]`, or in `"auto"` mode, to `ROUTING["BULK_CLUSTER"]` if its
+    average runtime so far is at least `ROUTING["THRESHOLD"]` seconds, and to
+    `ROUTING["FAST_CLUSTER"]` if it is below. Tasks that have not run yet go to the default cluster.
+    A cluster of `None` is Django Q's default cluster. Runtimes are read from the `using` database
+    alias if given.
+    """
+    routing = app_settings.ROUTING
+    default_cluster = routing.get("DEFAULT_CLUSTER")
+    tasks = list(tasks)
+
+    runtimes = {}
+    if routing.get("MODE") == "auto":
+        runtimes = get_runtimes(
+            (
+                task.schedule_name
+                for task in tasks
+                if "cluster" not in task.kwargs and task.priority is None
+            ),
+            using=using,
+        )
+    threshold = timedelta(seconds=routing.get("THRESHOLD", 60))
+
+    routes = {}
+    for task in tasks:
+        if "cluster" in task.kwargs:
+            routes[task] = task.kwargs["cluster"]
+        elif task.priority is not None:
+            routes[task] = app_settings.PRIORITIES[task.priority]
+        elif task.schedule_name in runtimes:
+            routes[task] = (
+                routing.get("BULK_CLUSTER", default_cluster)
+                if runtimes[task.schedule_name] >= threshold
+                else routing.get("FAST_CLUSTER", default_cluster)
+            )
+        else:
+            routes[task] = default_cluster
+    return routes
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from django.dispatch import Signal
+
+# Sent by `TaskQuerySet.create_from_registry`, `TaskQuerySet.delete_dangling_objects`, and their async
+# counterparts, with the `Task` model as the sender. See `django_q_registry.tracing.SyncStats` for
+# `stats`.
+
+# args: operation, using, namespace
+pre_sync = Signal()
+
+# args: operation, using, namespace, stats, exception
+post_sync = Signal()
+
+# args: tasks, using, stats
+task_created = Signal()
+
+# args: tasks, using, stats
+task_updated = Signal()
+
+# args: tasks, using, stats
+task_deleted = Signal()
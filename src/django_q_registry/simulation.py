@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import heapq
+import math
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from django_q_registry.forecast import get_run_times
+from django_q_registry.routing import get_runtimes
+
+if TYPE_CHECKING:
+    from django_q_registry.models import Task
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    """
+    The outcome of replaying task runs against a number of workers, see `simulate`. Waits are in
+    seconds, from when a run was due until a worker picked it up.
+    """
+
+    workers: int
+    runs: int
+    mean_wait: float
+    p95_wait: float
+    max_wait: float
+    utilization: float
+
+
+def get_runtime_snapshot(tasks: Iterable[Task]) -> dict[str, float]:
+    """
+    Returns the average runtime in seconds of each of `tasks` that has run before, keyed by task name,
+    in a single query. The snapshot can be saved and passed to `get_arrivals` later, without a
+    database.
+    """
+    tasks = list(tasks)
+    runtimes = get_runtimes(task.schedule_name for task in tasks)
+    return {
+        task.name: runtimes[task.schedule_name].total_seconds()
+        for task in tasks
+        if task.schedule_name in runtimes
+    }
+
+
+def get_arrivals(
+    tasks: Iterable[Task],
+    start: datetime,
+    end: datetime,
+    runtimes: dict[str, float],
+    default_runtime: float = 1.0,
+) -> list[tuple[float, float]]:
+    """
+    Returns a `(due, runtime)` pair for every run of `tasks` from `start` to `end`, ordered by `due`.
+    `due` is in seconds since `start`. Runtimes are looked up by task name in `runtimes`, falling back
+    to `default_runtime`.
+    """
+    arrivals = [
+        ((run_time - start).total_seconds(), runtimes.get(task.name, default_runtime))
+        for task, times in get_run_times(tasks, start, end).items()
+        for run_time in times
+    ]
+    return sorted(arrivals)
+
+
+def get_arrivals_by_cluster(
+    tasks: Iterable[Task],
+    start: datetime,
+    end: datetime,
+    runtimes: dict[str, float],
+    routes: dict[Task, str | None],
+    default_runtime: float = 1.0,
+) -> dict[str | None, list[tuple[float, float]]]:
+    """
+    Returns the arrivals of `tasks`, see `get_arrivals`, split up by the Django Q cluster each task is
+    routed to in `routes`, as returned by `django_q_registry.routing.get_routes`.
+    """
+    tasks_by_cluster: dict[str | None, list[Task]] = defaultdict(list)
+    for task in tasks:
+        tasks_by_cluster[routes.get(task)].append(task)
+    return {
+        cluster: get_arrivals(cluster_tasks, start, end, runtimes, default_runtime)
+        for cluster, cluster_tasks in tasks_by_cluster.items()
+    }
+
+
+def simulate_clusters(
+    arrivals: dict[str | None, list[tuple[float, float]]],
+    workers: dict[str | None, int],
+) -> dict[str | None, SimulationResult]:
+    """
+    Replay the `arrivals` of each Django Q cluster, as returned by `get_arrivals_by_cluster`, against
+    its own `workers`. Every cluster takes runs off its own broker queue, so a backlog on one cluster
+    does not hold up the runs of another, e.g. of a higher `priority`.
+
+    Raises:
+        ValueError: If a cluster with arrivals has no number of workers.
+    """
+    if missing := [cluster for cluster in arrivals if cluster not in workers]:
+        names = ", ".join(cluster or "default cluster" for cluster in missing)
+        msg = f"No number of workers given for {names}."
+        raise ValueError(msg)
+    return {
+        cluster: simulate(cluster_arrivals, workers[cluster])
+        for cluster, cluster_arrivals in arrivals.items()
+    }
+
+
+def simulate(arrivals: list[tuple[float, float]], workers: int) -> SimulationResult:
+    """
+    Replay `arrivals`, as returned by `get_arrivals`, against `workers` workers that take runs off a
+    single first in, first out queue, like a Django Q cluster.
+
+    Utilization is the share of worker time spent running tasks, from the first run being due until
+    the last run finishing.
+    """
+    if workers < 1:
+        msg = f"workers must be at least 1, got {workers}."
+        raise ValueError(msg)
+    if not arrivals:
+        return SimulationResult(workers, 0, 0.0, 0.0, 0.0, 0.0)
+
+    free_at = [arrivals[0][0]] * workers
+    waits = []
+    busy = 0.0
+    finished = 0.0
+    for due, runtime in arrivals:
+        started = max(due, heapq.heappop(free_at))
+        heapq.heappush(free_at, started + runtime)
+        waits.append(started - due)
+        busy += runtime
+        finished = max(finished, started + runtime)
+
+    waits.sort()
+    elapsed = finished - arrivals[0][0]
+    return SimulationResult(
+        workers=workers,
+        runs=len(arrivals),
+        mean_wait=sum(waits) / len(waits),
+        p95_wait=waits[math.ceil(len(waits) * 0.95) - 1],
+        max_wait=waits[-1],
+        utilization=busy / (workers * elapsed) if elapsed else 0.0,
+    )
+
+
+def get_min_workers(arrivals: list[tuple[float, float]], target_wait: float) -> int:
+    """
+    Returns the fewest workers for which the 95th percentile wait of `arrivals` is at most
+    `target_wait` seconds.
+
+    Adding workers never makes a first in, first out queue wait longer, so this is a binary search
+    between one worker and one worker per run.
+    """
+    lowest, highest = 1, max(1, len(arrivals))
+    while lowest < highest:
+        workers = (lowest + highest) // 2
+        if simulate(arrivals, workers).p95_wait <= target_wait:
+            highest = workers
+        else:
+            lowest = workers + 1
+    return lowest
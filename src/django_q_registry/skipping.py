@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from django.utils import timezone
+from django_q.models import Schedule
+
+from django_q_registry.conf import app_settings
+from django_q_registry.forecast import get_following_run
+
+if TYPE_CHECKING:
+    from django_q_registry.registry import TaskRegistry
+
+logger = logging.getLogger(__name__)
+
+
+def skip_due_runs(
+    registry: TaskRegistry | None = None, lookahead: int | None = None
+) -> int:
+    """
+    Evaluate the `skip_if` option of every task in `registry` whose `django_q.models.Schedule` is due
+    within `lookahead` seconds, and move the `next_run` of the ones to skip past their next run, so the
+    Django Q scheduler never enqueues it. Defaults to the global registry and
+    `Q_REGISTRY["SKIP_LOOKAHEAD"]`. Meant to be registered as a periodic task itself, every minute.
+
+    Predicates are evaluated here, outside of the transaction in which the scheduler locks the due
+    schedules, and a skipped run costs neither a broker message nor a worker. `next_run` is only moved
+    if it did not change since it was read, so a run the scheduler enqueued in the meantime is not
+    skipped twice. A predicate that fails is logged and the run goes ahead.
+
+    Returns:
+        The number of runs skipped.
+    """
+    if registry is None:
+        from django_q_registry.registry import registry as default_registry
+
+        registry = default_registry
+    if lookahead is None:
+        lookahead = app_settings.SKIP_LOOKAHEAD
+
+    tasks = {
+        task.schedule_name: task
+        for task in registry.registered_tasks
+        if task.skip_if is not None
+    }
+    if not tasks:
+        return 0
+
+    now = timezone.now()
+    skipped = 0
+    for schedule in (
+        Schedule.objects.filter(
+            name__in=list(tasks), next_run__lte=now + timedelta(seconds=lookahead)
+        )
+        .exclude(schedule_type=Schedule.ONCE)
+        .exclude(repeats=0)
+    ):
+        task = tasks[schedule.name]
+        try:
+            should_skip = task.should_skip()
+        except Exception:
+            logger.exception("skip_if of %s failed, running it anyway", task)
+            continue
+        if not should_skip:
+            continue
+
+        if Schedule.objects.filter(pk=schedule.pk, next_run=schedule.next_run).update(
+            next_run=get_following_run(schedule, now)
+        ):
+            task.record_skip()
+            skipped += 1
+    return skipped
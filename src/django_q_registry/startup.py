@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import gc
+import hashlib
+import json
+import logging
+import os
+import pydoc
+import socket
+import sys
+import warnings
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db import router
+from django.utils import timezone
+from django_q.humanhash import uuid
+
+from django_q_registry.conf import app_settings
+from django_q_registry.models import TASK_OPTIONS
+from django_q_registry.models import SyncLease
+from django_q_registry.models import Task
+from django_q_registry.registry import TaskRegistry
+from django_q_registry.routing import get_routes
+
+logger = logging.getLogger(__name__)
+
+# `SyncLease.name` of a sync of every namespace
+ALL_NAMESPACES = "*"
+
+
+def get_digest(
+    tasks: Iterable[Task],
+    generation: str | None = None,
+    routes: dict[Task, str | None] | None = None,
+) -> str:
+    """
+    Returns a hash of everything about `tasks` that is saved to the database, so that a sync can be
+    skipped if nothing changed since the last one: their options, and the `django_q.models.Schedule`
+    each is planned to be saved as, including the cluster it is routed to in `routes`. Runtime options
+    that change the `Schedule`, like `fanout` or `priority`, and changes to `Q_REGISTRY["ROUTING"]` or
+    `Q_REGISTRY["PRIORITIES"]` are part of it, but ones that do not, like `skip_if`, are not.
+    """
+    routes = routes or {}
+    entries = sorted(
+        json.dumps(
+            [
+                task.name,
+                task.func,
+                task.kwargs,
+                [getattr(task, key) for key in TASK_OPTIONS],
+                task.to_schedule_dict() if task.is_periodic else None,
+                routes.get(task, task.kwargs.get("cluster")),
+            ],
+            cls=DjangoJSONEncoder,
+            sort_keys=True,
+        )
+        for task in tasks
+    )
+    entries.append(generation or "")
+    return hashlib.sha256("\0".join(entries).encode()).hexdigest()
+
+
+def sync_registry(
+    registry: TaskRegistry,
+    namespace: str | None = None,
+    generation: str | None = None,
+    using: str | None = None,
+) -> bool:
+    """
+    Sync `registry` to the database, like `setup_periodic_tasks`, from whichever of many processes
+    calling this at once wins a lease, and only if the registry changed since the last sync.
+
+    When the registry did not change, which is the common case, this costs a single query, or two if
+    `Q_REGISTRY["ROUTING"]` routes tasks by their runtimes, as routes are part of the change. Otherwise,
+    the lease is a `SyncLease` row that one process claims with a conditional update, so exactly one
+    process syncs while the others carry on. A lease held by a process that crashed expires after
+    `Q_REGISTRY["SYNC_LEASE_TTL"]` seconds.
+
+    Args:
+        registry:
+            The registry to sync.
+        namespace:
+            Only sync the tasks of this namespace, see `TaskQuerySet.create_from_registry`. Defaults to
+            all of them.
+        generation:
+            The release syncing the registry, see `TaskQuerySet.create_from_registry`. Defaults to
+            `Q_REGISTRY["GENERATION"]`.
+        using:
+            The database alias to sync to. Defaults to the one the database routers pick for writes.
+
+    Returns:
+        Whether this process synced the registry.
+    """
+    using = using or router.db_for_write(SyncLease)
+    generation = generation or app_settings.GENERATION
+    name = ALL_NAMESPACES if namespace is None else namespace
+    tasks = registry.filter(namespace=namespace)
+    routes = get_routes(tasks, using=using)
+    digest = get_digest(tasks, generation, routes)
+
+    leases = SyncLease.objects.using(using).filter(name=name)
+    synced_digest = leases.values_list("digest", flat=True).first()
+    if synced_digest == digest:
+        return False
+    if synced_digest is None:
+        SyncLease.objects.using(using).get_or_create(name=name)
+
+    holder = f"{socket.gethostname()}:{os.getpid()}:{uuid()[1]}"
+    now = timezone.now()
+    acquired = (
+        leases.filter(models.Q(expires_at__isnull=True) | models.Q(expires_at__lt=now))
+        .exclude(digest=digest)
+        .update(
+            holder=holder,
+            expires_at=now + timedelta(seconds=app_settings.SYNC_LEASE_TTL),
+        )
+    )
+    if not acquired:
+        return False
+
+    logger.info("Syncing the registry as %s", holder)
+    try:
+        Task.objects.create_from_registry(
+            registry,
+            routes=routes,
+            using=using,
+            namespace=namespace,
+            generation=generation,
+        )
+        Task.objects.delete_dangling_objects(
+            registry, using=using, namespace=namespace, generation=generation
+        )
+    except Exception:
+        leases.filter(holder=holder).update(holder="", expires_at=None)
+        raise
+
+    leases.filter(holder=holder).update(
+        digest=digest, holder="", expires_at=None, synced_at=timezone.now()
+    )
+    return True
+
+
+def import_task_functions(registry: TaskRegistry) -> int:
+    """
+    Import the function of each task in `registry`, and the module it is in, so a process that forks
+    Django Q workers has them loaded already, rather than each worker importing its own copy on the
+    task's first run. A function that cannot be imported is logged and left to fail in the worker.
+
+    Returns:
+        The number of functions imported.
+    """
+    imported = 0
+    for func in sorted({task.func for task in registry.registered_tasks}):
+        try:
+            located = pydoc.locate(func)
+        except pydoc.ErrorDuringImport:
+            located = None
+        if located is None:
+            logger.warning("Could not import %s", func)
+            continue
+        imported += 1
+    return imported
+
+
+def sync_on_startup(registry: TaskRegistry) -> bool:
+    """
+    Sync `registry` with `sync_registry` as a Django Q cluster starts, if `Q_REGISTRY["SYNC_ON_STARTUP"]`
+    is set, so schedules always match the code the workers run. Called in `AppConfig.ready`, only in the
+    `qcluster` process, see `is_cluster_process`, so each cluster syncs once per start, before it forks
+    its workers, rather than every worker each time it is spawned or recycled.
+
+    A failed sync is logged rather than raised, so it does not keep the cluster from starting.
+
+    Returns:
+        Whether this process synced the registry.
+    """
+    if not app_settings.SYNC_ON_STARTUP:
+        return False
+
+    # the cluster forks its workers right after `AppConfig.ready`, with no later hook to sync from
+    with warnings.catch_warnings():
+        warnings.filterwarnings(
+            "ignore",
+            message="Accessing the database during app initialization",
+            category=RuntimeWarning,
+        )
+        try:
+            return sync_registry(registry, namespace=app_settings.SYNC_NAMESPACE)
+        except Exception:
+            logger.exception("Syncing the registry on cluster startup failed")
+            return False
+
+
+def is_cluster_process() -> bool:
+    """
+    Whether this process is a Django Q cluster started with the `qcluster` management command, the
+    process that forks the workers.
+    """
+    return sys.argv[1:2] == ["qcluster"]
+
+
+def prepare_fork(registry: TaskRegistry, import_callables: bool = False) -> int:
+    """
+    Get this process ready to fork Django Q workers that share as much of its memory as they can, after
+    `registry` is built. Enabled in `AppConfig.ready` by `Q_REGISTRY["PREFORK"]`, which only calls it
+    in the `qcluster` process, see `is_cluster_process`, before it forks the workers.
+
+    Garbage is collected, then every object left is moved to the permanent generation with
+    `gc.freeze()`, so the garbage collector of a worker never writes to them and the memory pages they
+    are in stay shared with this process rather than being copied into each worker.
+
+    Args:
+        registry:
+            The built registry.
+        import_callables:
+            Also import the function of every registered task first, see `import_task_functions`.
+
+    Returns:
+        The number of frozen objects.
+    """
+    if import_callables:
+        logger.info("Imported %d task functions", import_task_functions(registry))
+    gc.collect()
+    gc.freeze()
+    frozen = gc.get_freeze_count()
+    logger.info("Froze %d objects before forking", frozen)
+    return frozen
+
+
+@dataclass(frozen=True)
+class MemoryUsage:
+    """
+    The memory of a process, in bytes. `shared` is the part of `rss` that is shared with other processes,
+    like the pages a Django Q worker still shares with the cluster process it was forked from, and
+    `private` the part that is not.
+    """
+
+    rss: int
+    shared: int
+    private: int
+
+
+def get_memory_usage(pid: int | None = None) -> MemoryUsage | None:
+    """
+    Returns the memory usage of the process `pid`, this one by default, from Linux's
+    `/proc/<pid>/smaps_rollup`, or `None` where that is not available. Compare the `private` memory of
+    a Django Q worker with and without `Q_REGISTRY["PREFORK"]` to see how much memory it saves.
+    """
+    try:
+        lines = (
+            Path(f"/proc/{pid or os.getpid()}/smaps_rollup").read_text().splitlines()
+        )
+    except OSError:
+        return None
+
+    fields = {}
+    for line in lines:
+        key, _, value = line.partition(":")
+        if value.strip().endswith(" kB"):
+            fields[key] = int(value.split()[0]) * 1024
+    return MemoryUsage(
+        rss=fields.get("Rss", 0),
+        shared=fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        private=fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    )
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import contextlib
+import itertools
+import json
+from collections.abc import Iterable
+from collections.abc import Iterator
+from typing import Any
+from unittest import mock
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django_q.models import Schedule
+
+from django_q_registry.forecast import get_next_runs
+from django_q_registry.models import TASK_OPTIONS
+from django_q_registry.models import Task
+from django_q_registry.models import _timing_changed
+from django_q_registry.registry import TaskRegistry
+from django_q_registry.routing import get_routes
+from django_q_registry.timeouts import get_timeouts
+from django_q_registry.timeouts import set_timeout
+
+
+class InMemoryScheduleStore:
+    """
+    A stand-in for the database in tests, which keeps the `Task` and `django_q.models.Schedule` instances
+    a registry sync would save in dictionaries.
+
+    `create_from_registry` and `delete_dangling_objects` follow the contract of their `TaskQuerySet`
+    counterparts: tasks are matched on `name`, `func`, and `kwargs`, saved tasks get a primary key and
+    end up in `TaskRegistry.created_tasks`, new schedules and schedules whose timing changed get their
+    first `next_run`, other schedules keep theirs, and cleanup deletes the tasks and schedules that are
+    no longer registered, within a namespace if one is given. Generations, tombstones, and pauses are
+    not modelled. Routing and timeouts are applied, but `"auto"` routing and timeouts read runtimes from
+    the database.
+
+    Use `patch` to have `Task.objects` sync to the store, e.g. from `setup_periodic_tasks`.
+    """
+
+    def __init__(self) -> None:
+        self.tasks: dict[int, Task] = {}
+        self.schedules: dict[int, Schedule] = {}
+        self._pks_by_key: dict[tuple[str, str, str], int] = {}
+        self._pks = itertools.count(1)
+
+    def get_schedule(self, name: str) -> Schedule:
+        """
+        Returns the schedule of the task named `name`.
+
+        Raises:
+            KeyError: If there is no such schedule.
+        """
+        for pk, task in self.tasks.items():
+            if task.name == name and pk in self.schedules:
+                return self.schedules[pk]
+        raise KeyError(name)
+
+    def create_from_registry(
+        self,
+        registry: TaskRegistry,
+        routes: dict[Task, str | None] | None = None,
+        namespace: str | None = None,
+        only: Iterable[Task] | None = None,
+        **kwargs: Any,
+    ) -> list[Task]:
+        """
+        Save the tasks of `registry` to the store, see `TaskQuerySet.create_from_registry`. Database
+        arguments, like `using`, are accepted and ignored.
+
+        Returns:
+            The saved `Task` instances.
+        """
+        tasks = registry.filter(namespace=namespace)
+        if only is not None:
+            only = set(only)
+            tasks = {task for task in tasks if task in only}
+        if routes is None:
+            routes = get_routes(tasks)
+        timeouts = get_timeouts(tasks)
+
+        task_objs = {task: self._save_task(task) for task in tasks if task.pk is None}
+        periodic_objs = {
+            task: obj for task, obj in task_objs.items() if task.is_periodic
+        }
+        next_runs = get_next_runs(periodic_objs, timezone.now())
+
+        for task, obj in periodic_objs.items():
+            schedule_dict = task.to_schedule_dict()
+            schedule_dict["cluster"] = routes.get(task, schedule_dict.get("cluster"))
+            if task in timeouts:
+                set_timeout(schedule_dict, timeouts[task])
+            existing = self.schedules.get(obj.pk)
+            if existing is None or _timing_changed(existing, schedule_dict):
+                if task in next_runs:
+                    schedule_dict["next_run"] = next_runs[task]
+            elif "next_run" not in schedule_dict:
+                schedule_dict["next_run"] = existing.next_run
+            self.schedules[obj.pk] = Schedule(**schedule_dict)
+
+        if only is None:
+            registry.update_created_tasks(task_objs.values())
+        else:
+            registry.update_created_tasks(
+                [*registry.created_tasks, *task_objs.values()]
+            )
+        return list(task_objs.values())
+
+    def delete_dangling_objects(
+        self, registry: TaskRegistry, namespace: str | None = None, **kwargs: Any
+    ) -> list[Task]:
+        """
+        Delete the tasks, and their schedules, that are not in `registry.created_tasks`, see
+        `TaskQuerySet.delete_dangling_objects`.
+
+        Returns:
+            The deleted `Task` instances.
+        """
+        deleted = [
+            task
+            for pk, task in self.tasks.items()
+            if pk not in registry.created_tasks_by_pk
+            and (namespace is None or task.namespace == namespace)
+        ]
+        for task in deleted:
+            del self.tasks[task.pk]
+            self.schedules.pop(task.pk, None)
+            del self._pks_by_key[_get_key(task)]
+        return deleted
+
+    async def acreate_from_registry(
+        self, registry: TaskRegistry, **kwargs: Any
+    ) -> list[Task]:
+        return self.create_from_registry(registry, **kwargs)
+
+    async def adelete_dangling_objects(
+        self, registry: TaskRegistry, **kwargs: Any
+    ) -> list[Task]:
+        return self.delete_dangling_objects(registry, **kwargs)
+
+    @contextlib.contextmanager
+    def patch(self) -> Iterator[InMemoryScheduleStore]:
+        """
+        Have `Task.objects.create_from_registry`, `Task.objects.delete_dangling_objects`, and their async
+        counterparts use this store for the duration of the block.
+        """
+        with contextlib.ExitStack() as stack:
+            for name in (
+                "create_from_registry",
+                "delete_dangling_objects",
+                "acreate_from_registry",
+                "adelete_dangling_objects",
+            ):
+                stack.enter_context(
+                    mock.patch.object(Task.objects, name, getattr(self, name))
+                )
+            yield self
+
+    def _save_task(self, task: Task) -> Task:
+        key = _get_key(task)
+        pk = self._pks_by_key.get(key) or next(self._pks)
+        obj = Task(
+            pk=pk,
+            name=task.name,
+            func=task.func,
+            kwargs=task.kwargs,
+            **{option: getattr(task, option) for option in TASK_OPTIONS},
+        )
+        self._pks_by_key[key] = pk
+        self.tasks[pk] = obj
+        return obj
+
+
+def _get_key(task: Task) -> tuple[str, str, str]:
+    return task.name, task.func, json.dumps(task.kwargs, cls=DjangoJSONEncoder)
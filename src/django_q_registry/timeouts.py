@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import ast
+import math
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import timedelta
+from typing import TYPE_CHECKING
+from typing import Any
+
+from django.db import models
+from django_q.conf import Conf
+from django_q.models import Schedule
+from django_q.models import Task as QTask
+
+from django_q_registry.conf import app_settings
+
+if TYPE_CHECKING:
+    from django_q_registry.models import Task
+    from django_q_registry.registry import TaskRegistry
+
+# the `timeout` option of a task whose timeout is derived from its runtimes, see `get_timeouts`
+AUTO = "auto"
+
+
+def get_percentile_runtimes(
+    schedule_names: Iterable[str],
+    percentile: float,
+    min_runs: int = 1,
+    using: str | None = None,
+) -> dict[str, timedelta]:
+    """
+    Returns the `percentile` runtime, by the nearest-rank method, of the successful runs of each schedule
+    in `schedule_names` that has at least `min_runs` of them, in a single query, on the `using` database
+    alias if given.
+
+    How many runs there are to go on is bounded by Django Q's `save_limit`, which keeps the most recent
+    successful runs.
+    """
+    runtimes: dict[str, list[timedelta]] = defaultdict(list)
+    for group, runtime in (
+        QTask.objects.db_manager(using)
+        .filter(group__in=list(schedule_names), success=True)
+        .annotate(
+            runtime=models.ExpressionWrapper(
+                models.F("stopped") - models.F("started"),
+                output_field=models.DurationField(),
+            )
+        )
+        .values_list("group", "runtime")
+    ):
+        runtimes[group].append(runtime)
+
+    return {
+        group: sorted(group_runtimes)[
+            max(math.ceil(percentile / 100 * len(group_runtimes)) - 1, 0)
+        ]
+        for group, group_runtimes in runtimes.items()
+        if len(group_runtimes) >= min_runs
+    }
+
+
+def get_timeouts(tasks: Iterable[Task], using: str | None = None) -> dict[Task, int]:
+    """
+    Returns the timeout, in seconds, of each of `tasks` registered with `timeout="auto"` that has run
+    successfully at least `Q_REGISTRY["TIMEOUTS"]["MIN_RUNS"]` times, according to the
+    `Q_REGISTRY["TIMEOUTS"]` setting.
+
+    The timeout is the `PERCENTILE` runtime of the task times `HEADROOM`, rounded up to whole seconds
+    and at least `MINIMUM` seconds. It is kept below the cluster's `retry`, so the broker does not hand
+    a task that is still running to another worker. Tasks that have not run often enough are left out,
+    and so use the cluster's `timeout`. Runtimes are read from the `using` database alias if given, and
+    only if any task needs them.
+    """
+    settings = app_settings.TIMEOUTS
+    tasks = [task for task in tasks if task.kwargs.get("timeout") == AUTO]
+    if not tasks:
+        return {}
+
+    runtimes = get_percentile_runtimes(
+        (task.schedule_name for task in tasks),
+        percentile=settings.get("PERCENTILE", 99),
+        min_runs=settings.get("MIN_RUNS", 20),
+        using=using,
+    )
+
+    timeouts = {}
+    for task in tasks:
+        if task.schedule_name not in runtimes:
+            continue
+        timeout = max(
+            math.ceil(
+                runtimes[task.schedule_name].total_seconds()
+                * settings.get("HEADROOM", 2)
+            ),
+            settings.get("MINIMUM", 60),
+        )
+        if Conf.RETRY:
+            timeout = min(timeout, Conf.RETRY - 1)
+        timeouts[task] = timeout
+    return timeouts
+
+
+def set_timeout(schedule_dict: dict[str, Any], timeout: int) -> None:
+    """
+    Have the tasks Django Q enqueues from the `django_q.models.Schedule` of `schedule_dict` time out after
+    `timeout` seconds, rather than after the cluster's `timeout`, by passing it in the `q_options` of the
+    `Schedule`'s `kwargs`.
+    """
+    kwargs = parse_kwargs(schedule_dict.get("kwargs"))
+    kwargs["q_options"] = {**kwargs.get("q_options", {}), "timeout": timeout}
+    schedule_dict["kwargs"] = kwargs
+
+
+def parse_kwargs(kwargs: dict[str, Any] | str | None) -> dict[str, Any]:
+    """
+    Returns the `kwargs` of a `django_q.models.Schedule` as a new dict.
+
+    Raises:
+        ValueError: If `kwargs` is a string that is not a dict literal, e.g. Django Q's `"a=1, b=2"` form.
+    """
+    if not kwargs:
+        return {}
+    if isinstance(kwargs, str):
+        try:
+            kwargs = ast.literal_eval(kwargs)
+        except (SyntaxError, ValueError):
+            kwargs = None
+        if not isinstance(kwargs, dict):
+            msg = "The kwargs of a task with a timeout must be a dict."
+            raise ValueError(msg)
+    return dict(kwargs)
+
+
+def refresh_timeouts(registry: TaskRegistry | None = None) -> int:
+    """
+    Update the timeouts of the `django_q.models.Schedule` instances of the tasks in `registry` registered
+    with `timeout="auto"` from their latest runtimes, without a full `setup_periodic_tasks`. Defaults to
+    the global registry. Meant to be registered as a periodic task itself.
+
+    Returns:
+        The number of `Schedule` instances whose timeout changed.
+    """
+    if registry is None:
+        from django_q_registry.registry import registry as default_registry
+
+        registry = default_registry
+
+    timeouts = {
+        task.schedule_name: timeout
+        for task, timeout in get_timeouts(registry.registered_tasks).items()
+    }
+
+    changed = []
+    for schedule in Schedule.objects.filter(name__in=list(timeouts)):
+        schedule_dict = {"kwargs": schedule.kwargs}
+        set_timeout(schedule_dict, timeouts[schedule.name])
+        if parse_kwargs(schedule.kwargs) != schedule_dict["kwargs"]:
+            schedule.kwargs = schedule_dict["kwargs"]
+            changed.append(schedule)
+
+    Schedule.objects.bulk_update(changed, ["kwargs"])
+    return len(changed)
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import time
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+
+from django_q_registry.signals import post_sync
+from django_q_registry.signals import pre_sync
+
+try:
+    from opentelemetry import context
+    from opentelemetry import trace
+except ImportError:  # pragma: no cover
+    context = None  # type: ignore[assignment,unused-ignore]
+    trace = None  # type: ignore[assignment,unused-ignore]
+
+# the spans of the syncs running in this context, innermost last, see `start_span`
+_spans: contextvars.ContextVar[tuple[tuple[Any, object], ...]] = contextvars.ContextVar(
+    "django_q_registry_spans", default=()
+)
+
+
+@dataclass(eq=False)
+class SyncStats:
+    """
+    How long a phase of a registry sync took, how many queries it ran, and how many `Task` rows it
+    wrote or deleted. Sent as `stats` with the signals in `django_q_registry.signals`.
+
+    Queries are counted with a database execute wrapper, so they are counted with `DEBUG` off as well.
+    """
+
+    duration: float = 0.0
+    queries: int = 0
+    rows: int = 0
+
+    def __call__(
+        self,
+        execute: Callable[..., Any],
+        sql: str,
+        params: Any,
+        many: bool,
+        context: Any,
+    ) -> Any:
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def add(self, other: SyncStats) -> None:
+        self.duration += other.duration
+        self.queries += other.queries
+        self.rows += other.rows
+
+    @contextlib.contextmanager
+    def measure(self, using: str) -> Iterator[SyncStats]:
+        """
+        Add the time spent in this block, and the queries it runs on `using`, to these stats.
+        """
+        start = time.perf_counter()
+        try:
+            with connections[using].execute_wrapper(self):
+                yield self
+        finally:
+            self.duration += time.perf_counter() - start
+
+    @contextlib.asynccontextmanager
+    async def ameasure(self, using: str) -> AsyncIterator[SyncStats]:
+        """
+        Async version of `measure`. The execute wrapper is installed from the thread Django's async ORM
+        interface runs its queries in.
+        """
+        start = time.perf_counter()
+        await sync_to_async(self._install)(using)
+        try:
+            yield self
+        finally:
+            await sync_to_async(self._uninstall)(using)
+            self.duration += time.perf_counter() - start
+
+    def _install(self, using: str) -> None:
+        connections[using].execute_wrappers.append(self)
+
+    def _uninstall(self, using: str) -> None:
+        connections[using].execute_wrappers.remove(self)
+
+
+@contextlib.contextmanager
+def sync_signals(
+    sender: type, operation: str, using: str, namespace: str | None
+) -> Iterator[SyncStats]:
+    """
+    Send `pre_sync` and `post_sync` around a registry sync, measuring it in between. `post_sync` is
+    sent even if the sync fails, with the `exception`.
+    """
+    stats = SyncStats()
+    pre_sync.send(sender=sender, operation=operation, using=using, namespace=namespace)
+    exception = None
+    try:
+        with stats.measure(using):
+            yield stats
+    except Exception as err:
+        exception = err
+        raise
+    finally:
+        post_sync.send(
+            sender=sender,
+            operation=operation,
+            using=using,
+            namespace=namespace,
+            stats=stats,
+            exception=exception,
+        )
+
+
+@contextlib.asynccontextmanager
+async def async_sync_signals(
+    sender: type, operation: str, using: str, namespace: str | None
+) -> AsyncIterator[SyncStats]:
+    """
+    Async version of `sync_signals`. The signals are sent synchronously, like the rest of Django's.
+    """
+    stats = SyncStats()
+    pre_sync.send(sender=sender, operation=operation, using=using, namespace=namespace)
+    exception = None
+    try:
+        async with stats.ameasure(using):
+            yield stats
+    except Exception as err:
+        exception = err
+        raise
+    finally:
+        post_sync.send(
+            sender=sender,
+            operation=operation,
+            using=using,
+            namespace=namespace,
+            stats=stats,
+            exception=exception,
+        )
+
+
+def start_span(operation: str, using: str, namespace: str | None) -> None:
+    """
+    Start an OpenTelemetry span for a registry sync and make it the current span, so spans of the
+    database instrumentation nest under it. Does nothing if OpenTelemetry is not installed.
+    """
+    if trace is None:
+        return
+
+    span = trace.get_tracer("django_q_registry").start_span(
+        f"django_q_registry.{operation}",
+        attributes={
+            "db.name": using,
+            "django_q_registry.namespace": namespace or "",
+        },
+    )
+    token = context.attach(trace.set_span_in_context(span))
+    _spans.set((*_spans.get(), (span, token)))
+
+
+def add_event(name: str, stats: SyncStats) -> None:
+    """
+    Record a phase of the current registry sync as an event of its span.
+    """
+    if not _spans.get():
+        return
+
+    span, _ = _spans.get()[-1]
+    span.add_event(name, attributes=_get_attributes(stats))
+
+
+def end_span(stats: SyncStats, exception: Exception | None = None) -> None:
+    """
+    End the span started by `start_span` and restore the span that was current before it.
+    """
+    if not _spans.get():
+        return
+
+    *outer, (span, token) = _spans.get()
+    _spans.set(tuple(outer))
+    span.set_attributes(_get_attributes(stats))
+    if exception is not None:
+        span.record_exception(exception)
+        span.set_status(trace.StatusCode.ERROR)
+    span.end()
+    context.detach(token)
+
+
+def _get_attributes(stats: SyncStats) -> dict[str, Any]:
+    return {
+        "django_q_registry.duration": stats.duration,
+        "django_q_registry.queries": stats.queries,
+        "django_q_registry.rows": stats.rows,
+    }
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from typing import Any
+
+from django.db import models
+from django.db import router
+from django.db import transaction
+from django.db.models import signals
+from django.utils import timezone
+from django_q.models import Schedule
+
+from django_q_registry._cache import make_key
+
+if TYPE_CHECKING:
+    from django_q_registry.models import Task
+
+
+@dataclass(frozen=True)
+class Trigger:
+    """
+    Run a registered task when a model signal fires, instead of, or as well as, on a schedule.
+
+    Use `post_save` or `post_delete` to create one, and pass it to `register_task` as `trigger`. Every
+    time the signal fires, the task is marked as dirty. The first change in a
+    `debounce` window enqueues a single run of the task at the end of that window; further changes in
+    the same window are coalesced into that run. The window is tracked in the database, see
+    `mark_dirty`.
+
+    Example:
+
+        from django_q.models import Schedule
+
+        from django_q_registry import register_task
+        from django_q_registry.triggers import post_save
+
+
+        @register_task(
+            trigger=post_save("myapp.Product"),
+            debounce=30,
+            # optional fallback schedule
+            schedule_type=Schedule.DAILY,
+        )
+        def rebuild_search_index():
+            ...
+    """
+
+    signal: signals.ModelSignal
+    sender: type[models.Model] | str
+
+    def connect(self, task: Task) -> None:
+        """
+        Connect `task` to this trigger's signal, replacing any previously connected task with the same
+        name.
+        """
+
+        def receiver(**kwargs: Any) -> None:
+            transaction.on_commit(lambda: mark_dirty(task))
+
+        self.disconnect(task)
+        self.signal.connect(
+            receiver,
+            sender=self.sender,
+            weak=False,
+            dispatch_uid=make_key("trigger", task.schedule_name),
+        )
+
+    def disconnect(self, task: Task) -> None:
+        """
+        Disconnect `task` from this trigger's signal.
+        """
+        self.signal.disconnect(
+            sender=self.sender, dispatch_uid=make_key("trigger", task.schedule_name)
+        )
+
+
+def post_save(model: type[models.Model] | str) -> Trigger:
+    """
+    Trigger a registered task whenever an instance of `model` is saved. `model` is a model class or an
+    `"app_label.ModelName"` string.
+    """
+    return Trigger(signal=signals.post_save, sender=model)
+
+
+def post_delete(model: type[models.Model] | str) -> Trigger:
+    """
+    Trigger a registered task whenever an instance of `model` is deleted. `model` is a model class or an
+    `"app_label.ModelName"` string.
+    """
+    return Trigger(signal=signals.post_delete, sender=model)
+
+
+def mark_dirty(task: Task) -> bool:
+    """
+    Mark `task` as dirty, and enqueue a run at the end of its debounce window if it is not dirty
+    already.
+
+    The debounce window is the one-off `django_q.models.Schedule` of the pending run itself: while it
+    exists, further changes are coalesced into it. The `Task` rows of `task` are locked while it is
+    looked up, so concurrent processes enqueue a single run between them, without relying on a shared
+    cache.
+
+    Returns:
+        Whether a run was enqueued.
+    """
+    from django_q_registry.models import Task
+
+    schedule = task.to_run_once_schedule(
+        next_run=timezone.now() + task.debounce, suffix=" - triggered"
+    )
+    using = router.db_for_write(Schedule)
+    with transaction.atomic(using=using):
+        list(
+            Task.objects.using(using)
+            .select_for_update()
+            .filter(name=task.name)
+            .values_list("pk", flat=True)
+        )
+        if (
+            Schedule.objects.using(using)
+            .filter(name=schedule.name, schedule_type=Schedule.ONCE)
+            .exists()
+        ):
+            return False
+        schedule.save(using=using)
+    return True
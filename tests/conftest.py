@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import itertools
 import logging
 import multiprocessing
+import os
+import sys
+import textwrap
 
+import pytest
 from django.conf import settings
 
 from .settings import DEFAULT_SETTINGS
@@ -10,15 +15,37 @@ from .settings import DEFAULT_SETTINGS
 pytest_plugins = []  # type: ignore
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmark", action="store_true", help="Run the tests marked as benchmarks."
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="benchmark, run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
 def pytest_configure(config):
     logging.disable(logging.CRITICAL)
 
     settings.configure(**DEFAULT_SETTINGS, **TEST_SETTINGS)
 
+    # importing the package reads the settings, so the plugin is loaded once they are configured
+    config.pluginmanager.import_plugin("django_q_registry.pytest_plugin")
+
 
 TEST_SETTINGS = {
     "INSTALLED_APPS": [
+        "django.contrib.admin",
+        "django.contrib.auth",
         "django.contrib.contenttypes",
+        "django.contrib.messages",
+        "django.contrib.sessions",
         "django_q",
         "django_q_registry",
     ],
@@ -32,3 +59,22 @@ TEST_SETTINGS = {
         "orm": "default",
     },
 }
+
+
+@pytest.fixture
+def tasks_module(tmp_path, monkeypatch):
+    """
+    Returns a function that writes the source of an importable `watched_tasks` module, each time with a
+    newer modification time, for tests that reload it.
+    """
+    monkeypatch.syspath_prepend(tmp_path)
+    path = tmp_path / "watched_tasks.py"
+    mtimes = itertools.count(1_000_000_000, 10)
+
+    def write(source):
+        path.write_text(textwrap.dedent(source))
+        mtime = next(mtimes)
+        os.utime(path, (mtime, mtime))
+
+    yield write
+    sys.modules.pop("watched_tasks", None)
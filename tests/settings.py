@@ -12,7 +12,11 @@ DEFAULT_SETTINGS = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": ":memory:",
-        }
+        },
+        "other": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": ":memory:",
+        },
     },
     "EMAIL_BACKEND": "django.core.mail.backends.locmem.EmailBackend",
     "LOGGING_CONFIG": None,
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import pytest
+from django.contrib.admin.sites import AdminSite
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django_q.models import Schedule
+from model_bakery import baker
+
+from django_q_registry.admin import EstimatedCountPaginator
+from django_q_registry.admin import TaskAdmin
+from django_q_registry.admin import TaskChangeList
+from django_q_registry.admin import add_run_stats
+from django_q_registry.models import Task
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def task_admin():
+    return TaskAdmin(Task, AdminSite())
+
+
+@pytest.fixture
+def request_():
+    request = RequestFactory().get("/")
+    request._messages = CookieStorage(request)
+    return request
+
+
+def test_add_run_stats():
+    schedule = baker.make("django_q.Schedule", name="test - QREGISTRY")
+    baker.make("django_q_registry.Task", q_schedule=schedule)
+    baker.make("django_q.Task", group=schedule.name, success=True, _quantity=3)
+    baker.make("django_q.Task", group=schedule.name, success=False, _quantity=2)
+    baker.make("django_q.Task", group="unrelated", success=True)
+
+    (task,) = add_run_stats(Task.objects.select_related("q_schedule"))
+
+    assert task.success_count == 3
+    assert task.failure_count == 2
+    assert task.last_run_at is not None
+
+
+def test_add_run_stats_no_runs():
+    baker.make("django_q_registry.Task", q_schedule=baker.make("django_q.Schedule"))
+    baker.make("django_q_registry.Task", q_schedule=None)
+
+    for task in add_run_stats(Task.objects.select_related("q_schedule")):
+        assert task.success_count == 0
+        assert task.failure_count == 0
+        assert task.last_run_at is None
+
+
+def test_changelist_run_stats_per_page(task_admin, django_assert_num_queries):
+    schedules = baker.make(
+        "django_q.Schedule",
+        name=iter([f"test{i} - QREGISTRY" for i in range(5)]),
+        _quantity=5,
+    )
+    baker.make("django_q_registry.Task", q_schedule=iter(schedules), _quantity=5)
+    for schedule in schedules:
+        baker.make("django_q.Task", group=schedule.name, success=True)
+    request = RequestFactory().get("/")
+    request.user = baker.make("auth.User", is_superuser=True, is_staff=True)
+    task_admin.list_per_page = 2
+
+    changelist = task_admin.get_changelist_instance(request)
+
+    assert isinstance(changelist, TaskChangeList)
+    assert [task.success_count for task in changelist.result_list] == [1, 1]
+
+    # the tasks, their successes, and their failures and last runs
+    with django_assert_num_queries(3):
+        add_run_stats(Task.objects.select_related("q_schedule"))
+
+
+def test_add_run_stats_indexes():
+    schedule = baker.make("django_q.Schedule", name="test - QREGISTRY")
+    baker.make("django_q_registry.Task", q_schedule=schedule)
+
+    with CaptureQueriesContext(connection) as queries:
+        add_run_stats(Task.objects.select_related("q_schedule"))
+
+    with connection.cursor() as cursor:
+        plans = []
+        for query in queries.captured_queries[1:]:
+            cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+            plans.append(" ".join(str(row) for row in cursor.fetchall()))
+
+    # neither aggregate scans the results table
+    assert len(plans) == 2
+    for plan in plans:
+        assert "SEARCH django_q_task USING" in plan
+        assert "SCAN django_q_task" not in plan
+
+
+def test_get_queryset_constant_queries(task_admin, request_, django_assert_num_queries):
+    baker.make(
+        "django_q_registry.Task",
+        q_schedule=iter(baker.make("django_q.Schedule", _quantity=5)),
+        _quantity=5,
+    )
+
+    with django_assert_num_queries(1):
+        for task in task_admin.get_queryset(request_):
+            task_admin.schedule_type(task)
+            task_admin.next_run(task)
+
+
+def test_pause_and_resume(task_admin, request_):
+    tasks = baker.make(
+        "django_q_registry.Task",
+        q_schedule=iter(
+            baker.make(
+                "django_q.Schedule",
+                name=iter([f"test{i} - QREGISTRY" for i in range(3)]),
+                _quantity=3,
+            )
+        ),
+        _quantity=3,
+    )
+
+    task_admin.pause(request_, Task.objects.all())
+
+    assert not Schedule.objects.filter(next_run__isnull=False).exists()
+
+    task_admin.resume(request_, Task.objects.filter(pk=tasks[0].pk))
+
+    assert Schedule.objects.filter(next_run__isnull=False).count() == 1
+
+
+def test_run_now(task_admin, request_):
+    schedule = baker.make("django_q.Schedule", func="tests.test_admin.run_me")
+    baker.make("django_q_registry.Task", name="run_me", q_schedule=schedule)
+
+    task_admin.run_now(request_, Task.objects.all())
+
+    run_once = Schedule.objects.get(
+        schedule_type=Schedule.ONCE, name="run_me - run now"
+    )
+    assert run_once.func == "tests.test_admin.run_me"
+    assert run_once.next_run <= timezone.now()
+
+
+def test_paginator_falls_back_to_exact_count():
+    baker.make("django_q_registry.Task", _quantity=3)
+
+    paginator = EstimatedCountPaginator(Task.objects.order_by("pk"), 2)
+
+    assert paginator.count == 3
@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import ast
+import asyncio
+import http.server
+import threading
+import time
+import urllib.request
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+from django_q.humanhash import uuid
+from django_q.models import OrmQ
+from django_q.models import Schedule
+from django_q.models import Task as QTask
+from django_q.scheduler import scheduler
+from django_q.signing import SignedPackage
+
+from django_q_registry import aio
+from django_q_registry import cron
+from django_q_registry.models import Task
+from django_q_registry.receivers import run_coroutines
+from django_q_registry.registry import registry
+
+
+async def add(a, b):
+    await asyncio.sleep(0)
+    return a + b
+
+
+async def sleep(seconds):
+    await asyncio.sleep(seconds)
+
+
+async def fail():
+    raise ValueError("failed")
+
+
+@pytest.fixture
+def async_task():
+    task = Task.objects.create_in_memory(add, {"name": "async", "args": "1, 2"})
+    with registry.override([task]):
+        yield task
+
+
+def make_package(task, *args):
+    name, task_id = uuid()
+    return {
+        "id": task_id,
+        "name": name,
+        "func": task.func,
+        "args": args,
+        "kwargs": {},
+        "group": task.schedule_name,
+    }
+
+
+def make_run(task, func, *args, **options):
+    return {
+        "func": func,
+        "args": args,
+        "kwargs": {},
+        "group": task.schedule_name,
+        **options,
+    }
+
+
+def test_is_async(async_task):
+    assert async_task.is_async
+    assert not Task.objects.create_in_memory(make_package, {}).is_async
+
+
+def test_fanout_async():
+    from django_q_registry.fanout import Fanout
+
+    with pytest.raises(ValueError, match="async"):
+        Task.objects.create_in_memory(
+            add, {"fanout": Fanout(queryset=Task.objects.all())}
+        )
+
+
+def test_get_loop():
+    loop = aio.get_loop()
+
+    assert aio.get_loop() is loop
+    assert loop.is_running()
+
+    # e.g. in a forked worker
+    with mock.patch.object(aio, "_loop_pid", -1):
+        assert aio.get_loop() is not loop
+
+
+def test_run_coroutine():
+    assert aio.run_coroutine("tests.test_aio.add", 1, b=2) == 3
+    assert aio.run_coroutine(add, 1, 2) == 3
+
+    with pytest.raises(ValueError, match="failed"):
+        aio.run_coroutine(fail)
+
+
+def test_run_coroutines(async_task):
+    package = make_package(async_task, 1, 2)
+
+    run_coroutines(sender="django_q", task=package)
+
+    assert package["func"] == "django_q_registry.aio.run_coroutine"
+    assert package["args"] == ("tests.test_aio.add", 1, 2)
+    assert aio.run_coroutine(*package["args"]) == 3
+
+
+@pytest.mark.django_db
+def test_run_coroutines_run_now(async_task):
+    Task.objects.create_from_registry(registry)
+    Schedule.objects.update(next_run=timezone.now() + timedelta(hours=1))
+    Task.objects.all().run_now()
+
+    scheduler()
+
+    package = SignedPackage.loads(OrmQ.objects.get().payload)
+    assert package["group"] == async_task.schedule_name
+    assert package["func"] == "django_q_registry.aio.run_coroutine"
+    assert aio.run_coroutine(*package["args"]) == 3
+
+
+def test_run_coroutines_sync_task():
+    task = Task.objects.create_in_memory(make_package, {"name": "sync"})
+    package = make_package(task)
+
+    with registry.override([task]):
+        run_coroutines(sender="django_q", task=package)
+
+    assert package["func"] == "tests.test_aio.make_package"
+
+
+@pytest.fixture
+def async_tasks():
+    tasks = [
+        Task.objects.create_in_memory(
+            add,
+            {
+                "name": f"async {i}",
+                "schedule_type": Schedule.MINUTES,
+                "args": f"{i}, 1",
+                "timeout": 10,
+            },
+        )
+        for i in range(3)
+    ]
+    with registry.override(tasks):
+        Task.objects.create_from_registry(registry)
+        Schedule.objects.update(next_run=timezone.now() - timedelta(seconds=1))
+        yield tasks
+
+
+@pytest.mark.django_db
+def test_batch_due_runs(async_tasks):
+    due = Schedule.objects.values_list("next_run", flat=True).first()
+
+    assert aio.batch_due_runs() == 3
+
+    assert set(
+        Schedule.objects.exclude(schedule_type=Schedule.ONCE).values_list(
+            "next_run", flat=True
+        )
+    ) == {due + timedelta(minutes=1)}
+    batch = Schedule.objects.get(schedule_type=Schedule.ONCE)
+    assert batch.func == "django_q_registry.aio.run_batch"
+    assert batch.next_run == due
+
+    # the scheduler enqueues the batch as the only task for the runs
+    scheduler()
+
+    (package,) = [
+        SignedPackage.loads(payload)
+        for payload in OrmQ.objects.values_list("payload", flat=True)
+    ]
+    assert package["func"] == "django_q_registry.aio.run_batch"
+    assert package["save"] is False
+    assert package["timeout"] == 10
+    assert not Schedule.objects.filter(schedule_type=Schedule.ONCE).exists()
+
+    assert aio.run_batch(*package["args"]) == 3
+    assert sorted(QTask.objects.values_list("group", "result")) == [
+        (task.schedule_name, i + 1) for i, task in enumerate(async_tasks)
+    ]
+
+
+@pytest.mark.django_db
+def test_batch_due_runs_cron(async_tasks):
+    due = cron.get_next("*/5 * * * *", timezone.now() - timedelta(minutes=5))
+    Schedule.objects.update(
+        schedule_type=Schedule.CRON, cron="*/5 * * * *", next_run=due
+    )
+
+    assert aio.batch_due_runs() == 3
+
+    # the runs move on from their own `next_run`, so the scheduler does not run them again
+    assert set(
+        Schedule.objects.filter(schedule_type=Schedule.CRON).values_list(
+            "next_run", flat=True
+        )
+    ) == {due + timedelta(minutes=5)}
+    assert Schedule.objects.get(schedule_type=Schedule.ONCE).next_run == due
+
+
+@pytest.mark.django_db
+def test_batch_due_runs_chunks(async_tasks):
+    with override_settings(Q_REGISTRY={"ASYNC_BATCH_SIZE": 2}):
+        # the third run is due alone, and left to the scheduler
+        assert aio.batch_due_runs() == 2
+
+    assert Schedule.objects.filter(func="django_q_registry.aio.run_batch").count() == 1
+
+
+@pytest.mark.django_db
+def test_batch_due_runs_not_due(async_tasks):
+    Schedule.objects.update(next_run=timezone.now() + timedelta(minutes=5))
+
+    assert aio.batch_due_runs() == 0
+    assert aio.batch_due_runs(lookahead=600) == 3
+
+
+@pytest.mark.django_db
+def test_batch_due_runs_enqueued_meanwhile(async_tasks):
+    first = Schedule.objects.order_by("pk").first()
+    calculate_next_run = Schedule.calculate_next_run
+
+    def enqueue_meanwhile(schedule, next_run=None):
+        if schedule.pk == first.pk:
+            # the scheduler enqueues the run after it was read
+            Schedule.objects.filter(pk=first.pk).update(
+                next_run=timezone.now() + timedelta(minutes=1)
+            )
+        return calculate_next_run(schedule, next_run)
+
+    with mock.patch.object(
+        Schedule, "calculate_next_run", autospec=True, side_effect=enqueue_meanwhile
+    ):
+        assert aio.batch_due_runs() == 2
+
+    batch = Schedule.objects.get(func="django_q_registry.aio.run_batch")
+    assert {run["group"] for run in ast.literal_eval(batch.args)[0]} == set(
+        Schedule.objects.exclude(pk__in=[first.pk, batch.pk]).values_list(
+            "name", flat=True
+        )
+    )
+
+
+@pytest.mark.django_db
+def test_run_batch_failures(async_task):
+    aio.run_batch(
+        [
+            make_run(async_task, "tests.test_aio.sleep", 1, timeout=0.01),
+            make_run(async_task, "tests.test_aio.fail"),
+            make_run(async_task, "tests.test_aio.add", 1, 2),
+        ]
+    )
+
+    assert QTask.objects.filter(success=False).count() == 2
+    assert QTask.objects.get(success=True).result == 3
+
+
+class SlowHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(0.1)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(http.server.ThreadingHTTPServer):
+    # accept all concurrent requests at once, rather than the default 5
+    request_queue_size = 64
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer(("127.0.0.1", 0), SlowHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address
+    server.shutdown()
+    server.server_close()
+
+
+def poll(host, port):
+    with urllib.request.urlopen(f"http://{host}:{port}/") as response:
+        return response.read()
+
+
+async def apoll(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET / HTTP/1.0\r\nHost: {host}\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return response.rpartition(b"\r\n\r\n")[2]
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_benchmark_throughput(stub_server, async_task, record_property):
+    """
+    Polling a stub HTTP server that takes 100ms to respond, 20 runs of a sync task take one worker
+    2 seconds, one after the other, while 20 runs of the async equivalent share one worker and its
+    event loop.
+    """
+    runs = 20
+
+    started = time.perf_counter()
+    for _ in range(runs):
+        assert poll(*stub_server) == b"ok"
+    sync_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    aio.run_batch(
+        [
+            make_run(async_task, "tests.test_aio.apoll", *stub_server)
+            for _ in range(runs)
+        ]
+    )
+    async_elapsed = time.perf_counter() - started
+
+    assert QTask.objects.filter(success=True, result=b"ok").count() == runs
+    record_property("sync_runs_per_second", runs / sync_elapsed)
+    record_property("async_runs_per_second", runs / async_elapsed)
+    assert async_elapsed < sync_elapsed / 4
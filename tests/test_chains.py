@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+from django_q.models import OrmQ
+from django_q.models import Schedule
+from django_q.signing import SignedPackage
+
+from django_q_registry.chains import enqueue_dependents
+from django_q_registry.chains import get_chain_latency
+from django_q_registry.chains import get_root
+from django_q_registry.models import Task
+from django_q_registry.registry import TaskRegistry
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def registry():
+    ret = TaskRegistry()
+    ret.registered_tasks.clear()
+    return ret
+
+
+@pytest.fixture
+def chain(registry):
+    registry.register(extract, name="extract", schedule_type=Schedule.DAILY)
+    registry.register(transform, name="transform", after="extract")
+    registry.register(load, name="load", after="transform", kwargs={"table": "facts"})
+    return {task.name: task for task in registry.registered_tasks}
+
+
+def extract():
+    pass
+
+
+def transform():
+    pass
+
+
+def load(table):
+    pass
+
+
+def test_cycle(registry):
+    registry.register(extract, name="a", after="c")
+    registry.register(transform, name="b", after="a")
+
+    with pytest.raises(ValueError, match="cycle"):
+        registry.register(load, name="c", after="b")
+
+
+def test_self_dependency(registry):
+    with pytest.raises(ValueError, match="cycle"):
+        registry.register(extract, name="a", after="a")
+
+
+def test_after_with_schedule_type(registry):
+    with pytest.raises(ValueError, match="schedule_type"):
+        registry.register(extract, name="a", after="b", schedule_type=Schedule.DAILY)
+
+
+def test_only_root_is_scheduled(registry, chain):
+    Task.objects.create_from_registry(registry)
+
+    assert Task.objects.count() == 3
+    assert Schedule.objects.get().name == chain["extract"].schedule_name
+
+
+def test_get_root(registry, chain):
+    assert get_root(registry, chain["load"]) == chain["extract"]
+    assert get_root(registry, chain["extract"]) == chain["extract"]
+
+
+def test_enqueue_dependents(registry, chain):
+    now = timezone.now()
+
+    enqueue_dependents(registry, chain["extract"], now, now)
+
+    package = SignedPackage.loads(OrmQ.objects.get().payload)
+    assert package["func"] == chain["transform"].func
+    assert package["group"] == chain["transform"].schedule_name
+
+    enqueue_dependents(registry, chain["transform"], now, now)
+
+    package = SignedPackage.loads(OrmQ.objects.last().payload)
+    assert package["func"] == chain["load"].func
+    assert package["kwargs"] == {"table": "facts"}
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+def test_chain_latency(registry, chain):
+    started = timezone.now()
+
+    enqueue_dependents(registry, chain["extract"], started, started)
+    enqueue_dependents(registry, chain["transform"], started, started)
+    assert (
+        enqueue_dependents(
+            registry, chain["load"], started, started + timedelta(minutes=5)
+        )
+        == []
+    )
+
+    assert get_chain_latency(chain["extract"]) == timedelta(minutes=5)
+
+
+def test_missing_parent_logged(registry, caplog):
+    registry.register(transform, name="transform", after="missing")
+
+    with caplog.at_level("ERROR"):
+        Task.objects.create_from_registry(registry)
+
+    assert "which is not registered" in caplog.text
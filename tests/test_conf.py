@@ -15,6 +15,16 @@ def test_default_settings():
 def test_default_app_settings():
     assert app_settings.PERIODIC_TASK_SUFFIX == " - QREGISTRY"
     assert app_settings.TASKS == []
+    assert app_settings.ROUTING == {}
+    assert app_settings.POOLS == {}
+    assert app_settings.POOL_LEASE_TTL is None
+    assert app_settings.POOL_RETRY_DELAY == 30
+    assert app_settings.GENERATION is None
+    assert app_settings.KEEP_GENERATIONS == 2
+    assert app_settings.TOMBSTONE_RETENTION.days == 7
+    assert app_settings.SYNC_ON_STARTUP is False
+    assert app_settings.SYNC_NAMESPACE is None
+    assert app_settings.SYNC_LEASE_TTL == 300
 
 
 @override_settings(
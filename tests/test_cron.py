@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+from unittest import mock
+
+import pytest
+from django.utils import timezone
+
+from django_q_registry import cron
+
+
+@pytest.mark.parametrize(
+    ("expression", "minutes", "hours"),
+    [
+        ("* * * * *", tuple(range(60)), tuple(range(24))),
+        ("*/15 * * * *", (0, 15, 30, 45), tuple(range(24))),
+        ("5/20 9-11 * * *", (5, 25, 45), (9, 10, 11)),
+        ("0,30 8-18/5 * * *", (0, 30), (8, 13, 18)),
+        ("@hourly", (0,), tuple(range(24))),
+    ],
+)
+def test_parse(expression, minutes, hours):
+    parsed = cron.parse(expression)
+
+    assert parsed.minutes == minutes
+    assert parsed.hours == hours
+
+
+def test_parse_names():
+    parsed = cron.parse("0 0 * jan-mar mon,FRI,7")
+
+    assert parsed.months == {1, 2, 3}
+    assert parsed.weekdays == {0, 1, 5}
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "",
+        "* * * *",
+        "0 0 0 * * *",
+        "60 * * * *",
+        "* 24 * * *",
+        "* * 0 * *",
+        "* * * 13 *",
+        "5-1 * * * *",
+        "*/0 * * * *",
+        "0 0 L * *",
+        "not a cron",
+    ],
+)
+def test_parse_invalid(expression):
+    with pytest.raises(ValueError):  # noqa: PT011
+        cron.parse(expression)
+    assert not cron.is_valid(expression)
+
+
+def test_matches_day_or():
+    # the 13th of the month, or any Friday
+    parsed = cron.parse("0 0 13 * 5")
+
+    assert parsed.matches_day(date(2024, 6, 13))  # Thursday
+    assert parsed.matches_day(date(2024, 6, 14))  # Friday
+    assert not parsed.matches_day(date(2024, 6, 15))
+
+
+def test_matches_day_and():
+    parsed = cron.parse("0 0 * 6 5")
+
+    assert parsed.matches_day(date(2024, 6, 14))
+    assert not parsed.matches_day(date(2024, 6, 13))
+    assert not parsed.matches_day(date(2024, 7, 5))
+
+
+def test_between():
+    start = datetime(2024, 6, 14, 9, 0, tzinfo=dt_timezone.utc)
+
+    times = cron.parse("*/20 9,10 * * *").between(
+        start, start + timedelta(days=1), dt_timezone.utc
+    )
+
+    assert [(t.day, t.hour, t.minute) for t in times] == [
+        (14, 9, 0),
+        (14, 9, 20),
+        (14, 9, 40),
+        (14, 10, 0),
+        (14, 10, 20),
+        (14, 10, 40),
+    ]
+
+
+def test_next_after():
+    after = datetime(2024, 6, 14, 9, 0, 30, tzinfo=dt_timezone.utc)
+
+    assert cron.parse("* * * * *").next_after(after, dt_timezone.utc) == datetime(
+        2024, 6, 14, 9, 1, tzinfo=dt_timezone.utc
+    )
+    assert cron.parse("0 0 29 2 *").next_after(after, dt_timezone.utc) == datetime(
+        2028, 2, 29, tzinfo=dt_timezone.utc
+    )
+
+
+def test_next_after_never():
+    with pytest.raises(ValueError, match="never matches"):
+        cron.parse("0 0 31 2 *").next_after(datetime.now(dt_timezone.utc))
+
+
+def test_validate():
+    cron.validate("*/5 * * * *")
+
+    with pytest.raises(ValueError):  # noqa: PT011
+        cron.validate("*/5 * * *")
+
+
+def test_get_next():
+    after = datetime(2024, 6, 14, 9, 7, tzinfo=dt_timezone.utc)
+
+    assert cron.get_next("*/5 * * * *", after) == datetime(
+        2024, 6, 14, 9, 10, tzinfo=dt_timezone.utc
+    )
+
+
+def test_module_between():
+    start = timezone.make_aware(datetime(2024, 6, 14, 9, 0))
+
+    assert cron.between("*/20 9 * * *", start, start + timedelta(hours=1)) == [
+        start,
+        start + timedelta(minutes=20),
+        start + timedelta(minutes=40),
+    ]
+
+
+def test_between_croniter():
+    pytest.importorskip("croniter")
+    start = timezone.make_aware(datetime(2024, 6, 1))
+
+    assert cron.between("0 0 L * *", start, start + timedelta(days=31)) == [
+        timezone.make_aware(datetime(2024, 6, 30))
+    ]
+
+
+def test_croniter_fallback_only():
+    start = timezone.make_aware(datetime(2024, 6, 14, 9, 0))
+
+    # expressions the built-in evaluator parses never reach croniter
+    with mock.patch.object(cron, "croniter", side_effect=AssertionError):
+        cron.validate("*/20 9 * * *")
+        assert cron.get_next("*/20 9 * * *", start) == start + timedelta(minutes=20)
+        assert len(cron.between("*/20 9 * * *", start, start + timedelta(hours=1))) == 3
+
+
+def test_croniter_extensions_without_croniter():
+    with (
+        mock.patch.object(cron, "croniter", None),
+        pytest.raises(ValueError, match="Invalid cron value"),
+    ):
+        cron.validate("0 0 L * *")
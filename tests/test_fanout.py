@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from django_q.models import OrmQ
+from django_q.models import Schedule
+from django_q.signing import SignedPackage
+from model_bakery import baker
+
+from django_q_registry.fanout import Fanout
+from django_q_registry.fanout import dispatch
+from django_q_registry.fanout import enqueue_many
+from django_q_registry.fanout import reduce_hook
+from django_q_registry.fanout import run_chunk
+from django_q_registry.models import FanoutDispatch
+from django_q_registry.models import Task
+from django_q_registry.registry import registry
+
+pytestmark = pytest.mark.django_db
+
+reduced = []
+
+
+def count_chunk(schedules):
+    return schedules.count()
+
+
+def sum_counts(results):
+    reduced.append(sum(results))
+
+
+@pytest.fixture
+def fanout_task():
+    task = Task.objects.create_in_memory(
+        count_chunk,
+        {
+            "name": "fanout",
+            "fanout": Fanout(
+                queryset=Schedule.objects.exclude(name="fanout"),
+                chunk_size=3,
+                reducer="tests.test_fanout.sum_counts",
+            ),
+        },
+    )
+    registry.registered_tasks.add(task)
+    yield task
+    registry.registered_tasks.discard(task)
+    reduced.clear()
+
+
+def test_chunks():
+    schedules = baker.make("django_q.Schedule", _quantity=10)
+    pks = sorted(schedule.pk for schedule in schedules)
+
+    chunks = Fanout(queryset=Schedule.objects.all(), chunk_size=3).chunks()
+
+    assert chunks == [
+        (pks[0], pks[3]),
+        (pks[3], pks[6]),
+        (pks[6], pks[9]),
+        (pks[9], None),
+    ]
+
+
+def test_chunks_sparse():
+    schedules = baker.make("django_q.Schedule", _quantity=20)
+    kept = sorted(schedule.pk for schedule in schedules)[::5]
+    queryset = Schedule.objects.filter(pk__in=kept)
+
+    chunks = Fanout(queryset=queryset, chunk_size=2).chunks()
+
+    assert chunks == [(kept[0], kept[2]), (kept[2], None)]
+    assert all(
+        queryset.filter(pk__gte=start, **({"pk__lt": end} if end else {})).count() == 2
+        for start, end in chunks
+    )
+
+
+def test_chunks_empty():
+    assert Fanout(queryset=lambda: Schedule.objects.all()).chunks() == []
+
+
+def test_create_in_memory_fanout_type():
+    with pytest.raises(TypeError):
+        Task.objects.create_in_memory(count_chunk, {"fanout": 5})
+
+
+def test_to_schedule_dict(fanout_task):
+    schedule_dict = fanout_task.to_schedule_dict()
+
+    assert schedule_dict["func"] == "django_q_registry.fanout.dispatch"
+    assert schedule_dict["args"] == repr(fanout_task.schedule_name)
+
+
+def test_dispatch(fanout_task):
+    baker.make("django_q.Schedule", _quantity=10)
+    chunks = fanout_task.fanout.chunks()
+
+    total = dispatch(fanout_task.schedule_name)
+
+    assert total == len(chunks) == 4
+    packages = [SignedPackage.loads(q.payload) for q in OrmQ.objects.all()]
+    assert len(packages) == total
+    assert {package["group"] for package in packages} == {packages[0]["group"]}
+    assert sorted(package["args"][1:3] for package in packages) == sorted(
+        chunks, key=lambda chunk: (chunk[1] is None, chunk)
+    )
+    assert all(
+        package["hook"] == "django_q_registry.fanout.reduce_hook"
+        for package in packages
+    )
+    assert FanoutDispatch.objects.get().group == packages[0]["group"]
+
+
+def test_dispatch_without_reducer(fanout_task):
+    baker.make("django_q.Schedule", _quantity=4)
+    task = Task.objects.create_in_memory(
+        count_chunk,
+        {"name": "no reducer", "fanout": Fanout(queryset=Schedule.objects.all())},
+    )
+
+    with registry.override([task]):
+        assert dispatch(task.schedule_name) == 1
+
+    assert "hook" not in SignedPackage.loads(OrmQ.objects.get().payload)
+    assert not FanoutDispatch.objects.exists()
+
+
+def test_enqueue_many(django_assert_num_queries):
+    with django_assert_num_queries(1):
+        ids = enqueue_many(
+            "math.copysign", [(1, -1), (2, -1), (3, -1)], q_options={"group": "g"}
+        )
+
+    packages = [SignedPackage.loads(q.payload) for q in OrmQ.objects.all()]
+    assert sorted(package["id"] for package in packages) == sorted(ids)
+    assert sorted(package["args"] for package in packages) == [
+        (1, -1),
+        (2, -1),
+        (3, -1),
+    ]
+    assert {package["group"] for package in packages} == {"g"}
+    assert {q.key for q in OrmQ.objects.all()} == {"ORM"}
+
+
+def test_enqueue_many_sync():
+    ids = enqueue_many(
+        "math.copysign", [(1, -1), (2, -1)], q_options={"group": "g", "sync": True}
+    )
+
+    assert len(ids) == 2
+    assert not OrmQ.objects.exists()
+
+
+def test_dispatch_unregistered():
+    with pytest.raises(LookupError):
+        dispatch("unregistered")
+
+
+def test_run_chunk(fanout_task):
+    schedules = baker.make("django_q.Schedule", _quantity=5)
+    pks = sorted(schedule.pk for schedule in schedules)
+
+    assert run_chunk(fanout_task.schedule_name, pks[0], pks[3], 2) == 3
+    assert run_chunk(fanout_task.schedule_name, pks[3], None, 2) == 2
+
+
+def make_sub_tasks(fanout_task, total, **kwargs):
+    FanoutDispatch.objects.create(group="fanout group")
+    return baker.make(
+        "django_q.Task",
+        group="fanout group",
+        args=(fanout_task.schedule_name, 0, 3, total),
+        _quantity=total,
+        **kwargs,
+    )
+
+
+def test_reduce_hook(fanout_task):
+    now = timezone.now()
+    sub_tasks = make_sub_tasks(
+        fanout_task,
+        3,
+        result=iter([1, 2, 3]),
+        stopped=iter([now - timedelta(seconds=i) for i in range(3)]),
+        success=True,
+    )
+
+    # the result of the sub-task that stopped last can be saved before the others, so whichever hook
+    # sees all results reduces, once
+    reduce_hook(sub_tasks[1])
+
+    assert reduced == [6]
+    assert not FanoutDispatch.objects.exists()
+
+    reduce_hook(sub_tasks[0])
+    reduce_hook(sub_tasks[2])
+
+    assert reduced == [6]
+
+
+def test_reduce_hook_incomplete(fanout_task):
+    (sub_task,) = make_sub_tasks(fanout_task, 1, result=1, success=True)
+    sub_task.args = (fanout_task.schedule_name, 0, 3, 3)
+
+    reduce_hook(sub_task)
+
+    assert reduced == []
+    assert FanoutDispatch.objects.exists()
+
+
+def test_reduce_hook_failed_chunk(fanout_task):
+    sub_tasks = make_sub_tasks(fanout_task, 2, success=iter([True, False]))
+
+    for sub_task in sub_tasks:
+        reduce_hook(sub_task)
+
+    assert reduced == []
+    assert not FanoutDispatch.objects.exists()
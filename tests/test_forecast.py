@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from datetime import datetime
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.utils import timezone
+from django_q.conf import Conf
+from django_q.models import Schedule
+
+from django_q_registry.forecast import get_following_run
+from django_q_registry.forecast import get_histogram
+from django_q_registry.forecast import get_run_times
+from django_q_registry.models import Task
+
+START = timezone.make_aware(datetime(2024, 6, 14, 0, 0))
+END = START + timedelta(days=1)
+
+
+def noop():
+    pass
+
+
+def make_task(**kwargs):
+    return Task.objects.create_in_memory(noop, kwargs)
+
+
+def test_cron():
+    task = make_task(schedule_type=Schedule.CRON, cron="0 */6 * * *")
+
+    assert [t.hour for t in get_run_times([task], START, END)[task]] == [0, 6, 12, 18]
+
+
+def test_cron_shared():
+    first = make_task(name="first", schedule_type=Schedule.CRON, cron="0 * * * *")
+    second = make_task(name="second", schedule_type=Schedule.CRON, cron="0 * * * *")
+
+    run_times = get_run_times([first, second], START, END)
+
+    assert run_times[first] is run_times[second]
+
+
+def test_minutes():
+    task = make_task(schedule_type=Schedule.MINUTES, minutes=90, next_run=START)
+
+    assert len(get_run_times([task], START, END)[task]) == 16
+
+
+def test_minutes_past_next_run():
+    task = make_task(
+        schedule_type=Schedule.MINUTES,
+        minutes=10,
+        next_run=START - timedelta(minutes=25),
+    )
+
+    times = get_run_times([task], START, END)[task]
+
+    assert times[0] == START + timedelta(minutes=5)
+    assert len(times) == 144
+
+
+def test_repeats():
+    task = make_task(
+        schedule_type=Schedule.HOURLY,
+        repeats=3,
+        next_run=START - timedelta(hours=1),
+    )
+
+    assert len(get_run_times([task], START, END)[task]) == 2
+
+
+def test_daily():
+    task = make_task(
+        schedule_type=Schedule.DAILY, next_run=START - timedelta(days=10, hours=1)
+    )
+
+    assert get_run_times([task], START, END)[task] == [END - timedelta(hours=1)]
+
+
+def test_monthly():
+    task = make_task(
+        schedule_type=Schedule.MONTHLY,
+        next_run=timezone.make_aware(datetime(2024, 1, 14, 12)),
+    )
+
+    assert get_run_times([task], START, END)[task] == [START + timedelta(hours=12)]
+
+
+def test_once():
+    task = make_task(schedule_type=Schedule.ONCE, next_run=START + timedelta(hours=2))
+    later = make_task(name="later", schedule_type=Schedule.ONCE, next_run=END)
+
+    run_times = get_run_times([task, later], START, END)
+
+    assert run_times[task] == [START + timedelta(hours=2)]
+    assert run_times[later] == []
+
+
+def test_not_periodic():
+    task = make_task(after="parent")
+
+    assert get_run_times([task], START, END) == {}
+
+
+def test_histogram():
+    tasks = [
+        make_task(name="hourly", schedule_type=Schedule.CRON, cron="0 * * * *"),
+        make_task(name="half", schedule_type=Schedule.CRON, cron="*/30 * * * *"),
+        make_task(
+            name="daily",
+            schedule_type=Schedule.DAILY,
+            next_run=START + timedelta(seconds=30),
+        ),
+    ]
+
+    histogram = get_histogram(tasks, START, END)
+
+    assert histogram[START] == 3
+    assert histogram[START + timedelta(minutes=30)] == 1
+    assert histogram[START + timedelta(hours=1)] == 2
+    assert sum(histogram.values()) == 24 + 48 + 1
+
+
+def test_invalid_cron(caplog):
+    # registering the task would already fail, see `TaskQuerySet.create_in_memory`
+    task = Task(
+        name="invalid", kwargs={"schedule_type": Schedule.CRON, "cron": "not a cron"}
+    )
+    valid = make_task(schedule_type=Schedule.CRON, cron="0 */6 * * *")
+
+    with caplog.at_level("WARNING"):
+        run_times = get_run_times([task, valid], START, END)
+
+    assert run_times == {
+        valid: [START + timedelta(hours=hour) for hour in (0, 6, 12, 18)]
+    }
+    assert "Cannot forecast invalid" in caplog.text
+
+
+@pytest.mark.parametrize("expression", ["0 0 L * *", "0 0 * * 5#3", "0 0 * * * 30"])
+def test_croniter_extensions(expression):
+    pytest.importorskip("croniter")
+    task = make_task(schedule_type=Schedule.CRON, cron=expression)
+
+    assert get_run_times([task], START, START + timedelta(days=62))[task]
+
+
+@pytest.mark.parametrize(
+    ("catch_up", "following_run"),
+    [(True, START + timedelta(hours=6)), (False, START + timedelta(days=1))],
+)
+def test_get_following_run_cron(catch_up, following_run):
+    schedule = Schedule(schedule_type=Schedule.CRON, cron="0 */6 * * *", next_run=START)
+
+    with mock.patch.object(Conf, "CATCH_UP", catch_up):
+        assert get_following_run(schedule, START + timedelta(hours=20)) == following_run
+
+
+@pytest.mark.parametrize(
+    ("catch_up", "following_run"),
+    [(True, START + timedelta(hours=1)), (False, START + timedelta(hours=21))],
+)
+def test_get_following_run(catch_up, following_run):
+    schedule = Schedule(schedule_type=Schedule.HOURLY, next_run=START)
+
+    with mock.patch.object(Conf, "CATCH_UP", catch_up):
+        assert (
+            get_following_run(schedule, START + timedelta(hours=20, minutes=30))
+            == following_run
+        )
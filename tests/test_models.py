@@ -2,18 +2,34 @@ from __future__ import annotations
 
 import itertools
 from datetime import datetime
+from datetime import timedelta
 
 import pytest
+from asgiref.sync import async_to_sync
+from django.db import connections
+from django.db import models
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from django_q.models import Schedule
+from django_q.models import Task as QTask
 from model_bakery import baker
 
 from django_q_registry.conf import app_settings
+from django_q_registry.models import Generation
 from django_q_registry.models import Task
 from django_q_registry.registry import TaskRegistry
 
 pytestmark = pytest.mark.django_db
 
 
+def run_async(method, /, *args, **kwargs):
+    # manager methods are not marked as coroutine functions, so await them from one
+    async def call():
+        return await method(*args, **kwargs)
+
+    return async_to_sync(call)()
+
+
 class TestTaskQuerySet:
     def test_create_in_memory(self):
         def test_task():
@@ -262,6 +278,479 @@ class TestTaskQuerySet:
 
         assert Schedule.objects.count() == len(schedules)
 
+    def test_create_in_memory_options(self):
+        def test_task():
+            pass
+
+        in_memory_task = Task.objects.create_in_memory(
+            test_task,
+            {
+                "schedule_type": Schedule.MINUTES,
+                "retain": timedelta(days=7),
+                "keep_last": 10,
+                "result_sample_rate": 0.5,
+            },
+        )
+
+        assert in_memory_task.kwargs == {"schedule_type": Schedule.MINUTES}
+        assert in_memory_task.retain == timedelta(days=7)
+        assert in_memory_task.keep_last == 10
+        assert in_memory_task.result_sample_rate == 0.5
+
+    def test_create_in_memory_invalid_sample_rate(self):
+        def test_task():
+            pass
+
+        with pytest.raises(ValueError, match="result_sample_rate"):
+            Task.objects.create_in_memory(test_task, {"result_sample_rate": 2})
+
+    def test_create_from_registry_options(self):
+        task = Task(name="test", func="tests.test_models.test_task", keep_last=5)
+        Task.objects.create_from_registry(TaskRegistry(registered_tasks={task}))
+
+        assert Task.objects.get().keep_last == 5
+
+        task = Task(name="test", func="tests.test_models.test_task", keep_last=10)
+        Task.objects.create_from_registry(TaskRegistry(registered_tasks={task}))
+
+        assert Task.objects.get().keep_last == 10
+
+    def test_create_in_memory_invalid_cron(self):
+        def test_task():
+            pass
+
+        with pytest.raises(ValueError):  # noqa: PT011
+            Task.objects.create_in_memory(
+                test_task, {"schedule_type": Schedule.CRON, "cron": "61 * * * *"}
+            )
+
+    def test_create_from_registry_next_run_cron(self):
+        task = Task(
+            name="test",
+            func="tests.test_models.test_task",
+            kwargs={"schedule_type": Schedule.CRON, "cron": "0 3 * * *"},
+        )
+        before = timezone.now()
+
+        Task.objects.create_from_registry(TaskRegistry(registered_tasks={task}))
+
+        next_run = timezone.localtime(Schedule.objects.get().next_run)
+        assert before < next_run <= before + timedelta(days=1)
+        assert (next_run.hour, next_run.minute) == (3, 0)
+
+    def test_create_from_registry_next_run_interval(self):
+        task = Task(
+            name="test",
+            func="tests.test_models.test_task",
+            kwargs={"schedule_type": Schedule.HOURLY},
+        )
+        before = timezone.now()
+
+        Task.objects.create_from_registry(TaskRegistry(registered_tasks={task}))
+
+        next_run = Schedule.objects.get().next_run
+        assert (
+            before + timedelta(hours=1)
+            <= next_run
+            <= timezone.now() + timedelta(hours=1)
+        )
+
+    def test_create_from_registry_next_run_explicit(self):
+        next_run = timezone.now() - timedelta(days=1)
+        task = Task(
+            name="test",
+            func="tests.test_models.test_task",
+            kwargs={"schedule_type": Schedule.HOURLY, "next_run": next_run},
+        )
+
+        Task.objects.create_from_registry(TaskRegistry(registered_tasks={task}))
+
+        assert Schedule.objects.get().next_run == next_run
+
+    def test_create_from_registry_next_run_kept(self):
+        kwargs = {"schedule_type": Schedule.CRON, "cron": "0 3 * * *"}
+        task = Task(name="test", func="tests.test_models.test_task", kwargs=kwargs)
+        Task.objects.create_from_registry(TaskRegistry(registered_tasks={task}))
+        next_run = timezone.now() + timedelta(minutes=5)
+        Schedule.objects.update(next_run=next_run)
+
+        task = Task(name="test", func="tests.test_models.test_task", kwargs=kwargs)
+        Task.objects.create_from_registry(TaskRegistry(registered_tasks={task}))
+
+        assert Schedule.objects.get().next_run == next_run
+
+    def test_create_from_registry_next_run_timing_changed(self):
+        schedule = baker.make(
+            "django_q.Schedule",
+            schedule_type=Schedule.HOURLY,
+            next_run=timezone.now() + timedelta(minutes=5),
+        )
+        baker.make(
+            "django_q_registry.Task",
+            name="test",
+            func="tests.test_models.test_task",
+            kwargs='{"schedule_type": "D"}',
+            q_schedule=schedule,
+        )
+        task = Task(
+            name="test",
+            func="tests.test_models.test_task",
+            kwargs={"schedule_type": Schedule.DAILY},
+        )
+
+        Task.objects.create_from_registry(TaskRegistry(registered_tasks={task}))
+
+        schedule.refresh_from_db()
+        assert schedule.schedule_type == Schedule.DAILY
+        assert schedule.next_run > timezone.now() + timedelta(hours=23)
+
+    def test_create_from_registry_schedules_bulk_created(
+        self, django_assert_num_queries
+    ):
+        tasks = {
+            Task(
+                name=f"test{i}",
+                func="tests.test_models.test_task",
+                kwargs={"schedule_type": Schedule.CRON, "cron": "*/5 * * * *"},
+            )
+            for i in range(3)
+        }
+        registry = TaskRegistry(registered_tasks=tasks)
+        Task.objects.create_from_registry(registry)
+        Task.objects.all().delete()
+        Schedule.objects.all().delete()
+
+        # six queries per task for `update_or_create`, then a constant number for all schedules
+        with django_assert_num_queries(len(tasks) * 6 + 3):
+            Task.objects.create_from_registry(registry)
+
+        assert Schedule.objects.filter(next_run__isnull=False).count() == 3
+
+    def test_acreate_from_registry(self):
+        tasks = {
+            Task(
+                name="cron",
+                func="tests.test_models.test_task",
+                kwargs={"schedule_type": Schedule.CRON, "cron": "0 3 * * *"},
+            ),
+            Task(name="once", func="tests.test_models.test_task"),
+        }
+        registry = TaskRegistry(registered_tasks=tasks)
+
+        registered_tasks = run_async(Task.objects.acreate_from_registry, registry)
+
+        assert len(registered_tasks) == 2
+        assert len(registry.created_tasks) == 2
+        assert (
+            Schedule.objects.filter(registered_task__in=registered_tasks).count() == 2
+        )
+        assert Schedule.objects.get(schedule_type=Schedule.CRON).next_run is not None
+
+    def test_acreate_from_registry_update(self):
+        task = Task(name="test", func="tests.test_models.test_task", keep_last=5)
+        registry = TaskRegistry(registered_tasks={task})
+        Task.objects.create_from_registry(registry)
+
+        task = Task(name="test", func="tests.test_models.test_task", keep_last=10)
+        run_async(
+            Task.objects.acreate_from_registry, TaskRegistry(registered_tasks={task})
+        )
+
+        assert Task.objects.get().keep_last == 10
+        assert Schedule.objects.count() == 1
+
+    def test_adelete_dangling_objects(self):
+        baker.make("django_q_registry.Task", _quantity=3)
+        baker.make(
+            "django_q.Schedule", name=f"dangling{app_settings.PERIODIC_TASK_SUFFIX}"
+        )
+        baker.make("django_q.Schedule", name="legacy - CRON")
+        unowned = baker.make("django_q.Schedule", name="unowned")
+
+        run_async(Task.objects.adelete_dangling_objects, TaskRegistry())
+
+        assert not Task.objects.exists()
+        assert list(Schedule.objects.all()) == [unowned]
+
+    def test_create_from_registry_namespace(self):
+        billing = Task(
+            name="billing",
+            func="tests.test_models.test_task",
+            kwargs={"schedule_type": Schedule.HOURLY},
+            namespace="billing",
+        )
+        reports = Task(
+            name="reports",
+            func="tests.test_models.test_task",
+            kwargs={"schedule_type": Schedule.HOURLY},
+            namespace="reports",
+        )
+        registry = TaskRegistry(registered_tasks={billing, reports})
+
+        Task.objects.create_from_registry(registry, namespace="billing")
+
+        assert Task.objects.get().namespace == "billing"
+        assert Schedule.objects.get().name == billing.schedule_name
+        assert {task.name for task in registry.created_tasks} == {"billing"}
+
+    def test_delete_dangling_objects_namespace(self):
+        billing = baker.make(
+            "django_q_registry.Task",
+            namespace="billing",
+            q_schedule=baker.make("django_q.Schedule"),
+        )
+        reports = baker.make(
+            "django_q_registry.Task",
+            namespace="reports",
+            q_schedule=baker.make("django_q.Schedule"),
+        )
+        dangling = baker.make(
+            "django_q.Schedule", name=f"dangling{app_settings.PERIODIC_TASK_SUFFIX}"
+        )
+
+        Task.objects.delete_dangling_objects(TaskRegistry(), namespace="billing")
+
+        assert list(Task.objects.all()) == [reports]
+        assert set(Schedule.objects.all()) == {reports.q_schedule, dangling}
+        assert not Schedule.objects.filter(pk=billing.q_schedule.pk).exists()
+
+    def test_adelete_dangling_objects_namespace(self):
+        baker.make("django_q_registry.Task", namespace="billing", _quantity=2)
+        reports = baker.make("django_q_registry.Task", namespace="reports")
+
+        run_async(
+            Task.objects.adelete_dangling_objects, TaskRegistry(), namespace="billing"
+        )
+
+        assert list(Task.objects.all()) == [reports]
+
+    def test_create_from_registry_generation(self):
+        task = Task(
+            name="test",
+            func="tests.test_models.test_task",
+            kwargs={"schedule_type": Schedule.HOURLY},
+        )
+
+        Task.objects.create_from_registry(
+            TaskRegistry(registered_tasks={task}), generation="v1"
+        )
+        Task.objects.create_from_registry(
+            TaskRegistry(registered_tasks={task}), generation="v2"
+        )
+
+        assert Task.objects.get().generation.name == "v2"
+        assert list(Generation.objects.values_list("name", flat=True)) == ["v1", "v2"]
+
+    def test_create_from_registry_older_generation(self):
+        Task.objects.create_from_registry(
+            TaskRegistry(registered_tasks={Task(name="test", func="a", keep_last=5)}),
+            generation="v1",
+        )
+        Task.objects.create_from_registry(
+            TaskRegistry(registered_tasks={Task(name="test", func="a", keep_last=10)}),
+            generation="v2",
+        )
+
+        registry = TaskRegistry(
+            registered_tasks={Task(name="test", func="a", keep_last=5)}
+        )
+        # the old release syncs again during a rolling deploy
+        Task.objects.create_from_registry(registry, generation="v1")
+
+        task = Task.objects.get()
+        assert task.generation.name == "v2"
+        assert task.keep_last == 10
+        assert registry.created_tasks == {task}
+
+    def test_delete_dangling_objects_generation(self):
+        old, new = (
+            Task(
+                name=name,
+                func="tests.test_models.test_task",
+                kwargs={"schedule_type": Schedule.HOURLY},
+            )
+            for name in ("old", "new")
+        )
+        Task.objects.create_from_registry(
+            TaskRegistry(registered_tasks={old}), generation="v1"
+        )
+        next_run = Schedule.objects.get().next_run
+
+        registry = TaskRegistry(registered_tasks={new})
+        Task.objects.create_from_registry(registry, generation="v2")
+        Task.objects.delete_dangling_objects(registry, generation="v2")
+
+        # v1 may still be running, so its task is kept
+        assert Task.objects.filter(deleted_at__isnull=True).count() == 2
+
+        Task.objects.create_from_registry(registry, generation="v3")
+        Task.objects.delete_dangling_objects(registry, generation="v3")
+
+        tombstone = Task.objects.get(name="old")
+        assert tombstone.deleted_at is not None
+        assert tombstone.paused_next_run == next_run
+        assert tombstone.q_schedule.next_run is None
+
+        Task.objects.create_from_registry(
+            TaskRegistry(registered_tasks={old, new}), generation="v4"
+        )
+
+        revived = Task.objects.get(name="old")
+        assert revived.pk == tombstone.pk
+        assert revived.deleted_at is None
+        assert revived.paused_next_run is None
+        assert revived.q_schedule.pk == tombstone.q_schedule.pk
+        assert revived.q_schedule.next_run == next_run
+
+    def test_delete_dangling_objects_generation_tombstone_retention(self):
+        schedule = baker.make("django_q.Schedule")
+        baker.make(
+            "django_q_registry.Task",
+            q_schedule=schedule,
+            deleted_at=timezone.now() - app_settings.TOMBSTONE_RETENTION * 2,
+        )
+        recent = baker.make("django_q_registry.Task", deleted_at=timezone.now())
+
+        Task.objects.delete_dangling_objects(TaskRegistry(), generation="v1")
+
+        assert list(Task.objects.all()) == [recent]
+        assert not Schedule.objects.filter(pk=schedule.pk).exists()
+
+    def test_adelete_dangling_objects_generation(self):
+        task = baker.make(
+            "django_q_registry.Task", q_schedule=baker.make("django_q.Schedule")
+        )
+
+        run_async(
+            Task.objects.adelete_dangling_objects, TaskRegistry(), generation="v1"
+        )
+
+        task.refresh_from_db()
+        assert task.deleted_at is not None
+
+    def test_tombstone_paused(self):
+        paused_next_run = timezone.now() + timedelta(hours=1)
+        task = baker.make(
+            "django_q_registry.Task",
+            q_schedule=baker.make("django_q.Schedule"),
+            paused_at=timezone.now(),
+            paused_next_run=paused_next_run,
+        )
+
+        assert Task.objects.tombstone() == 1
+        assert Task.objects.tombstone() == 0
+
+        task.refresh_from_db()
+        assert task.paused_next_run == paused_next_run
+        assert task.deleted_at is not None
+
+    @pytest.mark.django_db(databases=["default", "other"])
+    def test_create_from_registry_using(self):
+        task = Task(
+            name="test",
+            func="tests.test_models.test_task",
+            kwargs={"schedule_type": Schedule.HOURLY},
+        )
+        registry = TaskRegistry(registered_tasks={task})
+
+        Task.objects.create_from_registry(registry, using="other")
+
+        assert not Task.objects.exists()
+        assert not Schedule.objects.exists()
+        assert Task.objects.using("other").get().q_schedule is not None
+        assert Schedule.objects.using("other").count() == 1
+
+        Task.objects.using("other").delete_dangling_objects(TaskRegistry())
+
+        assert not Task.objects.using("other").exists()
+        assert not Schedule.objects.using("other").exists()
+
+    @pytest.mark.django_db(databases=["default", "other"])
+    def test_create_from_registry_read_using(self):
+        task = Task(
+            name="test",
+            func="tests.test_models.test_task",
+            kwargs={"schedule_type": Schedule.HOURLY},
+        )
+        Task.objects.create_from_registry(TaskRegistry(registered_tasks={task}))
+
+        # the replica has not caught up, so the schedule is read from the primary
+        with CaptureQueriesContext(connections["other"]) as replica_queries:
+            Task.objects.create_from_registry(
+                TaskRegistry(registered_tasks={task}), read_using="other"
+            )
+
+        assert Schedule.objects.count() == 1
+        assert not Task.objects.using("other").exists()
+        assert any(
+            "django_q_schedule" in query["sql"]
+            for query in replica_queries.captured_queries
+        )
+
+    def test_prune_results_retain(self):
+        task = baker.make(
+            "django_q_registry.Task", name="test", retain=timedelta(days=1)
+        )
+        now = timezone.now()
+        baker.make(
+            "django_q.Task",
+            group=task.schedule_name,
+            stopped=itertools.cycle([now - timedelta(days=2), now]),
+            _quantity=4,
+        )
+        baker.make("django_q.Task", group="unrelated", stopped=now - timedelta(days=2))
+
+        deleted = Task.objects.prune_results()
+
+        assert deleted == 2
+        assert QTask.objects.filter(group=task.schedule_name).count() == 2
+        assert QTask.objects.filter(group="unrelated").exists()
+
+    def test_prune_results_keep_last(self):
+        task = baker.make("django_q_registry.Task", name="test", keep_last=3)
+        now = timezone.now()
+        baker.make(
+            "django_q.Task",
+            group=task.schedule_name,
+            stopped=iter([now - timedelta(minutes=i) for i in range(10)]),
+            _quantity=10,
+        )
+
+        deleted = Task.objects.prune_results(chunk_size=2)
+
+        assert deleted == 7
+        assert set(
+            QTask.objects.filter(group=task.schedule_name).values_list(
+                "stopped", flat=True
+            )
+        ) == {now - timedelta(minutes=i) for i in range(3)}
+
+    def test_prune_results_no_options(self):
+        task = baker.make("django_q_registry.Task", name="test")
+        baker.make(
+            "django_q.Task",
+            group=task.schedule_name,
+            stopped=timezone.now() - timedelta(days=365),
+        )
+
+        assert Task.objects.prune_results() == 0
+
+    def test_prune_results_index(self):
+        now = timezone.now()
+        newest = (
+            QTask.objects.filter(group="test")
+            .order_by("-stopped")
+            .values_list("stopped", flat=True)
+        )
+        oldest = (
+            QTask.objects.filter(group="test", stopped__lt=now)
+            .order_by("stopped")
+            .values_list("pk", flat=True)
+        )
+
+        for queryset in (newest, oldest):
+            assert "qregistry_group_stopped_idx" in queryset.explain()
+
     def test_create_in_memory_with_datetime(self):
         # sanity check for this related issue:
         # https://github.com/westerveltco/django-q-registry/issues/30
@@ -277,8 +766,170 @@ class TestTaskQuerySet:
         assert not in_memory_task.pk
         assert in_memory_task.kwargs["datetime"] == task_kwargs["datetime"]
 
+    @pytest.fixture
+    def scheduled_tasks(self):
+        next_run = timezone.now() + timedelta(hours=1)
+        schedules = baker.make(
+            "django_q.Schedule",
+            name=itertools.cycle(
+                [f"test{i}{app_settings.PERIODIC_TASK_SUFFIX}" for i in range(3)]
+            ),
+            next_run=next_run,
+            _quantity=3,
+        )
+        return baker.make(
+            "django_q_registry.Task",
+            q_schedule=itertools.cycle(schedules),
+            _quantity=len(schedules),
+        )
+
+    def test_pause(self, scheduled_tasks, django_assert_num_queries):
+        with django_assert_num_queries(3):
+            paused = Task.objects.all().pause()
+
+        assert paused == 3
+        assert not Schedule.objects.filter(next_run__isnull=False).exists()
+        assert not Task.objects.filter(
+            models.Q(paused_at__isnull=True) | models.Q(paused_next_run__isnull=True)
+        ).exists()
+
+    def test_pause_already_paused(self, scheduled_tasks):
+        Task.objects.all().pause()
+
+        assert Task.objects.all().pause() == 0
+
+    def test_pause_ignores_unowned_schedules(self):
+        schedule = baker.make("django_q.Schedule", name="not registry owned")
+        baker.make("django_q_registry.Task", q_schedule=schedule)
+
+        assert Task.objects.all().pause() == 0
+
+        schedule.refresh_from_db()
+        assert schedule.next_run is not None
+        assert Task.objects.get().paused_at is None
+
+    @pytest.mark.django_db(databases=["default", "other"])
+    def test_pause_and_resume_using(self):
+        next_run = timezone.now() + timedelta(hours=1)
+        schedule = baker.make(
+            "django_q.Schedule",
+            name=f"test{app_settings.PERIODIC_TASK_SUFFIX}",
+            next_run=next_run,
+            _using="other",
+        )
+        baker.make("django_q_registry.Task", q_schedule=schedule, _using="other")
+
+        assert Task.objects.using("other").pause() == 1
+
+        assert Task.objects.using("other").get().paused_at is not None
+        assert Schedule.objects.using("other").get().next_run is None
+
+        assert Task.objects.using("other").resume() == 1
+
+        assert Task.objects.using("other").get().paused_at is None
+        assert Schedule.objects.using("other").get().next_run == next_run
+
+        Task.objects.using("other").run_now()
+
+        assert Schedule.objects.using("other").count() == 2
+        assert not Schedule.objects.exists()
+
+    def test_resume(self, scheduled_tasks, django_assert_num_queries):
+        next_runs = dict(Schedule.objects.values_list("pk", "next_run"))
+        Task.objects.all().pause()
+
+        with django_assert_num_queries(3):
+            resumed = Task.objects.all().resume()
+
+        assert resumed == 3
+        assert dict(Schedule.objects.values_list("pk", "next_run")) == next_runs
+        assert not Task.objects.filter(paused_at__isnull=False).exists()
+
+    def test_resume_missed_next_run(self, scheduled_tasks):
+        Schedule.objects.update(next_run=timezone.now() - timedelta(days=1))
+        Task.objects.all().pause()
+        before = timezone.now()
+
+        Task.objects.all().resume()
+
+        assert not Schedule.objects.filter(next_run__lt=before).exists()
+
+    def test_pause_survives_create_from_registry(self):
+        next_run = timezone.now()
+        registry = TaskRegistry(
+            registered_tasks={
+                Task(
+                    name="test",
+                    func="tests.test_models.test_task",
+                    kwargs={"next_run": next_run},
+                )
+            }
+        )
+        Task.objects.create_from_registry(registry)
+        Task.objects.all().pause()
+
+        registry = TaskRegistry(
+            registered_tasks={
+                Task(
+                    name="test",
+                    func="tests.test_models.test_task",
+                    kwargs={"next_run": next_run},
+                )
+            }
+        )
+        Task.objects.create_from_registry(registry)
+
+        assert Task.objects.get().paused_at is not None
+        assert Schedule.objects.get().next_run is None
+
+    def test_run_now(self, scheduled_tasks, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            schedules = Task.objects.all().run_now()
+
+        assert len(schedules) == 3
+        assert (
+            Schedule.objects.filter(
+                schedule_type=Schedule.ONCE, registered_task__isnull=True
+            ).count()
+            == 3
+        )
+
+    def test_run_now_not_deleted_as_dangling(self, scheduled_tasks):
+        registry = TaskRegistry(created_tasks=set(scheduled_tasks))
+        Task.objects.all().run_now()
+
+        Task.objects.delete_dangling_objects(registry)
+
+        assert Schedule.objects.count() == 6
+
 
 class TestTask:
+    @pytest.mark.parametrize(
+        ("kwargs", "run_once_kwargs"),
+        [
+            (None, {"q_options": {"group": "test - QREGISTRY"}}),
+            (
+                {"a": 1, "q_options": {"timeout": 5}},
+                {"a": 1, "q_options": {"group": "test - QREGISTRY", "timeout": 5}},
+            ),
+            ({"q_options": {"group": "own"}}, {"q_options": {"group": "own"}}),
+            ("a=1", "a=1, q_options={'group': 'test - QREGISTRY'}"),
+        ],
+    )
+    def test_to_run_once_schedule_group(self, kwargs, run_once_kwargs):
+        task = Task(
+            name="test",
+            func="tests.test_models.test_task",
+            kwargs={"kwargs": kwargs} if kwargs else {},
+        )
+
+        schedule = task.to_run_once_schedule(next_run=timezone.now())
+
+        assert schedule.name == "test - run now"
+        if isinstance(run_once_kwargs, dict):
+            run_once_kwargs = repr(run_once_kwargs)
+        assert schedule.kwargs == run_once_kwargs
+
     def test_hash_in_memory(self):
         task = Task(
             name="test",
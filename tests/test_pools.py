@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import ast
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+from django_q.conf import Conf
+from django_q.models import OrmQ
+from django_q.models import Schedule
+from django_q.scheduler import scheduler
+from django_q.signing import SignedPackage
+
+from django_q_registry import pools
+from django_q_registry.models import PoolSlot
+from django_q_registry.models import Task
+from django_q_registry.receivers import discard_deferred
+from django_q_registry.receivers import limit_concurrency
+from django_q_registry.receivers import run_dependents
+from django_q_registry.registry import registry
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def pool_settings():
+    with override_settings(Q_REGISTRY={"POOLS": {"warehouse": 2}}):
+        yield
+
+
+@pytest.fixture
+def pooled_task():
+    task = Task.objects.create_in_memory(add, {"name": "pooled", "pool": "warehouse"})
+    registry.registered_tasks.add(task)
+    yield task
+    registry.registered_tasks.discard(task)
+
+
+def add(a, b):
+    return a + b
+
+
+def test_acquire_release():
+    first = pools.acquire("warehouse")
+    second = pools.acquire("warehouse")
+
+    assert first is not None
+    assert second is not None
+    assert pools.acquire("warehouse") is None
+
+    pools.release(first)
+
+    assert pools.acquire("warehouse") is not None
+
+
+def test_acquire_queries(django_assert_num_queries):
+    # the slots are created the first time the pool is full
+    with django_assert_num_queries(5):
+        assert pools.acquire("warehouse") is not None
+    with django_assert_num_queries(2):
+        assert pools.acquire("warehouse") is not None
+    with django_assert_num_queries(2):
+        assert pools.acquire("warehouse") is None
+
+    assert PoolSlot.objects.count() == 2
+
+
+def test_acquire_expired_lease():
+    pools.acquire("warehouse")
+    pools.acquire("warehouse")
+    PoolSlot.objects.filter(slot=0).update(
+        expires_at=timezone.now() - timedelta(seconds=1)
+    )
+
+    lease = pools.acquire("warehouse")
+
+    assert lease is not None
+    assert PoolSlot.objects.get(pk=lease[0]).slot == 0
+
+
+def test_acquire_resized_pool():
+    pools.acquire("warehouse")
+    pools.acquire("warehouse")
+
+    with override_settings(Q_REGISTRY={"POOLS": {"warehouse": 3}}):
+        assert pools.acquire("warehouse") is not None
+        assert pools.acquire("warehouse") is None
+
+    with override_settings(Q_REGISTRY={"POOLS": {"warehouse": 1}}):
+        assert pools.acquire("warehouse") is None
+
+
+def test_release_expired_lease():
+    lease = pools.acquire("warehouse")
+    assert lease is not None
+    PoolSlot.objects.filter(pk=lease[0]).update(holder="another worker")
+
+    pools.release(lease)
+
+    assert PoolSlot.objects.get(pk=lease[0]).holder == "another worker"
+
+
+def test_run_in_pool():
+    assert pools.run_in_pool("warehouse", {}, "tests.test_pools.add", 1, b=2) == 3
+    # slot is released after the run
+    assert pools.acquire("warehouse") is not None
+    assert pools.acquire("warehouse") is not None
+
+
+def test_run_in_pool_releases_on_error():
+    with pytest.raises(ZeroDivisionError):
+        pools.run_in_pool("warehouse", {}, lambda: 1 / 0)
+
+    assert pools.acquire("warehouse") is not None
+    assert pools.acquire("warehouse") is not None
+
+
+def test_run_in_pool_full_defers():
+    pools.acquire("warehouse")
+    pools.acquire("warehouse")
+    q_options = {
+        "group": "group",
+        "hook": "tests.test_pools.add",
+        "cluster": "warehouse",
+        "timeout": 60,
+    }
+
+    assert (
+        pools.run_in_pool("warehouse", q_options, "tests.test_pools.add", 1, b=2)
+        == pools.DEFERRED
+    )
+
+    deferred = Schedule.objects.get()
+    assert deferred.name == "group - deferred"
+    assert deferred.schedule_type == Schedule.ONCE
+    assert deferred.func == "django_q_registry.pools.run_in_pool"
+    assert deferred.hook == "tests.test_pools.add"
+    assert deferred.cluster == "warehouse"
+    assert deferred.next_run > timezone.now() + timedelta(seconds=20)
+    assert ast.literal_eval(deferred.args) == (
+        "warehouse",
+        q_options,
+        "tests.test_pools.add",
+        1,
+    )
+    assert ast.literal_eval(deferred.kwargs) == {
+        "b": 2,
+        "q_options": {"group": "group", "timeout": 60},
+    }
+
+
+@pytest.mark.parametrize("sync", [True, False])
+def test_deferred_run_enqueued_with_options(pooled_task, sync):
+    """
+    The Django Q scheduler enqueues a deferred run with its group, hook, and timeout, without wrapping
+    it again, and with any broker, as it is a schedule.
+    """
+    q_options = {
+        "group": pooled_task.schedule_name,
+        "hook": "tests.test_pools.add",
+        "timeout": 60,
+    }
+    schedule = pools.defer("warehouse", q_options, pooled_task.func, (1, 2), {})
+    Schedule.objects.filter(pk=schedule.pk).update(next_run=timezone.now())
+
+    with (
+        mock.patch.object(Conf, "SYNC", sync),
+        mock.patch("django_q_registry.pools.acquire", return_value=None),
+    ):
+        scheduler()
+
+    if sync:
+        # run right away, and deferred again
+        assert Schedule.objects.get().name == f"{pooled_task.schedule_name} - deferred"
+        return
+    package = SignedPackage.loads(OrmQ.objects.get().payload)
+    assert package["func"] == "django_q_registry.pools.run_in_pool"
+    assert package["args"] == ("warehouse", q_options, pooled_task.func, 1, 2)
+    assert package["group"] == pooled_task.schedule_name
+    assert package["hook"] == "tests.test_pools.add"
+    assert package["timeout"] == 60
+
+
+def test_deferred_run_not_saved(chained_pooled_tasks):
+    parent, _ = chained_pooled_tasks
+    now = timezone.now()
+    package = {
+        "group": parent.schedule_name,
+        "func": "django_q_registry.pools.run_in_pool",
+        "result": pools.DEFERRED,
+        "success": True,
+        "started": now,
+        "stopped": now,
+    }
+
+    discard_deferred(sender="django_q", func=None, task=package)
+    run_dependents(sender="django_q", task=package)
+
+    assert package["save"] is False
+    assert not OrmQ.objects.exists()
+
+
+@pytest.fixture
+def chained_pooled_tasks():
+    parent = Task.objects.create_in_memory(add, {"name": "parent", "pool": "warehouse"})
+    child = Task.objects.create_in_memory(add, {"name": "child", "after": "parent"})
+    with registry.override([parent, child]):
+        yield parent, child
+
+
+def test_limit_concurrency(pooled_task):
+    package = {
+        "group": pooled_task.schedule_name,
+        "func": pooled_task.func,
+        "args": (1, 2),
+        "hook": "tests.test_pools.add",
+        "cluster": "warehouse",
+        "id": "not an option",
+    }
+
+    limit_concurrency(sender="django_q", task=package)
+
+    assert package["func"] == "django_q_registry.pools.run_in_pool"
+    assert package["args"] == (
+        "warehouse",
+        {
+            "group": pooled_task.schedule_name,
+            "hook": "tests.test_pools.add",
+            "cluster": "warehouse",
+        },
+        pooled_task.func,
+        1,
+        2,
+    )
+
+
+def test_limit_concurrency_run_now(pooled_task):
+    with registry.override([pooled_task]):
+        Task.objects.create_from_registry(registry)
+    Schedule.objects.update(next_run=timezone.now() + timedelta(hours=1))
+    Task.objects.all().run_now()
+
+    scheduler()
+
+    package = SignedPackage.loads(OrmQ.objects.get().payload)
+    assert package["func"] == "django_q_registry.pools.run_in_pool"
+    assert package["args"][0] == "warehouse"
+
+
+def test_limit_concurrency_not_wrapped(pooled_task):
+    func = "django_q_registry.pools.run_in_pool"
+    package = {"group": pooled_task.schedule_name, "func": func, "args": ()}
+
+    limit_concurrency(sender="django_q", task=package)
+
+    assert package == {"group": pooled_task.schedule_name, "func": func, "args": ()}
+
+
+def test_limit_concurrency_unpooled():
+    package = {"group": "unregistered", "func": "tests.test_pools.add", "args": ()}
+
+    limit_concurrency(sender="django_q", task=package)
+
+    assert package["func"] == "tests.test_pools.add"
+
+
+def test_unknown_pool():
+    with pytest.raises(ValueError, match="not configured"):
+        Task.objects.create_in_memory(add, {"pool": "unknown"})
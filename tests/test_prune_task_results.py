@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from django_q.models import Task as QTask
+from model_bakery import baker
+
+pytestmark = pytest.mark.django_db
+
+
+def test_prune_task_results(capsys):
+    task = baker.make("django_q_registry.Task", name="test", retain=timedelta(days=1))
+    baker.make(
+        "django_q.Task",
+        group=task.schedule_name,
+        stopped=timezone.now() - timedelta(days=2),
+        _quantity=3,
+    )
+
+    call_command("prune_task_results", chunk_size=2)
+
+    assert not QTask.objects.exists()
+    assert "Deleted 3 task result(s)." in capsys.readouterr().out
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from unittest import mock
+
+import pytest
+from django.utils import timezone
+from django_q.models import OrmQ
+
+from django_q_registry.models import Task
+from django_q_registry.receivers import run_dependents
+from django_q_registry.receivers import sample_results
+from django_q_registry.registry import registry
+
+
+@pytest.fixture
+def sampled_task():
+    task = Task(name="sampled", func="tests.test_receivers.sampled", kwargs={})
+    task.result_sample_rate = 0.25
+    registry.registered_tasks.add(task)
+    yield task
+    registry.registered_tasks.discard(task)
+
+
+def run(task, success=True):
+    package = {"group": task.schedule_name, "success": success}
+    sample_results(sender="django_q", func=None, task=package)
+    return package
+
+
+def test_sample_results_sampled_out(sampled_task):
+    with mock.patch("django_q_registry.receivers.random.random", return_value=0.5):
+        assert run(sampled_task)["save"] is False
+
+
+def test_sample_results_sampled_in(sampled_task):
+    with mock.patch("django_q_registry.receivers.random.random", return_value=0.1):
+        assert "save" not in run(sampled_task)
+
+
+def test_sample_results_failure_always_saved(sampled_task):
+    with mock.patch("django_q_registry.receivers.random.random", return_value=0.5):
+        assert "save" not in run(sampled_task, success=False)
+
+
+def test_sample_results_unregistered_group():
+    package = {"group": "unregistered", "success": True}
+
+    sample_results(sender="django_q", func=None, task=package)
+
+    assert "save" not in package
+
+
+def test_skip_if_type():
+    with pytest.raises(TypeError):
+        Task.objects.create_in_memory(sampled, {"skip_if": "not callable"})
+
+
+def sampled():
+    pass
+
+
+@pytest.fixture
+def chained_tasks():
+    parent = Task.objects.create_in_memory(sampled, {"name": "parent"})
+    child = Task.objects.create_in_memory(sampled, {"name": "child", "after": "parent"})
+    registry.registered_tasks.update({parent, child})
+    yield parent, child
+    registry.registered_tasks.difference_update({parent, child})
+
+
+@pytest.mark.django_db
+def test_run_dependents(chained_tasks):
+    parent, _ = chained_tasks
+    now = timezone.now()
+
+    run_dependents(
+        sender="django_q",
+        task={
+            "group": parent.schedule_name,
+            "func": parent.func,
+            "success": True,
+            "started": now,
+            "stopped": now,
+        },
+    )
+
+    assert OrmQ.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_run_dependents_failed(chained_tasks):
+    parent, _ = chained_tasks
+    now = timezone.now()
+
+    run_dependents(
+        sender="django_q",
+        task={
+            "group": parent.schedule_name,
+            "func": parent.func,
+            "started": now,
+            "stopped": now,
+            "success": False,
+        },
+    )
+
+    assert not OrmQ.objects.exists()
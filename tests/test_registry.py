@@ -7,6 +7,7 @@ from model_bakery import baker
 
 from django_q_registry.models import Task
 from django_q_registry.registry import TaskRegistry
+from django_q_registry.registry import TaskSet
 
 
 @pytest.fixture
@@ -179,3 +180,251 @@ def test_issue_6_regression(registry):
             },
         },
     )
+
+
+def first_task():
+    pass
+
+
+def second_task():
+    pass
+
+
+@pytest.fixture
+def indexed_registry(registry):
+    registry.register(first_task, name="first")
+    registry.register(first_task, name="first again")
+    registry.register(second_task, name="second", namespace="reports")
+    return registry
+
+
+def test_filter(indexed_registry):
+    assert {task.name for task in indexed_registry.filter(name="first")} == {"first"}
+    assert {
+        task.name
+        for task in indexed_registry.filter(func="tests.test_registry.first_task")
+    } == {"first", "first again"}
+    assert len(indexed_registry.filter(module="tests.test_registry")) == 3
+    assert (
+        indexed_registry.filter(name="first", func="tests.test_registry.second_task")
+        == set()
+    )
+    assert {task.name for task in indexed_registry.filter(namespace="reports")} == {
+        "second"
+    }
+    assert indexed_registry.filter() == indexed_registry.registered_tasks
+
+
+def test_get(indexed_registry):
+    assert indexed_registry.get(name="second").func == "tests.test_registry.second_task"
+
+    with pytest.raises(LookupError):
+        indexed_registry.get(func="tests.test_registry.first_task")
+    with pytest.raises(LookupError):
+        indexed_registry.get(name="missing")
+
+
+def test_unregister_by_name(indexed_registry):
+    removed = indexed_registry.unregister("first")
+
+    assert {task.name for task in removed} == {"first"}
+    assert len(indexed_registry.registered_tasks) == 2
+    assert indexed_registry.filter(name="first") == set()
+    assert len(indexed_registry.filter(module="tests.test_registry")) == 2
+
+
+def test_unregister_task(indexed_registry):
+    task = indexed_registry.get(name="second")
+
+    assert indexed_registry.unregister(task) == {task}
+    assert indexed_registry.unregister(task) == set()
+    assert indexed_registry.filter(func="tests.test_registry.second_task") == set()
+
+
+def test_index_follows_set_changes(indexed_registry):
+    task = indexed_registry.get(name="second")
+
+    indexed_registry.registered_tasks.discard(task)
+
+    assert indexed_registry.filter(name="second") == set()
+
+    indexed_registry.registered_tasks.add(task)
+
+    assert indexed_registry.get(name="second") == task
+
+
+def test_set_semantics(indexed_registry):
+    tasks = indexed_registry.registered_tasks
+    first = indexed_registry.get(name="first")
+    other = Task(name="other", func="tests.test_registry.first_task")
+
+    assert isinstance(tasks, set)
+    assert type(tasks.union({other})) is set
+    assert tasks | {other} == {*tasks, other}
+    assert {other} | tasks == {*tasks, other}
+    assert tasks - {first} == set(tasks) - {first}
+    assert type(tasks.copy()) is TaskSet
+    assert tasks.copy() == tasks
+
+
+def test_index_follows_set_operators(indexed_registry):
+    tasks = indexed_registry.registered_tasks
+    first = indexed_registry.get(name="first")
+    other = Task(name="other", func="tests.test_registry.first_task")
+
+    tasks |= {other}
+    assert indexed_registry.get(name="other") == other
+
+    tasks -= {other}
+    assert indexed_registry.filter(name="other") == set()
+
+    tasks &= {first}
+    assert indexed_registry.filter() == {first}
+    assert indexed_registry.filter(namespace="reports") == set()
+
+    tasks ^= {first, other}
+    assert indexed_registry.filter() == {other}
+    assert indexed_registry.registered_tasks is tasks
+
+    assert tasks.pop() == other
+    assert indexed_registry.filter(module="tests.test_registry") == set()
+
+
+def test_registry_from_set():
+    task = Task(name="from set", func="tests.test_registry.first_task")
+
+    registry = TaskRegistry(registered_tasks={task})
+
+    assert registry.get(name="from set") == task
+
+
+def test_find_by_schedule_name(indexed_registry):
+    task = indexed_registry.get(name="second")
+
+    assert indexed_registry.find_by_schedule_name(task.schedule_name) == task
+    assert indexed_registry.find_by_schedule_name("second") is None
+    assert indexed_registry.find_by_schedule_name("missing - QREGISTRY") is None
+
+
+@pytest.mark.django_db
+def test_update_created_tasks(registry):
+    tasks = baker.make("django_q_registry.Task", _quantity=2)
+
+    registry.update_created_tasks(Task.objects.all())
+
+    assert registry.created_tasks == set(tasks)
+    assert registry.created_tasks_by_pk == {task.pk: task for task in tasks}
+
+
+def test_override(indexed_registry):
+    original = indexed_registry.registered_tasks
+
+    with indexed_registry.override() as overridden:
+        assert overridden is indexed_registry
+        assert len(indexed_registry.registered_tasks) == 0
+        indexed_registry.register(first_task, name="overridden")
+
+    assert indexed_registry.registered_tasks is original
+    assert indexed_registry.filter(name="overridden") == set()
+
+
+def test_override_tasks(indexed_registry):
+    task = Task(name="given", func="tests.test_registry.first_task")
+
+    with indexed_registry.override([task]):
+        assert indexed_registry.get(name="given") is task
+
+    assert len(indexed_registry.registered_tasks) == 3
+
+
+def test_override_snapshot(indexed_registry):
+    with indexed_registry.override(snapshot=True):
+        assert len(indexed_registry.registered_tasks) == 3
+        indexed_registry.unregister("first")
+        assert indexed_registry.filter(name="first") == set()
+
+    assert len(indexed_registry.filter(name="first")) == 1
+
+
+WATCHED_TASKS = """
+from django_q.models import Schedule
+
+from django_q_registry.registry import register_task
+
+
+@register_task(name="kept", schedule_type=Schedule.HOURLY)
+def kept():
+    pass
+
+
+@register_task(name="changed", schedule_type=Schedule.HOURLY)
+def changed():
+    pass
+
+
+@register_task(name="removed", schedule_type=Schedule.HOURLY)
+def removed():
+    pass
+"""
+
+
+def test_reload_module(tasks_module):
+    from django_q_registry.registry import registry
+
+    tasks_module(WATCHED_TASKS)
+
+    with registry.override():
+        removed, changed = registry.reload_module("watched_tasks")
+
+        assert removed == set()
+        assert {task.name for task in changed} == {"kept", "changed", "removed"}
+
+        tasks_module(
+            WATCHED_TASKS.replace(
+                'name="changed",', 'name="changed", keep_last=5,'
+            ).replace('name="removed"', 'name="added"')
+        )
+        removed, changed = registry.reload_module("watched_tasks")
+
+        assert {task.name for task in removed} == {"removed"}
+        assert {task.name for task in changed} == {"changed", "added"}
+        assert {task.name for task in registry.registered_tasks} == {
+            "kept",
+            "changed",
+            "added",
+        }
+        assert registry.get(name="changed").keep_last == 5
+
+
+@override_settings(Q_REGISTRY={"PRIORITIES": {"high": "critical", "low": "bulk"}})
+def test_reload_module_priority(tasks_module):
+    from django_q_registry.registry import registry
+
+    tasks_module(WATCHED_TASKS)
+
+    with registry.override():
+        registry.reload_module("watched_tasks")
+
+        tasks_module(
+            WATCHED_TASKS.replace('name="changed",', 'name="changed", priority="high",')
+        )
+        removed, changed = registry.reload_module("watched_tasks")
+
+        assert removed == set()
+        assert {task.name for task in changed} == {"changed"}
+
+
+def test_reload_module_failure(tasks_module):
+    from django_q_registry.registry import registry
+
+    tasks_module(WATCHED_TASKS)
+
+    with registry.override():
+        registry.reload_module("watched_tasks")
+        tasks = set(registry.registered_tasks)
+
+        tasks_module(WATCHED_TASKS + "\nraise RuntimeError\n")
+        with pytest.raises(RuntimeError):
+            registry.reload_module("watched_tasks")
+
+        assert set(registry.registered_tasks) == tasks
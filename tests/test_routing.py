@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+from django_q.brokers import get_broker
+from django_q.conf import Conf
+from django_q.models import Schedule
+from django_q.scheduler import scheduler
+from django_q.signing import SignedPackage
+from django_q.tasks import async_task
+from model_bakery import baker
+
+from django_q_registry.models import Task
+from django_q_registry.registry import TaskRegistry
+from django_q_registry.routing import get_routes
+from django_q_registry.routing import get_runtimes
+
+pytestmark = pytest.mark.django_db
+
+AUTO_ROUTING = {
+    "ROUTING": {
+        "MODE": "auto",
+        "FAST_CLUSTER": "fast",
+        "BULK_CLUSTER": "bulk",
+        "THRESHOLD": 60,
+    }
+}
+
+
+def make_runs(task, seconds, quantity=2):
+    now = timezone.now()
+    baker.make(
+        "django_q.Task",
+        group=task.schedule_name,
+        started=now - timedelta(seconds=seconds),
+        stopped=now,
+        success=True,
+        _quantity=quantity,
+    )
+
+
+def test_get_runtimes():
+    task = Task(name="test", func="tests.test_routing.test_get_runtimes")
+    make_runs(task, 10)
+    make_runs(task, 30)
+
+    assert get_runtimes([task.schedule_name]) == {
+        task.schedule_name: timedelta(seconds=20)
+    }
+
+
+def test_get_routes_default():
+    task = Task(name="test", func="tests.test_routing.test_get_routes_default")
+
+    assert get_routes([task]) == {task: None}
+
+
+@override_settings(Q_REGISTRY={"ROUTING": {"DEFAULT_CLUSTER": "default"}})
+def test_get_routes_static():
+    task = Task(name="test", func="tests.test_routing.test_get_routes_static")
+
+    assert get_routes([task]) == {task: "default"}
+
+
+@override_settings(Q_REGISTRY=AUTO_ROUTING)
+def test_get_routes_auto(django_assert_num_queries):
+    light = Task(name="light", func="tests.test_routing.light")
+    heavy = Task(name="heavy", func="tests.test_routing.heavy")
+    new = Task(name="new", func="tests.test_routing.new")
+    pinned = Task(
+        name="pinned", func="tests.test_routing.pinned", kwargs={"cluster": "other"}
+    )
+    make_runs(light, 1)
+    make_runs(heavy, 600)
+    make_runs(pinned, 600)
+
+    with django_assert_num_queries(1):
+        routes = get_routes([light, heavy, new, pinned])
+
+    assert routes == {light: "fast", heavy: "bulk", new: None, pinned: "other"}
+
+
+@override_settings(Q_REGISTRY=AUTO_ROUTING)
+def test_create_from_registry_applies_routes():
+    registry = TaskRegistry()
+    registry.registered_tasks.clear()
+    registry.register(heavy, schedule_type=Schedule.DAILY)
+    make_runs(next(iter(registry.registered_tasks)), 600)
+
+    Task.objects.create_from_registry(registry)
+
+    assert Schedule.objects.get().cluster == "bulk"
+
+
+def test_queue_alias():
+    task = Task.objects.create_in_memory(heavy, {"queue": "bulk"})
+
+    assert task.kwargs == {"cluster": "bulk"}
+
+
+def test_queue_and_cluster_conflict():
+    with pytest.raises(ValueError, match="alias"):
+        Task.objects.create_in_memory(heavy, {"queue": "bulk", "cluster": "fast"})
+
+
+def heavy():
+    pass
+
+
+PRIORITIES = {"PRIORITIES": {"high": "critical", "normal": None, "low": "bulk"}}
+
+
+@override_settings(Q_REGISTRY={**AUTO_ROUTING, **PRIORITIES})
+def test_get_routes_priority():
+    high = Task.objects.create_in_memory(
+        make_runs, {"name": "high", "priority": "high"}
+    )
+    normal = Task.objects.create_in_memory(
+        make_runs, {"name": "normal", "priority": "normal"}
+    )
+    pinned = Task.objects.create_in_memory(
+        make_runs, {"name": "pinned", "priority": "low", "cluster": "pinned"}
+    )
+    # priority wins over auto routing
+    make_runs(high, 600)
+
+    assert get_routes([high, normal, pinned]) == {
+        high: "critical",
+        normal: None,
+        pinned: "pinned",
+    }
+
+
+@override_settings(Q_REGISTRY=PRIORITIES)
+def test_enqueue_priority():
+    task = Task.objects.create_in_memory(
+        make_runs, {"name": "high", "priority": "high"}
+    )
+
+    with mock.patch("django_q_registry.models.async_task") as async_task:
+        task.enqueue()
+
+    assert async_task.call_args.kwargs["q_options"]["cluster"] == "critical"
+
+
+def test_unknown_priority():
+    with pytest.raises(ValueError, match="not configured"):
+        Task.objects.create_in_memory(make_runs, {"priority": "urgent"})
+
+
+def low_priority():
+    pass
+
+
+def high_priority():
+    pass
+
+
+@override_settings(Q_REGISTRY=PRIORITIES)
+def test_priority_saturation():
+    registry = TaskRegistry()
+    registry.register(high_priority, priority="high", schedule_type=Schedule.MINUTES)
+    for i in range(20):
+        registry.register(
+            low_priority,
+            name=f"low {i}",
+            priority="low",
+            schedule_type=Schedule.MINUTES,
+        )
+    Task.objects.create_from_registry(registry)
+    Schedule.objects.update(next_run=timezone.now() - timedelta(minutes=1))
+    # the bulk cluster is saturated, with a backlog its workers have not picked up yet
+    for _ in range(50):
+        async_task(low_priority, cluster="bulk")
+
+    # each cluster's scheduler enqueues the due schedules routed to it, on its own queue
+    for cluster in ("bulk", "critical"):
+        with mock.patch.object(Conf, "CLUSTER_NAME", cluster):
+            scheduler()
+
+    bulk = get_broker("bulk")
+    critical = get_broker("critical")
+    assert bulk.queue_size() == 70
+    assert critical.queue_size() == 1
+
+    # so a critical worker picks up the high priority run first, whatever the bulk backlog
+    ((_, payload),) = critical.dequeue()
+    assert SignedPackage.loads(payload)["func"] == "tests.test_routing.high_priority"
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import itertools
+import sys
 from datetime import datetime
+from pathlib import Path
+from unittest import mock
 
 import pytest
+from django.core.management import call_command
 from django_q.models import Schedule
 from model_bakery import baker
 
@@ -11,6 +15,7 @@ from django_q_registry.conf import app_settings
 from django_q_registry.management.commands import setup_periodic_tasks
 from django_q_registry.models import Task
 from django_q_registry.registry import registry
+from django_q_registry.signals import task_updated
 
 pytestmark = pytest.mark.django_db
 
@@ -95,3 +100,145 @@ def test_setup_periodic_tasks_dangling_legacy_schedules():
     assert len(registry.registered_tasks) == 2
     assert len(registry.created_tasks) == 2
     assert Schedule.objects.count() == 2 + len(schedules)
+
+
+def test_setup_periodic_tasks_routes_output(capsys):
+    setup_periodic_tasks.Command().handle(verbosity=2)
+
+    out = capsys.readouterr().out
+    assert "test_task -> default cluster" in out
+    assert "Issue 30 regression -> default cluster" in out
+
+
+@pytest.mark.django_db(transaction=True)
+def test_setup_periodic_tasks_async():
+    baker.make("django_q_registry.Task", _quantity=3)
+
+    call_command("setup_periodic_tasks", "--async")
+
+    assert len(registry.created_tasks) == 2
+    assert Task.objects.count() == 2
+    assert Schedule.objects.count() == 2
+
+
+@pytest.mark.django_db(databases=["default", "other"])
+def test_setup_periodic_tasks_database():
+    call_command("setup_periodic_tasks", "--database", "other")
+
+    assert not Task.objects.exists()
+    assert Task.objects.using("other").count() == 2
+    assert Schedule.objects.using("other").count() == 2
+
+
+def test_setup_periodic_tasks_namespace():
+    other = baker.make("django_q_registry.Task", namespace="other")
+    baker.make("django_q_registry.Task")
+
+    call_command("setup_periodic_tasks", "--namespace", "")
+
+    assert len(registry.created_tasks) == 2
+    assert Task.objects.count() == 3
+    assert Task.objects.filter(pk=other.pk).exists()
+
+
+def test_setup_periodic_tasks_generation():
+    dangling = baker.make("django_q_registry.Task")
+
+    call_command("setup_periodic_tasks", "--generation", "v1")
+
+    assert len(registry.created_tasks) == 2
+    assert Task.objects.filter(generation__name="v1").count() == 2
+    dangling.refresh_from_db()
+    assert dangling.deleted_at is not None
+
+
+WATCHED_TASKS = """
+from django_q.models import Schedule
+
+from django_q_registry.registry import register_task
+
+
+@register_task(name="watched", schedule_type=Schedule.HOURLY)
+def watched():
+    pass
+
+
+@register_task(name="removed", schedule_type=Schedule.HOURLY)
+def removed():
+    pass
+"""
+
+
+def test_setup_periodic_tasks_watch(tasks_module):
+    tasks_module(WATCHED_TASKS)
+    command = setup_periodic_tasks.Command()
+    updated = []
+
+    def receiver(tasks, **kwargs):
+        updated.extend(tasks)
+
+    with registry.override(snapshot=True):
+        registry.reload_module("watched_tasks")
+        command.handle()
+        mtimes = setup_periodic_tasks.get_mtimes(["watched_tasks"])
+
+        assert command.reload_changed(mtimes) == mtimes
+        assert Task.objects.count() == 4
+
+        tasks_module(
+            WATCHED_TASKS.replace(
+                'name="watched",', 'name="watched", keep_last=5,'
+            ).replace('name="removed"', 'name="added"')
+        )
+        task_updated.connect(receiver, dispatch_uid="test_watch")
+        try:
+            command.reload_changed(mtimes)
+        finally:
+            task_updated.disconnect(dispatch_uid="test_watch")
+
+        assert [task.name for task in updated] == ["watched"]
+        assert set(Task.objects.values_list("name", flat=True)) == {
+            "test_task",
+            "Issue 30 regression",
+            "watched",
+            "added",
+        }
+        assert Task.objects.get(name="watched").keep_last == 5
+        assert Schedule.objects.count() == 4
+        assert len(registry.created_tasks) == 4
+
+
+def test_setup_periodic_tasks_watch_deleted(tasks_module):
+    tasks_module(WATCHED_TASKS)
+    command = setup_periodic_tasks.Command()
+
+    with registry.override(snapshot=True):
+        registry.reload_module("watched_tasks")
+        command.handle()
+        mtimes = setup_periodic_tasks.get_mtimes(["watched_tasks"])
+        path = Path(sys.modules["watched_tasks"].__file__)
+
+        path.unlink()
+        mtimes = command.reload_changed(mtimes)
+
+        assert mtimes == {"watched_tasks": None}
+        assert set(Task.objects.values_list("name", flat=True)) == {
+            "test_task",
+            "Issue 30 regression",
+        }
+        assert registry.filter(module="watched_tasks") == set()
+
+        tasks_module(WATCHED_TASKS)
+        command.reload_changed(mtimes)
+
+        assert Task.objects.count() == 4
+
+
+def test_setup_periodic_tasks_watch_interrupted(capsys):
+    with mock.patch.object(
+        setup_periodic_tasks.time, "sleep", side_effect=KeyboardInterrupt
+    ):
+        call_command("setup_periodic_tasks", "--watch")
+
+    assert Task.objects.count() == 2
+    assert "tasks module(s) for changes" in capsys.readouterr().out
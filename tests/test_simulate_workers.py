@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import json
+from unittest import mock
+
+import pytest
+from django.core.management import CommandError
+from django.core.management import call_command
+from django.test import override_settings
+from django_q.models import Schedule
+
+from django_q_registry.models import Task
+from django_q_registry.registry import TaskSet
+from django_q_registry.registry import registry
+
+
+def noop():
+    pass
+
+
+@pytest.fixture
+def cron_tasks():
+    tasks = {
+        Task.objects.create_in_memory(
+            noop,
+            {"name": f"task {i}", "schedule_type": Schedule.CRON, "cron": "0 * * * *"},
+        )
+        for i in range(4)
+    }
+    # only simulate these tasks, not the ones registered by other test modules
+    with mock.patch.object(registry, "registered_tasks", TaskSet(tasks)):
+        yield tasks
+
+
+def test_simulate_workers(cron_tasks, tmp_path, capsys):
+    stats = tmp_path / "stats.json"
+    stats.write_text(json.dumps({"task 0": 60, "task 1": 60}))
+
+    call_command(
+        "simulate_workers",
+        "--start",
+        "2024-06-14T00:00",
+        "--workers",
+        "1",
+        "--stats",
+        str(stats),
+        "--target-wait",
+        "0",
+    )
+
+    out = capsys.readouterr().out
+    assert "Runs: 96" in out
+    assert "Max wait: 62.0s" in out
+    assert "Fewest workers for a 0s 95th percentile wait: 4" in out
+
+
+@pytest.mark.django_db
+def test_simulate_workers_dump_stats(cron_tasks, tmp_path, capsys):
+    stats = tmp_path / "stats.json"
+
+    call_command("simulate_workers", "--dump-stats", str(stats))
+
+    assert json.loads(stats.read_text()) == {}
+    assert "Wrote runtimes of 0 task(s)" in capsys.readouterr().out
+
+
+@pytest.mark.django_db
+@override_settings(Q_REGISTRY={"PRIORITIES": {"high": "critical"}})
+def test_simulate_workers_clusters(cron_tasks, capsys):
+    high = Task.objects.create_in_memory(
+        noop,
+        {
+            "name": "high",
+            "priority": "high",
+            "schedule_type": Schedule.CRON,
+            "cron": "0 * * * *",
+        },
+    )
+    registry.registered_tasks.add(high)
+
+    call_command(
+        "simulate_workers",
+        "--start",
+        "2024-06-14T00:00",
+        "--default-runtime",
+        "60",
+        "--cluster-workers",
+        "default=1",
+        "--cluster-workers",
+        "critical=1",
+    )
+
+    out = capsys.readouterr().out
+    assert "critical: 24 runs on 1 workers, 0.0s 95th percentile wait" in out
+    assert "default: 96 runs on 1 workers" in out
+
+
+@pytest.mark.django_db
+def test_simulate_workers_clusters_missing(cron_tasks):
+    with pytest.raises(CommandError, match="default"):
+        call_command("simulate_workers", "--cluster-workers", "critical=1")
+
+
+@pytest.mark.django_db
+def test_simulate_workers_clusters_invalid(cron_tasks):
+    with pytest.raises(CommandError, match="CLUSTER=WORKERS"):
+        call_command("simulate_workers", "--cluster-workers", "critical")
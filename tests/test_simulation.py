@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from datetime import datetime
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+from django_q.models import Schedule
+from model_bakery import baker
+
+from django_q_registry.models import Task
+from django_q_registry.routing import get_routes
+from django_q_registry.simulation import get_arrivals
+from django_q_registry.simulation import get_arrivals_by_cluster
+from django_q_registry.simulation import get_min_workers
+from django_q_registry.simulation import get_runtime_snapshot
+from django_q_registry.simulation import simulate
+from django_q_registry.simulation import simulate_clusters
+
+START = timezone.make_aware(datetime(2024, 6, 14, 0, 0))
+
+
+def noop():
+    pass
+
+
+def test_simulate_no_wait():
+    result = simulate([(0, 10), (20, 10)], workers=1)
+
+    assert result.runs == 2
+    assert result.max_wait == 0
+    assert result.utilization == pytest.approx(20 / 30)
+
+
+def test_simulate_queue():
+    # four 10 second runs due at once, on two workers
+    result = simulate([(0, 10)] * 4, workers=2)
+
+    assert result.mean_wait == 5
+    assert result.max_wait == 10
+    assert result.utilization == 1
+
+
+def test_simulate_empty():
+    assert simulate([], workers=4).runs == 0
+
+
+def test_simulate_no_workers():
+    with pytest.raises(ValueError, match="at least 1"):
+        simulate([(0, 10)], workers=0)
+
+
+def test_get_min_workers():
+    arrivals = [(0, 60)] * 10
+
+    assert get_min_workers(arrivals, target_wait=0) == 10
+    assert get_min_workers(arrivals, target_wait=60) == 5
+    assert get_min_workers(arrivals, target_wait=600) == 1
+
+
+def test_get_arrivals():
+    slow = Task.objects.create_in_memory(
+        noop, {"name": "slow", "schedule_type": Schedule.CRON, "cron": "0 * * * *"}
+    )
+    fast = Task.objects.create_in_memory(
+        noop, {"name": "fast", "schedule_type": Schedule.CRON, "cron": "30 0 * * *"}
+    )
+
+    arrivals = get_arrivals(
+        [slow, fast],
+        START,
+        START + timedelta(hours=2),
+        runtimes={"slow": 120.0},
+        default_runtime=2.0,
+    )
+
+    assert arrivals == [(0.0, 120.0), (1800.0, 2.0), (3600.0, 120.0)]
+
+
+@pytest.mark.django_db
+def test_get_runtime_snapshot():
+    task = Task.objects.create_in_memory(noop, {"name": "snapshot"})
+    now = timezone.now()
+    baker.make(
+        "django_q.Task",
+        group=task.schedule_name,
+        success=True,
+        started=now - timedelta(seconds=30),
+        stopped=now,
+    )
+
+    assert get_runtime_snapshot([task]) == {"snapshot": 30.0}
+
+
+def test_simulate_clusters_no_workers():
+    with pytest.raises(ValueError, match="bulk"):
+        simulate_clusters({"bulk": [(0, 10)]}, {None: 1})
+
+
+@override_settings(Q_REGISTRY={"PRIORITIES": {"high": "critical", "low": "bulk"}})
+def test_simulate_priority_clusters():
+    high = Task.objects.create_in_memory(
+        noop,
+        {
+            "name": "high",
+            "priority": "high",
+            "schedule_type": Schedule.CRON,
+            "cron": "* * * * *",
+        },
+    )
+    low = [
+        Task.objects.create_in_memory(
+            noop,
+            {
+                "name": f"low {i}",
+                "priority": "low",
+                "schedule_type": Schedule.CRON,
+                "cron": "* * * * *",
+            },
+        )
+        for i in range(20)
+    ]
+    tasks = [high, *low]
+    # the low priority tasks need 100 workers to keep up, and get 4
+    runtimes = {"high": 1.0, **{task.name: 300.0 for task in low}}
+    routes = get_routes(tasks)
+
+    bulk_waits = []
+    for hours in (1, 2, 4):
+        end = START + timedelta(hours=hours)
+        results = simulate_clusters(
+            get_arrivals_by_cluster(tasks, START, end, runtimes, routes),
+            {"critical": 1, "bulk": 4},
+        )
+
+        # the high priority task never waits, however far behind the bulk queue is
+        assert results["critical"].max_wait == 0
+        assert results["bulk"].utilization == pytest.approx(1, abs=0.01)
+        bulk_waits.append(results["bulk"].max_wait)
+
+    # while the bulk queue falls further and further behind
+    assert bulk_waits[0] < bulk_waits[1] < bulk_waits[2]
+    assert bulk_waits[0] > 3600
+
+    # on a single queue, the high priority task waits behind the backlog
+    shared = simulate(
+        get_arrivals(tasks, START, START + timedelta(hours=1), runtimes), workers=5
+    )
+    assert shared.max_wait > 3600
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core import checks
+from django.test import override_settings
+from django.utils import timezone
+from django_q.conf import Conf
+from django_q.models import Schedule
+from model_bakery import baker
+
+from django_q_registry import cron
+from django_q_registry.checks import check_skip_due_runs
+from django_q_registry.models import Task
+from django_q_registry.registry import registry
+from django_q_registry.skipping import skip_due_runs
+
+pytestmark = pytest.mark.django_db
+
+
+def work():
+    pass
+
+
+@pytest.fixture
+def skippable_task():
+    task = Task.objects.create_in_memory(
+        work, {"name": "skippable", "skip_if": lambda: True}
+    )
+    with registry.override([task]):
+        yield task
+
+
+def make_schedule(task, next_run, **kwargs):
+    return baker.make(
+        "django_q.Schedule",
+        name=task.schedule_name,
+        func=task.func,
+        schedule_type=Schedule.HOURLY,
+        next_run=next_run,
+        **kwargs,
+    )
+
+
+def test_skip_due_runs(skippable_task):
+    next_run = timezone.now() + timedelta(seconds=30)
+    schedule = make_schedule(skippable_task, next_run)
+
+    assert skip_due_runs() == 1
+
+    schedule.refresh_from_db()
+    assert schedule.next_run == next_run + timedelta(hours=1)
+
+
+def test_skip_due_runs_not_due(skippable_task):
+    next_run = timezone.now() + timedelta(minutes=10)
+    schedule = make_schedule(skippable_task, next_run)
+
+    assert skip_due_runs() == 0
+    assert skip_due_runs(lookahead=15 * 60) == 1
+
+    schedule.refresh_from_db()
+    assert schedule.next_run == next_run + timedelta(hours=1)
+
+
+@pytest.mark.parametrize("catch_up", [True, False])
+def test_skip_due_runs_overdue(skippable_task, catch_up):
+    next_run = timezone.now() - timedelta(hours=3, minutes=30)
+    schedule = make_schedule(skippable_task, next_run)
+
+    with mock.patch.object(Conf, "CATCH_UP", catch_up):
+        skip_due_runs()
+
+    schedule.refresh_from_db()
+    if catch_up:
+        assert schedule.next_run == next_run + timedelta(hours=1)
+    else:
+        assert schedule.next_run == next_run + timedelta(hours=4)
+
+
+@pytest.mark.parametrize("catch_up", [True, False])
+def test_skip_due_runs_cron(skippable_task, catch_up):
+    next_run = cron.get_next("*/5 * * * *", timezone.now() - timedelta(minutes=12))
+    schedule = make_schedule(skippable_task, next_run)
+    # saving a new cron schedule computes its `next_run` with croniter
+    Schedule.objects.filter(pk=schedule.pk).update(
+        schedule_type=Schedule.CRON, cron="*/5 * * * *"
+    )
+
+    with mock.patch.object(Conf, "CATCH_UP", catch_up):
+        assert skip_due_runs() == 1
+
+    schedule.refresh_from_db()
+    if catch_up:
+        assert schedule.next_run == next_run + timedelta(minutes=5)
+    else:
+        assert schedule.next_run == cron.get_next("*/5 * * * *", timezone.now())
+
+
+@pytest.mark.parametrize("skip_if", [lambda: False, lambda: 1 / 0])
+def test_skip_due_runs_runs_task(skippable_task, skip_if):
+    skippable_task.skip_if = skip_if
+    next_run = timezone.now()
+    schedule = make_schedule(skippable_task, next_run)
+
+    assert skip_due_runs() == 0
+
+    schedule.refresh_from_db()
+    assert schedule.next_run == next_run
+
+
+def test_skip_due_runs_queryset(skippable_task):
+    # the task has work while the queryset matches any rows
+    skippable_task.skip_if = Schedule.objects.filter(name="work")
+    make_schedule(skippable_task, timezone.now())
+    work = baker.make("django_q.Schedule", name="work")
+
+    assert skip_due_runs() == 0
+
+    work.delete()
+
+    assert skip_due_runs() == 1
+
+
+def test_skip_due_runs_enqueued_meanwhile(skippable_task):
+    next_run = timezone.now()
+    schedule = make_schedule(skippable_task, next_run)
+
+    def enqueue():
+        # the scheduler enqueues the run while the predicate is evaluated
+        Schedule.objects.filter(pk=schedule.pk).update(
+            next_run=next_run + timedelta(hours=1)
+        )
+        return True
+
+    skippable_task.skip_if = enqueue
+
+    assert skip_due_runs() == 0
+
+    schedule.refresh_from_db()
+    assert schedule.next_run == next_run + timedelta(hours=1)
+
+
+def test_skip_due_runs_no_tasks(django_assert_num_queries):
+    with registry.override(), django_assert_num_queries(0):
+        assert skip_due_runs() == 0
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+def test_skip_due_runs_counted(skippable_task):
+    make_schedule(skippable_task, timezone.now() - timedelta(hours=3))
+
+    skip_due_runs()
+    skip_due_runs()
+
+    assert skippable_task.skip_count == 2
+
+
+def test_check_skip_due_runs(skippable_task):
+    (warning,) = check_skip_due_runs()
+
+    assert isinstance(warning, checks.Warning)
+    assert warning.id == "django_q_registry.W001"
+
+    registry.register(skip_due_runs, schedule_type=Schedule.MINUTES, minutes=1)
+
+    assert check_skip_due_runs() == []
+
+
+def test_check_skip_due_runs_no_skip_if():
+    with registry.override([Task.objects.create_in_memory(work, {})]):
+        assert check_skip_due_runs() == []
+
+
+def test_skip_if_not_evaluated_by_scheduler(skippable_task):
+    skip_if = mock.Mock(return_value=True)
+    skippable_task.skip_if = skip_if
+
+    skippable_task.enqueue()
+
+    skip_if.assert_not_called()
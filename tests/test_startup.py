@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import gc
+import os
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.apps import apps
+from django.test import override_settings
+from django.utils import timezone
+from django_q.models import Schedule
+from django_q.signals import post_spawn
+
+from django_q_registry import startup
+from django_q_registry.fanout import Fanout
+from django_q_registry.models import SyncLease
+from django_q_registry.models import Task
+from django_q_registry.registry import TaskRegistry
+from django_q_registry.startup import ALL_NAMESPACES
+from django_q_registry.startup import get_digest
+from django_q_registry.startup import get_memory_usage
+from django_q_registry.startup import import_task_functions
+from django_q_registry.startup import prepare_fork
+from django_q_registry.startup import sync_on_startup
+from django_q_registry.startup import sync_registry
+
+pytestmark = pytest.mark.django_db
+
+
+def startup_task():
+    pass
+
+
+@pytest.fixture
+def task():
+    return Task(
+        name="startup",
+        func="tests.test_startup.startup_task",
+        kwargs={"schedule_type": Schedule.HOURLY},
+    )
+
+
+@pytest.fixture
+def startup_registry(task):
+    return TaskRegistry(registered_tasks={task})
+
+
+def test_get_digest(task):
+    other = Task(name="other", func="tests.test_startup.startup_task")
+
+    assert get_digest([task, other]) == get_digest([other, task])
+    assert get_digest([task]) != get_digest([task], generation="v1")
+
+    task.keep_last = 10
+    assert get_digest([task, other]) != get_digest(
+        [Task(name="startup", func=task.func, kwargs=task.kwargs), other]
+    )
+
+
+def test_get_digest_schedule(task):
+    digest = get_digest([task])
+
+    assert get_digest([task], routes={task: "bulk"}) != digest
+
+    task.fanout = Fanout(queryset=Task.objects.all(), chunk_size=10)
+    assert get_digest([task]) != digest
+
+
+def test_sync_registry_routing_changed(startup_registry):
+    sync_registry(startup_registry)
+
+    with override_settings(Q_REGISTRY={"ROUTING": {"DEFAULT_CLUSTER": "bulk"}}):
+        assert sync_registry(startup_registry) is True
+
+    assert Schedule.objects.get().cluster == "bulk"
+
+
+def test_sync_registry(startup_registry, django_assert_num_queries):
+    assert sync_registry(startup_registry) is True
+
+    assert Task.objects.count() == 1
+    assert Schedule.objects.count() == 1
+    lease = SyncLease.objects.get()
+    assert lease.name == ALL_NAMESPACES
+    assert lease.digest == get_digest(startup_registry.registered_tasks)
+    assert lease.holder == ""
+    assert lease.synced_at is not None
+
+    with django_assert_num_queries(1):
+        assert sync_registry(startup_registry) is False
+
+
+def test_sync_registry_changed(startup_registry):
+    sync_registry(startup_registry)
+
+    startup_registry.registered_tasks.add(
+        Task(
+            name="another",
+            func="tests.test_startup.startup_task",
+            kwargs={"schedule_type": Schedule.DAILY},
+        )
+    )
+
+    assert sync_registry(startup_registry) is True
+    assert Task.objects.count() == 2
+
+
+@override_settings(Q_REGISTRY={"PRIORITIES": {"high": "critical"}})
+def test_sync_registry_priority_changed(startup_registry, task):
+    sync_registry(startup_registry)
+
+    task.priority = "high"
+
+    assert sync_registry(startup_registry) is True
+    assert Schedule.objects.get().cluster == "critical"
+
+
+def test_sync_registry_lease_held(startup_registry):
+    SyncLease.objects.create(
+        name=ALL_NAMESPACES,
+        holder="other",
+        expires_at=timezone.now() + timedelta(minutes=1),
+    )
+
+    assert sync_registry(startup_registry) is False
+    assert not Task.objects.exists()
+
+
+def test_sync_registry_lease_expired(startup_registry):
+    SyncLease.objects.create(
+        name=ALL_NAMESPACES,
+        holder="crashed",
+        expires_at=timezone.now() - timedelta(minutes=1),
+    )
+
+    assert sync_registry(startup_registry) is True
+    assert Task.objects.count() == 1
+
+
+def test_sync_registry_namespace(task):
+    task.namespace = "billing"
+    other = Task(name="other", func="tests.test_startup.startup_task")
+
+    assert sync_registry(TaskRegistry(registered_tasks={task, other}), "billing")
+
+    assert Task.objects.get().namespace == "billing"
+    assert SyncLease.objects.get().name == "billing"
+
+
+def test_sync_registry_failure_releases_lease(startup_registry):
+    with (
+        mock.patch.object(
+            Task.objects, "create_from_registry", side_effect=RuntimeError
+        ),
+        pytest.raises(RuntimeError),
+    ):
+        sync_registry(startup_registry)
+
+    lease = SyncLease.objects.get()
+    assert lease.holder == ""
+    assert lease.digest == ""
+
+    assert sync_registry(startup_registry) is True
+
+
+def test_sync_on_startup(startup_registry):
+    with override_settings(Q_REGISTRY={"SYNC_ON_STARTUP": True}):
+        assert sync_on_startup(startup_registry) is True
+
+    assert Task.objects.count() == 1
+
+
+def test_sync_on_startup_disabled(startup_registry):
+    assert sync_on_startup(startup_registry) is False
+
+    assert not Task.objects.exists()
+
+
+def test_sync_on_startup_failure(startup_registry, caplog):
+    with (
+        override_settings(Q_REGISTRY={"SYNC_ON_STARTUP": True}),
+        mock.patch.object(startup, "sync_registry", side_effect=RuntimeError),
+        caplog.at_level("ERROR"),
+    ):
+        assert sync_on_startup(startup_registry) is False
+
+    assert "Syncing the registry on cluster startup failed" in caplog.text
+
+
+def test_sync_on_startup_not_on_worker_spawn(startup_registry):
+    with (
+        override_settings(Q_REGISTRY={"SYNC_ON_STARTUP": True}),
+        mock.patch.object(startup, "sync_registry") as sync,
+    ):
+        post_spawn.send(sender="django_q", proc_name="Process-1")
+
+    sync.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ("argv", "called"),
+    [(["manage.py", "qcluster"], True), (["manage.py", "runserver"], False)],
+)
+def test_ready_sync_on_startup(argv, called):
+    app_config = apps.get_app_config("django_q_registry")
+
+    with (
+        mock.patch("django_q_registry.registry.registry.autodiscover_tasks"),
+        mock.patch.object(startup.sys, "argv", argv),
+        mock.patch.object(startup, "sync_on_startup") as sync,
+    ):
+        app_config.ready()
+
+    assert sync.called is called
+
+
+@pytest.fixture
+def unfreeze():
+    yield
+    gc.unfreeze()
+
+
+def test_import_task_functions(startup_registry, caplog):
+    startup_registry.registered_tasks.add(
+        Task(name="missing", func="tests.test_startup.missing_task")
+    )
+
+    with caplog.at_level("WARNING"):
+        assert import_task_functions(startup_registry) == 1
+
+    assert "tests.test_startup.missing_task" in caplog.text
+
+
+def test_prepare_fork(startup_registry, unfreeze):
+    with mock.patch.object(
+        startup, "import_task_functions", return_value=1
+    ) as import_functions:
+        frozen = prepare_fork(startup_registry)
+
+    assert frozen > 0
+    assert gc.get_freeze_count() > 0
+    import_functions.assert_not_called()
+
+    with mock.patch.object(
+        startup, "import_task_functions", return_value=1
+    ) as import_functions:
+        prepare_fork(startup_registry, import_callables=True)
+
+    import_functions.assert_called_once_with(startup_registry)
+
+
+@pytest.mark.parametrize(
+    ("prefork", "argv", "called"),
+    [
+        (True, ["manage.py", "qcluster"], True),
+        (True, ["manage.py", "runserver"], False),
+        (False, ["manage.py", "qcluster"], False),
+    ],
+)
+def test_ready_prefork(prefork, argv, called):
+    app_config = apps.get_app_config("django_q_registry")
+
+    with (
+        override_settings(Q_REGISTRY={"PREFORK": prefork, "PREFORK_IMPORTS": True}),
+        mock.patch("django_q_registry.registry.registry.autodiscover_tasks"),
+        mock.patch.object(startup.sys, "argv", argv),
+        mock.patch.object(startup, "prepare_fork") as prepare,
+    ):
+        app_config.ready()
+
+    assert prepare.called is called
+    if called:
+        assert prepare.call_args.kwargs == {"import_callables": True}
+
+
+def test_get_memory_usage():
+    usage = get_memory_usage()
+    if usage is None:
+        pytest.skip("/proc/<pid>/smaps_rollup is not available")
+
+    assert usage.rss > 0
+    assert usage.shared + usage.private <= usage.rss
+    assert get_memory_usage(-1) is None
+
+
+def get_worker_private_memory():
+    """
+    Fork a stand-in for a Django Q worker and return how much private memory a garbage collection in
+    it costs.
+    """
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover
+        # never return into pytest from the child, whatever happens
+        try:
+            before = get_memory_usage()
+            gc.collect()
+            after = get_memory_usage()
+            os.write(write, str(after.private - before.private).encode())
+        finally:
+            os._exit(0)
+
+    os.close(write)
+    with os.fdopen(read) as pipe:
+        private = int(pipe.read())
+    os.waitpid(pid, 0)
+    return private
+
+
+@pytest.mark.benchmark
+def test_benchmark_prefork_memory(unfreeze, record_property):
+    """
+    A registry, and what it imports, take up many objects, which a forked worker only shares with the
+    cluster process as long as it does not write to the memory pages they are in. A garbage collection
+    in the worker writes to every object it tracks, unless they were frozen before the fork.
+    """
+    if get_memory_usage() is None:
+        pytest.skip("/proc/<pid>/smaps_rollup is not available")
+
+    registry = TaskRegistry(
+        registered_tasks={
+            Task(
+                name=f"task {i}",
+                func="tests.test_startup.startup_task",
+                kwargs={"schedule_type": Schedule.HOURLY, "args": [i, str(i)]},
+            )
+            for i in range(20_000)
+        }
+    )
+
+    unfrozen = get_worker_private_memory()
+    prepare_fork(registry)
+    frozen = get_worker_private_memory()
+
+    record_property("unfrozen_private_bytes", unfrozen)
+    record_property("frozen_private_bytes", frozen)
+    assert frozen < unfrozen / 2
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django_q.models import Schedule
+
+from django_q_registry.models import Task
+from django_q_registry.registry import TaskSet
+from django_q_registry.registry import registry
+
+
+def noop():
+    pass
+
+
+@pytest.fixture
+def cron_task():
+    task = Task.objects.create_in_memory(
+        noop, {"name": "calendar", "schedule_type": Schedule.CRON, "cron": "0 9 * * *"}
+    )
+    # only forecast this task, not the ones registered by other test modules
+    with mock.patch.object(registry, "registered_tasks", TaskSet({task})):
+        yield task
+
+
+def test_task_calendar(cron_task, capsys):
+    call_command(
+        "task_calendar", "--start", "2024-06-14T00:00", "--hours", "48", "--top", "1"
+    )
+
+    out = capsys.readouterr().out
+    assert "2 run(s) from 2024-06-14 00:00 to 2024-06-16 00:00" in out
+    assert "Busiest minutes:\n2024-06-14 09:00  1" in out
+
+
+def test_task_calendar_histogram(cron_task, capsys):
+    call_command("task_calendar", "--start", "2024-06-14T00:00", verbosity=2)
+
+    assert "2024-06-14 09:00     1  #" in capsys.readouterr().out
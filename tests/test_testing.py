@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from django.core.management import call_command
+from django.utils import timezone
+from django_q.models import Schedule
+
+from django_q_registry.models import Task
+from django_q_registry.registry import TaskRegistry
+from django_q_registry.registry import registry
+from django_q_registry.testing import InMemoryScheduleStore
+
+
+def store_task():
+    pass
+
+
+def make_task(name="test", **kwargs):
+    return Task.objects.create_in_memory(
+        store_task,
+        {"name": name, "schedule_type": Schedule.HOURLY, **kwargs},
+    )
+
+
+def test_create_from_registry():
+    store = InMemoryScheduleStore()
+    registry = TaskRegistry(registered_tasks={make_task()})
+
+    saved = store.create_from_registry(registry)
+
+    assert [task.name for task in saved] == ["test"]
+    assert registry.created_tasks == set(saved)
+    schedule = store.get_schedule("test")
+    assert schedule.name == "test - QREGISTRY"
+    assert schedule.next_run > timezone.now()
+
+
+def test_create_from_registry_keeps_rows():
+    store = InMemoryScheduleStore()
+    registry = TaskRegistry(registered_tasks={make_task(keep_last=5)})
+    (first,) = store.create_from_registry(registry)
+    next_run = store.get_schedule("test").next_run
+
+    registry = TaskRegistry(registered_tasks={make_task(keep_last=10)})
+    (second,) = store.create_from_registry(registry)
+
+    assert second.pk == first.pk
+    assert second.keep_last == 10
+    assert store.get_schedule("test").next_run == next_run
+
+
+def test_delete_dangling_objects():
+    store = InMemoryScheduleStore()
+    store.create_from_registry(
+        TaskRegistry(registered_tasks={make_task("old"), make_task("kept")})
+    )
+
+    registry = TaskRegistry(registered_tasks={make_task("kept")})
+    store.create_from_registry(registry)
+    deleted = store.delete_dangling_objects(registry)
+
+    assert [task.name for task in deleted] == ["old"]
+    assert [task.name for task in store.tasks.values()] == ["kept"]
+    assert len(store.schedules) == 1
+
+
+def test_delete_dangling_objects_namespace():
+    store = InMemoryScheduleStore()
+    store.create_from_registry(
+        TaskRegistry(
+            registered_tasks={
+                make_task("billing", namespace="billing"),
+                make_task("reports", namespace="reports"),
+            }
+        )
+    )
+
+    store.delete_dangling_objects(TaskRegistry(), namespace="billing")
+
+    assert [task.name for task in store.tasks.values()] == ["reports"]
+
+
+def test_q_registry(q_registry):
+    assert q_registry is registry
+    assert len(registry.registered_tasks) == 0
+
+    registry.register(store_task, name="test", schedule_type=Schedule.HOURLY)
+
+    assert len(registry.registered_tasks) == 1
+
+
+def test_q_registry_snapshot(q_registry_snapshot):
+    count = len(registry.registered_tasks)
+
+    registry.register(store_task, name="snapshot", schedule_type=Schedule.HOURLY)
+
+    assert len(registry.registered_tasks) == count + 1
+
+
+def test_q_schedule_store(q_registry, q_schedule_store):
+    registry.register(store_task, name="test", schedule_type=Schedule.HOURLY)
+
+    call_command("setup_periodic_tasks")
+
+    assert q_schedule_store.get_schedule("test").func == "tests.test_testing.store_task"
+    assert len(registry.created_tasks) == 1
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import ast
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+from django_q.models import Schedule
+from model_bakery import baker
+
+from django_q_registry.models import Task
+from django_q_registry.registry import TaskRegistry
+from django_q_registry.timeouts import get_percentile_runtimes
+from django_q_registry.timeouts import get_timeouts
+from django_q_registry.timeouts import parse_kwargs
+from django_q_registry.timeouts import refresh_timeouts
+from django_q_registry.timeouts import set_timeout
+
+pytestmark = pytest.mark.django_db
+
+
+def timed_task():
+    pass
+
+
+def make_runs(task, seconds):
+    now = timezone.now()
+    for runtime in seconds:
+        baker.make(
+            "django_q.Task",
+            group=task.schedule_name,
+            started=now - timedelta(seconds=runtime),
+            stopped=now,
+            success=True,
+        )
+
+
+@pytest.fixture
+def auto_task():
+    return Task.objects.create_in_memory(
+        timed_task,
+        {"name": "auto", "timeout": "auto", "schedule_type": Schedule.HOURLY},
+    )
+
+
+def test_get_percentile_runtimes(auto_task):
+    make_runs(auto_task, range(1, 101))
+
+    assert get_percentile_runtimes([auto_task.schedule_name], 99) == {
+        auto_task.schedule_name: timedelta(seconds=99)
+    }
+    assert get_percentile_runtimes([auto_task.schedule_name], 50) == {
+        auto_task.schedule_name: timedelta(seconds=50)
+    }
+    assert get_percentile_runtimes([auto_task.schedule_name], 99, min_runs=101) == {}
+
+
+def test_get_timeouts(auto_task):
+    static = Task.objects.create_in_memory(
+        timed_task, {"name": "static", "timeout": 30, "schedule_type": Schedule.HOURLY}
+    )
+    make_runs(auto_task, [40] * 20)
+    make_runs(static, [40] * 20)
+
+    assert get_timeouts([auto_task, static]) == {auto_task: 80}
+
+
+@override_settings(Q_REGISTRY={"TIMEOUTS": {"HEADROOM": 1.5, "MIN_RUNS": 2}})
+def test_get_timeouts_settings(auto_task):
+    make_runs(auto_task, [50, 100])
+
+    # 100 seconds with 50% headroom, capped below the cluster's retry of 120 seconds
+    assert get_timeouts([auto_task]) == {auto_task: 119}
+
+
+def test_get_timeouts_minimum(auto_task):
+    make_runs(auto_task, [1] * 20)
+
+    assert get_timeouts([auto_task]) == {auto_task: 60}
+
+
+def test_get_timeouts_too_few_runs(auto_task, django_assert_num_queries):
+    make_runs(auto_task, [40] * 19)
+
+    assert get_timeouts([auto_task]) == {}
+
+    with django_assert_num_queries(0):
+        assert (
+            get_timeouts([Task(name="other", func="tests.test_timeouts.timed_task")])
+            == {}
+        )
+
+
+def test_set_timeout():
+    schedule_dict = {"kwargs": "{'a': 1, 'q_options': {'group': 'g'}}"}
+
+    set_timeout(schedule_dict, 30)
+
+    assert schedule_dict["kwargs"] == {
+        "a": 1,
+        "q_options": {"group": "g", "timeout": 30},
+    }
+
+
+def test_parse_kwargs():
+    assert parse_kwargs(None) == {}
+    assert parse_kwargs({"a": 1}) == {"a": 1}
+    assert parse_kwargs("{'a': 1}") == {"a": 1}
+
+    with pytest.raises(ValueError, match="must be a dict"):
+        parse_kwargs("a=1")
+
+
+def test_register_static_timeout():
+    task = Task.objects.create_in_memory(
+        timed_task,
+        {
+            "name": "static",
+            "timeout": 30,
+            "kwargs": {"a": 1},
+            "schedule_type": Schedule.HOURLY,
+        },
+    )
+
+    schedule_dict = task.to_schedule_dict()
+
+    assert "timeout" not in schedule_dict
+    assert schedule_dict["kwargs"] == {"a": 1, "q_options": {"timeout": 30}}
+
+
+@pytest.mark.parametrize("timeout", [0, -1, True, "fast", 1.5])
+def test_register_invalid_timeout(timeout):
+    with pytest.raises(ValueError, match="positive number of seconds"):
+        Task.objects.create_in_memory(timed_task, {"timeout": timeout})
+
+
+def test_register_timeout_kwargs_string():
+    with pytest.raises(ValueError, match="must be a dict"):
+        Task.objects.create_in_memory(timed_task, {"timeout": 30, "kwargs": "a=1"})
+
+
+def test_create_from_registry_auto_timeout(auto_task):
+    registry = TaskRegistry(registered_tasks={auto_task})
+
+    Task.objects.create_from_registry(registry)
+
+    assert Schedule.objects.get().kwargs is None
+
+    make_runs(auto_task, [40] * 20)
+    Task.objects.create_from_registry(registry)
+
+    schedule = Schedule.objects.get()
+    assert ast.literal_eval(schedule.kwargs) == {"q_options": {"timeout": 80}}
+
+
+def test_refresh_timeouts(auto_task):
+    registry = TaskRegistry(registered_tasks={auto_task})
+    Task.objects.create_from_registry(registry)
+    make_runs(auto_task, [40] * 20)
+
+    assert refresh_timeouts(registry) == 1
+    assert ast.literal_eval(Schedule.objects.get().kwargs) == {
+        "q_options": {"timeout": 80}
+    }
+    assert refresh_timeouts(registry) == 0
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django_q.models import Schedule
+from model_bakery import baker
+
+from django_q_registry import tracing
+from django_q_registry.models import Task
+from django_q_registry.registry import TaskRegistry
+from django_q_registry.signals import post_sync
+from django_q_registry.signals import pre_sync
+from django_q_registry.signals import task_created
+from django_q_registry.signals import task_deleted
+from django_q_registry.signals import task_updated
+
+pytestmark = pytest.mark.django_db
+
+
+def traced_task():
+    pass
+
+
+@pytest.fixture
+def registry():
+    return TaskRegistry(
+        registered_tasks={
+            Task(
+                name=name,
+                func="tests.test_tracing.traced_task",
+                kwargs={"schedule_type": Schedule.HOURLY},
+            )
+            for name in ("first", "second")
+        }
+    )
+
+
+@pytest.fixture
+def received():
+    received = []
+
+    def receiver(signal, **kwargs):
+        received.append((signal, kwargs))
+
+    signals = [pre_sync, post_sync, task_created, task_updated, task_deleted]
+    for signal in signals:
+        signal.connect(receiver, dispatch_uid="test_tracing")
+    yield received
+    for signal in signals:
+        signal.disconnect(dispatch_uid="test_tracing")
+
+
+def test_sync_stats_measure():
+    stats = tracing.SyncStats()
+
+    with stats.measure("default"):
+        Task.objects.count()
+        Task.objects.count()
+    with stats.measure("default"):
+        Task.objects.count()
+
+    assert stats.queries == 3
+    assert stats.duration > 0
+    assert stats not in connection.execute_wrappers
+
+
+def test_create_from_registry_signals(registry, received):
+    Task.objects.create_from_registry(registry)
+
+    signals = [signal for signal, _ in received]
+    assert signals == [pre_sync, task_created, post_sync]
+
+    _, pre = received[0]
+    assert pre["operation"] == "create_from_registry"
+    assert pre["using"] == "default"
+    assert pre["namespace"] is None
+
+    _, created = received[1]
+    assert {task.name for task in created["tasks"]} == {"first", "second"}
+    assert created["stats"].rows == 2
+    assert created["stats"].queries > 0
+
+    _, post = received[2]
+    assert post["exception"] is None
+    assert post["stats"].rows == 2
+    assert post["stats"].queries > created["stats"].queries
+    assert post["stats"].duration >= created["stats"].duration
+
+
+def test_create_from_registry_signals_updated(registry, received):
+    Task.objects.create_from_registry(registry)
+    received.clear()
+
+    Task.objects.create_from_registry(registry)
+
+    assert [signal for signal, _ in received] == [pre_sync, task_updated, post_sync]
+    assert received[1][1]["stats"].rows == 2
+
+
+def test_create_from_registry_signals_failure(registry, received):
+    with (
+        mock.patch(
+            "django_q_registry.models._plan_schedules", side_effect=RuntimeError
+        ),
+        pytest.raises(RuntimeError),
+    ):
+        Task.objects.create_from_registry(registry)
+
+    signal, post = received[-1]
+    assert signal is post_sync
+    assert isinstance(post["exception"], RuntimeError)
+
+
+def test_delete_dangling_objects_signals(received):
+    tasks = baker.make("django_q_registry.Task", _quantity=2)
+
+    Task.objects.delete_dangling_objects(TaskRegistry())
+
+    assert [signal for signal, _ in received] == [pre_sync, task_deleted, post_sync]
+    _, deleted = received[1]
+    assert deleted["tasks"] == tasks
+    assert deleted["stats"].rows == 2
+    assert received[2][1]["operation"] == "delete_dangling_objects"
+
+
+def test_delete_dangling_objects_signals_nothing_deleted(received):
+    Task.objects.delete_dangling_objects(TaskRegistry())
+
+    assert [signal for signal, _ in received] == [pre_sync, post_sync]
+    assert received[1][1]["stats"].rows == 0
+
+
+def test_acreate_from_registry_signals(registry, received):
+    async def create():
+        await Task.objects.acreate_from_registry(registry)
+
+    async_to_sync(create)()
+
+    assert [signal for signal, _ in received] == [pre_sync, task_created, post_sync]
+    _, post = received[2]
+    assert post["stats"].rows == 2
+    assert post["stats"].queries > 0
+
+
+def test_opentelemetry_span(registry):
+    trace = mock.Mock()
+    span = trace.get_tracer.return_value.start_span.return_value
+    context = mock.Mock()
+
+    with (
+        mock.patch.object(tracing, "trace", trace),
+        mock.patch.object(tracing, "context", context),
+    ):
+        Task.objects.create_from_registry(registry)
+
+    trace.get_tracer.return_value.start_span.assert_called_once_with(
+        "django_q_registry.create_from_registry",
+        attributes={"db.name": "default", "django_q_registry.namespace": ""},
+    )
+    span.add_event.assert_called_once()
+    assert span.add_event.call_args.args[0] == "task_created"
+    assert span.set_attributes.call_args.args[0]["django_q_registry.rows"] == 2
+    span.end.assert_called_once_with()
+    context.detach.assert_called_once_with(context.attach.return_value)
+
+
+def test_opentelemetry_absent(registry):
+    with mock.patch.object(tracing, "trace", None):
+        Task.objects.create_from_registry(registry)
+
+    assert Task.objects.count() == 2
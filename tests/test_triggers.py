@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from django_q.models import OrmQ
+from django_q.models import Schedule
+from model_bakery import baker
+
+from django_q_registry.models import Task
+from django_q_registry.registry import TaskRegistry
+from django_q_registry.triggers import mark_dirty
+from django_q_registry.triggers import post_delete
+from django_q_registry.triggers import post_save
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def registry():
+    ret = TaskRegistry()
+    ret.registered_tasks.clear()
+    yield ret
+    for task in ret.registered_tasks:
+        task.trigger.disconnect(task)
+
+
+def rebuild_index():
+    pass
+
+
+def test_post_save_trigger(registry, django_capture_on_commit_callbacks):
+    registry.register(rebuild_index, trigger=post_save("django_q.OrmQ"), debounce=30)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        baker.make("django_q.OrmQ", _quantity=3)
+
+    schedule = Schedule.objects.get()
+    assert schedule.name == "rebuild_index - triggered"
+    assert schedule.func == "tests.test_triggers.rebuild_index"
+    assert schedule.schedule_type == Schedule.ONCE
+    assert schedule.next_run > timezone.now() + timedelta(seconds=20)
+
+
+def test_post_delete_trigger(registry, django_capture_on_commit_callbacks):
+    registry.register(rebuild_index, trigger=post_delete(OrmQ))
+    orm_q = baker.make("django_q.OrmQ")
+
+    assert not Schedule.objects.exists()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        orm_q.delete()
+
+    assert Schedule.objects.count() == 1
+
+
+def test_mark_dirty_debounces():
+    task = Task.objects.create_in_memory(
+        rebuild_index, {"trigger": post_save(OrmQ), "debounce": 60}
+    )
+
+    # the tests use a `DummyCache`, which shares nothing
+    assert mark_dirty(task) is True
+    assert mark_dirty(task) is False
+    assert Schedule.objects.count() == 1
+
+    # the run was enqueued by the scheduler, which deletes its schedule
+    Schedule.objects.all().delete()
+
+    assert mark_dirty(task) is True
+
+
+def test_trigger_only_task_has_no_schedule(registry):
+    registry.register(rebuild_index, trigger=post_save(OrmQ))
+
+    Task.objects.create_from_registry(registry)
+
+    assert Task.objects.get().q_schedule is None
+    assert not Schedule.objects.exists()
+
+
+def test_trigger_with_fallback_schedule(registry):
+    registry.register(
+        rebuild_index, trigger=post_save(OrmQ), schedule_type=Schedule.DAILY
+    )
+
+    Task.objects.create_from_registry(registry)
+
+    assert Task.objects.get().q_schedule.schedule_type == Schedule.DAILY
+
+
+def test_debounce_without_trigger():
+    with pytest.raises(ValueError, match="debounce"):
+        Task.objects.create_in_memory(rebuild_index, {"debounce": 60})
+
+
+def test_trigger_type():
+    with pytest.raises(TypeError):
+        Task.objects.create_in_memory(rebuild_index, {"trigger": OrmQ})